@@ -0,0 +1,25 @@
+import sys
+import argparse
+import warnings
+from dynamicspectrum.batch import Batch
+
+
+if not sys.warnoptions:
+    warnings.simplefilter('ignore')
+
+parser = argparse.ArgumentParser(description='Render dynamic spectra of events from CSV '
+                                             'file with columns date, start, end, '
+                                             'instruments, stokes')
+parser.add_argument('events', help='CSV file with list of events')
+parser.add_argument('--output', default='plots/batch', help='folder of images and manifest')
+parser.add_argument('--processes', type=int, default=None, help='number of worker processes')
+parser.add_argument('--format', default='png', help='image format: png, jpeg or webp')
+args = parser.parse_args()
+
+batch = Batch(args.output, args.processes, args.format)
+records = batch.run(batch.read_events(args.events))
+failed = [record for record in records if record['status'] != 'ok']
+for record in failed:
+    print(record['event'], record['error'])
+print('Rendered: {}, failed: {}, manifest: {}'.format(len(records) - len(failed),
+                                                      len(failed), batch.manifest_path))
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+""" The class for sliding-window animation of dynamic spectrum """
+import os
+import shutil
+import subprocess
+import numpy as np
+from datetime import datetime, timedelta, time
+from PIL import Image
+from dynamicspectrum.dynamicspectrum.builder import Builder
+from dynamicspectrum.dynamicspectrum import exceptions
+
+
+class ImageSequenceWriter:
+    """
+    This class writes frames of animation as numbered images in folder
+    """
+    def __init__(self, folder, image_format='png'):
+        self.folder = folder
+        self.image_format = image_format
+        self.frames = 0
+        os.makedirs(folder, exist_ok=True)
+
+    def write(self, frame):
+        """ Save frame as the next image of sequence """
+        file_path = os.path.join(self.folder, 'frame_{:05d}.{}'.format(
+            self.frames, self.image_format))
+        Image.fromarray(frame).save(file_path)
+        self.frames += 1
+
+    def close(self):
+        """ Nothing to finish for image sequence """
+        return self.frames
+
+
+class FFmpegWriter:
+    """
+    This class streams raw frames of animation to ffmpeg encoder through pipe
+    """
+    def __init__(self, file_path, fps):
+        self.file_path = file_path
+        self.fps = fps
+        self.frames = 0
+        self.process = None
+
+    def start(self, width, height):
+        """ Start encoder for frames of given size """
+        executable = shutil.which('ffmpeg')
+        if executable is None:
+            raise exceptions.EncoderIsNotFound("ffmpeg is not found")
+        command = [executable, '-y', '-loglevel', 'error', '-f', 'rawvideo',
+                   '-pix_fmt', 'rgb24', '-s', '{}x{}'.format(width, height),
+                   '-r', str(self.fps), '-i', '-', '-pix_fmt', 'yuv420p', self.file_path]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        """ Send frame to encoder """
+        if self.process is None:
+            self.start(frame.shape[1], frame.shape[0])
+        self.process.stdin.write(frame.tobytes())
+        self.frames += 1
+
+    def close(self):
+        """ Finish encoding of movie """
+        if self.process is not None:
+            self.process.stdin.close()
+            self.process.wait()
+        return self.frames
+
+
+class Animation:
+    """
+    This class renders movie of time window scrolling across the day.
+    Data of instruments is processed once for the whole period, frames get
+    views of the decoded arrays, artists of figure are reused between frames
+    """
+    WINDOW = 1800
+    STEP = 60
+    FPS = 10
+    MOVIE_FORMATS = ['.mp4', '.mkv', '.webm', '.avi', '.mov']
+
+    def __init__(self, builder=None, window=WINDOW, step=STEP, fps=FPS):
+        self.builder = builder or Builder()
+        self.window = window
+        self.step = step
+        self.fps = fps
+
+    @staticmethod
+    def seconds_to_time(seconds):
+        """ Convert seconds of the day to time """
+        return (datetime.min + timedelta(seconds=min(seconds, 86399))).time()
+
+    def get_windows(self, time_from, time_to):
+        """ Return (start, end) seconds of the day for each frame """
+        start = round(self.builder.time_to_seconds(time_from))
+        end = round(self.builder.time_to_seconds(time_to))
+        last = max(start, end - self.window)
+
+        return [(first, first + self.window) for first in range(start, last + 1, self.step)]
+
+    def load_data(self, date_event, time_from, time_to, spectrometer, spectropolarimeter,
+                  time_profile, stokes):
+        """ Process files of instruments once for the whole period """
+        return [self.builder.get_instrument_data(date_event, time_from, time_to,
+                                                 instruments, stokes)
+                for instruments in [spectrometer, spectropolarimeter, time_profile]]
+
+    def slice_spectrum(self, data, start, end):
+        """
+        Return view of spectrum for frame. Start and end are seconds from
+        beginning of the period, the same as columns of instrument data
+        """
+        array = data['array']
+        first, last = data['ncols']
+        if array.size == 0 or last <= first or end <= first or start >= last:
+            return dict(data, array=np.array([[]]), ncols=[0, 0])
+        scale = array.shape[1] / (last - first)
+        begin = int(np.clip(np.ceil((start - first) * scale), 0, array.shape[1]))
+        stop = int(np.clip(np.floor((end - first) * scale), begin, array.shape[1]))
+        if stop == begin:
+            return dict(data, array=np.array([[]]), ncols=[0, 0])
+
+        return dict(data, array=array[:, begin:stop],
+                    ncols=[round(first + begin / scale - start),
+                           round(first + stop / scale - start)])
+
+    def slice_profile(self, data, start, end):
+        """
+        Return view of time profile for frame. Time of profiles is given in
+        seconds of the day
+        """
+        if not isinstance(data['time'], np.ndarray):
+            return data
+        begin, stop = np.searchsorted(data['time'], [start, end])
+        frame_data = dict(data, time=data['time'][begin:stop],
+                          flux=data['flux'][begin:stop], ncols=[start, end])
+        if 'frequencies' in data:
+            frame_data['frequencies'] = {
+                frequency: self.slice_profile(profile, start, end)
+                for frequency, profile in data['frequencies'].items()}
+
+        return frame_data
+
+    def get_frame_data(self, data, period_start, start, end):
+        """ Return data of instruments for frame window """
+        spectrometer_data, spectropolarimeter_data, time_profile_data = data
+        return [{instr: self.slice_spectrum(instr_data, start - period_start,
+                                            end - period_start)
+                 for instr, instr_data in spectrometer_data.items()},
+                {instr: self.slice_spectrum(instr_data, start - period_start,
+                                            end - period_start)
+                 for instr, instr_data in spectropolarimeter_data.items()},
+                {instr: self.slice_profile(instr_data, start, end)
+                 for instr, instr_data in time_profile_data.items()}]
+
+    def render_frame(self, date_event, start, end, frame_data, stokes):
+        """
+        Draw frame in figure of builder. Return RGB array of pixels, array is
+        copied from canvas buffer which is reused by the next frame
+        """
+        self.builder.draw_spectrum(date_event, self.seconds_to_time(start),
+                                   self.seconds_to_time(end), *frame_data, stokes)
+        canvas = self.builder.fig.canvas
+        canvas.draw()
+
+        return np.array(np.asarray(canvas.buffer_rgba())[:, :, :3])
+
+    def iterate_frames(self, date_event, time_from, time_to, spectrometer,
+                       spectropolarimeter, time_profile, stokes):
+        """ Yield RGB arrays of frames scrolling window across period """
+        data = self.load_data(date_event, time_from, time_to, spectrometer,
+                              spectropolarimeter, time_profile, stokes)
+        period_start = round(self.builder.time_to_seconds(time_from))
+        try:
+            for start, end in self.get_windows(time_from, time_to):
+                frame_data = self.get_frame_data(data, period_start, start, end)
+                yield self.render_frame(date_event, start, end, frame_data, stokes)
+        finally:
+            self.builder.release_figure()
+
+    def create_writer(self, output):
+        """
+        Return writer of movie for file with video extension, otherwise
+        frames are saved as image sequence in folder
+        """
+        if os.path.splitext(output)[1].lower() in self.MOVIE_FORMATS:
+            return FFmpegWriter(output, self.fps)
+        return ImageSequenceWriter(output)
+
+    def export(self, output, date_event, spectrometer, spectropolarimeter, time_profile,
+               stokes, time_from=time(0, 0), time_to=time(23, 59, 59), writer=None):
+        """
+        Render animation of the period to movie or image sequence.
+        Return number of written frames
+        """
+        writer = writer or self.create_writer(output)
+        try:
+            for frame in self.iterate_frames(date_event, time_from, time_to, spectrometer,
+                                             spectropolarimeter, time_profile, stokes):
+                writer.write(frame)
+        finally:
+            frames = writer.close()
+
+        return frames
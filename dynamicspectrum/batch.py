@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+""" The class for batch rendering of catalogued events """
+import os
+import re
+import csv
+import json
+import time as timer
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dynamicspectrum.dynamicspectrum.builder import Builder
+from dynamicspectrum.dynamicspectrum.animation import Animation
+
+
+class Event:
+    """
+    This class represents one spectrum of event list
+    """
+    def __init__(self, date, time_from, time_to, instruments, stokes='I'):
+        self.date = date
+        self.time_from = time_from
+        self.time_to = time_to
+        self.instruments = list(instruments)
+        self.stokes = stokes
+
+    @property
+    def key(self):
+        """ Return identifier of event used in file names and manifest """
+        return '_'.join([self.date.strftime('%Y%m%d'), self.time_from.strftime('%H%M%S'),
+                         self.time_to.strftime('%H%M%S'), self.stokes.replace('/', ''),
+                         '-'.join(self.instruments)])
+
+    def to_dict(self):
+        """ Return fields of event for manifest """
+        return {'event': self.key, 'date': self.date.strftime('%Y-%m-%d'),
+                'start': self.time_from.strftime('%H:%M:%S'),
+                'end': self.time_to.strftime('%H:%M:%S'),
+                'instruments': self.instruments, 'stokes': self.stokes}
+
+
+class Batch:
+    """
+    This class renders spectra of many events. Events of the same day are
+    rendered by one worker process, which processes files of the day once
+    for all Stokes parameters of the events.
+    Processes share downloaded files and catalog, results are written to
+    manifest, so interrupted run continues from events without result
+    """
+    MANIFEST = 'manifest.jsonl'
+    SPECTROMETERS = ['wind1', 'wind2', 'stereo']
+    SPECTROPOLARIMETERS = ['amateras', 'orfees', 'assa']
+    TIME_PROFILES = ['goes', 'goes17', 'srh']
+
+    def __init__(self, output='plots/batch', processes=None, image_format='png'):
+        self.output = output
+        self.processes = processes
+        self.image_format = image_format
+        self.manifest_path = os.path.join(output, self.MANIFEST)
+
+    @staticmethod
+    def parse_time(value):
+        """ Parse time of event given as HH:MM or HH:MM:SS """
+        value = value.strip()
+        time_format = '%H:%M:%S' if value.count(':') == 2 else '%H:%M'
+        return datetime.strptime(value, time_format).time()
+
+    def read_events(self, file_path):
+        """
+        Read CSV file with columns date, start, end, instruments, stokes.
+        Instruments are separated by spaces or semicolons
+        """
+        events = []
+        with open(file_path, newline='') as _f:
+            for row in csv.DictReader(_f):
+                row = {key.strip().lower(): (value or '').strip()
+                       for key, value in row.items() if key}
+                if not row.get('date'):
+                    continue
+                events.append(Event(datetime.strptime(row['date'], '%Y-%m-%d'),
+                                    self.parse_time(row['start']),
+                                    self.parse_time(row['end']),
+                                    re.split(r'[;\s]+', row['instruments'].lower()),
+                                    row.get('stokes') or 'I'))
+
+        return events
+
+    def read_manifest(self):
+        """ Return the last result of each event from manifest """
+        results = {}
+        if not os.path.exists(self.manifest_path):
+            return results
+        with open(self.manifest_path) as _f:
+            for line in _f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                results[record['event']] = record
+
+        return results
+
+    def write_result(self, record):
+        """ Append result of event to manifest """
+        with open(self.manifest_path, 'a') as _f:
+            _f.write(json.dumps(record, sort_keys=True) + '\n')
+
+    def is_done(self, event, results):
+        """ Check event has been rendered by previous run """
+        record = results.get(event.key)
+        return record is not None and record['status'] == 'ok' and\
+            os.path.exists(os.path.join(self.output, record['image']))
+
+    def group_events(self, events):
+        """ Group events by day """
+        groups = {}
+        for event in events:
+            groups.setdefault(event.date, []).append(event)
+
+        return list(groups.values())
+
+    def run(self, events):
+        """
+        Render events in pool of processes. Return list of results of run
+        """
+        os.makedirs(self.output, exist_ok=True)
+        results = self.read_manifest()
+        pending = [event for event in events if not self.is_done(event, results)]
+        records = []
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            futures = {executor.submit(render_events, self.output, self.image_format,
+                                       group): group
+                       for group in self.group_events(pending)}
+            for future in as_completed(futures):
+                try:
+                    group_records = future.result()
+                except Exception as e:
+                    group_records = [dict(event.to_dict(), status='error', image=None,
+                                          error=repr(e), seconds=0)
+                                     for event in futures[future]]
+                for record in group_records:
+                    self.write_result(record)
+                records.extend(group_records)
+
+        return records
+
+
+def split_instruments(instruments):
+    """ Split instruments to spectrometers, spectropolarimeters and time profiles """
+    spectropolarimeter = [name for name in instruments if name in Batch.SPECTROPOLARIMETERS]
+    time_profile = [name for name in instruments if name in Batch.TIME_PROFILES]
+    spectrometer = [name for name in instruments
+                    if name not in spectropolarimeter and name not in time_profile]
+
+    return spectrometer, spectropolarimeter, time_profile
+
+
+def load_group(builder, events):
+    """
+    Process files of instruments once for all events of the day.
+    Spectropolarimeters give all Stokes parameters of events from one read.
+    Return data of instruments by Stokes parameter and errors of instruments
+    which failed
+    """
+    time_from = min(event.time_from for event in events)
+    time_to = max(event.time_to for event in events)
+    instruments, products = [], []
+    for event in events:
+        instruments += [name for name in event.instruments if name not in instruments]
+        if event.stokes not in products:
+            products.append(event.stokes)
+
+    data, errors = {product: {} for product in products}, {}
+    for instrument in instruments:
+        try:
+            if instrument in Batch.SPECTROPOLARIMETERS:
+                instr_data = builder.get_products_data(events[0].date, time_from, time_to,
+                                                       [instrument], products)
+            else:
+                instr_data = dict.fromkeys(products, builder.get_instrument_data(
+                    events[0].date, time_from, time_to, [instrument], products[0]))
+            for product in products:
+                data[product].update(instr_data[product])
+        except Exception as e:
+            errors[instrument] = repr(e)
+
+    return data, errors, time_from
+
+
+def render_events(output, image_format, events):
+    """
+    Render events of one day in worker process. Return results for manifest
+    """
+    builder = Builder()
+    animation = Animation(builder)
+    records = []
+    data, errors, time_from = load_group(builder, events)
+    for event in events:
+        start = timer.perf_counter()
+        record = event.to_dict()
+        failed = [errors[name] for name in event.instruments if name in errors]
+        try:
+            if failed:
+                raise RuntimeError('; '.join(failed))
+            event_data = [{name: data[event.stokes][name] for name in category}
+                          for category in split_instruments(event.instruments)]
+            frame_data = animation.get_frame_data(
+                event_data, round(builder.time_to_seconds(time_from)),
+                round(builder.time_to_seconds(event.time_from)),
+                round(builder.time_to_seconds(event.time_to)))
+            builder.draw_spectrum(event.date, event.time_from, event.time_to, *frame_data,
+                                  event.stokes)
+            image_name = event.key + '.' + image_format
+            image_path = os.path.join(output, image_name)
+            with open(image_path + '.part', 'wb') as _f:
+                _f.write(builder.encode_figure(image_format))
+            os.replace(image_path + '.part', image_path)
+            record.update(status='ok', image=image_name, error=None)
+        except Exception as e:
+            record.update(status='error', image=None, error=repr(e))
+        record['seconds'] = round(timer.perf_counter() - start, 3)
+        records.append(record)
+    builder.release_figure()
+
+    return records
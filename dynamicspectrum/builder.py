@@ -1,15 +1,25 @@
 #!/usr/bin/env python3
 import os
+import io
 import errno
 import numpy as np
 import time
-import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import matplotlib.colors
 from datetime import datetime, date
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
 from matplotlib.gridspec import GridSpec
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.ticker import FixedLocator, FixedFormatter
 from dynamicspectrum.dynamicspectrum.instrumentFactory import InstrumentFactory
+from dynamicspectrum.dynamicspectrum.catalog import Catalog
+from dynamicspectrum.dynamicspectrum.transport import SharedResult, process_instrument
+from dynamicspectrum.dynamicspectrum.incremental import Incremental
+from dynamicspectrum.dynamicspectrum.download import Download
+from dynamicspectrum.dynamicspectrum.image_cache import ImageCache
+from dynamicspectrum.dynamicspectrum.regrid import Regrid
+from dynamicspectrum.dynamicspectrum.raster import RasterRenderer
 from dynamicspectrum.dynamicspectrum import exceptions
 
 
@@ -17,9 +27,47 @@ class Builder:
     """
     Class builds dynamic spectrum
     """
-    def __init__(self):
+    IMAGE_FORMATS = {'png': 'png', 'jpeg': 'jpeg', 'jpg': 'jpeg', 'webp': 'webp'}
+
+    def __init__(self, figure=None):
         self.factory = InstrumentFactory()
-        self.fig = plt.figure(num=1, figsize=(8, 6))
+        self.fig = figure if figure is not None else self.create_figure()
+        self.owns_figure = figure is None
+        self.grid = None
+        self.panels = {}
+        self.layout = None
+
+    @staticmethod
+    def create_figure():
+        """
+        Create figure owned by builder. Figure is not registered in pyplot,
+        so builders in different threads do not share global state
+        """
+        figure = Figure(figsize=(8, 6))
+        FigureCanvasAgg(figure)
+
+        return figure
+
+    def clear_figure(self):
+        """ Remove axes, images and lines of previous spectrum from figure """
+        self.fig.clf()
+        self.grid = None
+        self.panels = {}
+        self.layout = None
+
+    def release_figure(self):
+        """
+        Release data of instruments after figure is saved, so arrays are not
+        kept until the next request. Axes and artists stay as template of the
+        next figure of the same layout. Figure passed by user is kept to be shown
+        """
+        if not self.owns_figure:
+            return
+        for axis in self.fig.axes:
+            for image in axis.images:
+                image.set_data(np.zeros((1, 1)))
+            for line in axis.lines:
+                line.set_data([], [])
 
     def get_instrument_data(self, date_event, time_from, time_to, instruments, stokes):
         """
@@ -28,11 +76,53 @@ class Builder:
         calculated_data = {}
         for instrument in instruments:
             instr_instance = self.factory.get_instrument(instrument, stokes)
-            instr_data = instr_instance.get_data(date_event, time_from, time_to)
+            if self.has_coverage(instrument, instr_instance, date_event, time_from, time_to):
+                instr_data = instr_instance.get_data(date_event, time_from, time_to)
+            else:
+                instr_data = instr_instance.create_empty_data()
             calculated_data[instrument] = instr_data
 
         return calculated_data
 
+    def get_instrument_data_parallel(self, executor, shared, date_event, time_from,
+                                     time_to, instruments, stokes):
+        """
+        Get data of instruments in worker processes. Arrays are passed through
+        shared memory and stay valid until shared result is released. Results
+        of all workers are imported before error of any worker is raised, so
+        shared result removes their blocks
+        """
+        futures = {instrument: executor.submit(process_instrument, instrument, stokes,
+                                               date_event, time_from, time_to)
+                   for instrument in instruments}
+        calculated_data = {}
+        error = None
+        for instrument, future in futures.items():
+            try:
+                calculated_data[instrument] = shared.import_data(future.result())
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+        return calculated_data
+
+    def has_coverage(self, name, instrument, date_event, time_from, time_to):
+        """
+        Check catalog of observations before downloading instrument file.
+        Instruments without record in catalog and files of the current UT day,
+        which are still growing, are considered to have data
+        """
+        if Download.is_current_day(date_event):
+            return True
+        record = Catalog().get_record(name, date_event)
+        if record is None or not hasattr(instrument, 'has_observation'):
+            return True
+
+        return instrument.has_observation(self.time_to_seconds(time_from),
+                                          self.time_to_seconds(time_to),
+                                          record['time_obs'], record['time_end'])
+
     def time_to_seconds(self, time_value):
         """ Convert time to seconds """
         timedelta = datetime.combine(date.min, time_value) - datetime.min
@@ -79,6 +169,15 @@ class Builder:
         axis.xaxis.set_minor_locator(ticker.AutoMinorLocator(5))
         axis.yaxis.set_major_formatter(FixedFormatter([1000.0, 100.0, 1.0, 0.1]))
         axis.yaxis.set_major_locator(FixedLocator([0, 0.25, 0.52, 0.75]))
+        self.panels['general'] = axis
+
+        return axis
+
+    def update_general_plot(self, date, time_axis):
+        """ Replace date and time labels of plot with subscriptions """
+        axis = self.panels['general']
+        axis.set_title(date.strftime("%Y-%m-%d"), pad=20)
+        axis.set_xticklabels(time_axis)
 
         return axis
 
@@ -105,7 +204,7 @@ class Builder:
         """ Display polarization spectrum """
         cmap = matplotlib.colors.LinearSegmentedColormap.from_list("", ['grey', 'black'])
         if instr == 'amateras':
-            norm = plt.Normalize(-1, 1)
+            norm = matplotlib.colors.Normalize(-1, 1)
             axis.imshow(array, cmap=cmap, norm=norm, aspect='auto',
                         interpolation='bilinear')
         elif instr == 'orfees':
@@ -139,6 +238,8 @@ class Builder:
         axis = self.fig.add_subplot(grid[750:1000, :columns])
         srh = axis.twinx().twiny()
         srh.plot(data['time'], data['flux'], color='green')
+        for profile in data.get('frequencies', {}).values():
+            srh.plot(profile['time'], profile['flux'], linewidth=0.8, alpha=0.6)
         srh.set_xlim(data['ncols'][0], data['ncols'][1])
         srh.set(yticks=[])
         srh.set(xticks=[])
@@ -153,16 +254,18 @@ class Builder:
                                  instr_data[instr]['ncols'])
             self.display_intensity(axis, instr_data[instr]['array'])
             self.add_label(axis, instr)
+            self.panels[instr] = axis
 
     def add_spectropolarimeter(self, grid, instr_data, stokes_parameter):
-        """ Build spectrum of AMATERAS and ORFEES """
+        """ Build spectrum of AMATERAS, ORFEES and ASSA """
         for instr in instr_data.keys():
             axis = self.set_axis(grid, instr_data[instr]['nrows'],
                                  instr_data[instr]['ncols'])
-            if stokes_parameter == 'I':
+            if instr_data[instr].get('parameter', stokes_parameter) == 'I':
                 self.display_intensity(axis, instr_data[instr]['array'])
-            elif stokes_parameter == 'V':
+            elif stokes_parameter in ['V', 'V/I']:
                 self.display_polarization(axis, instr_data[instr]['array'], instr)
+            self.panels[instr] = axis
 
     def add_time_profile(self, grid, instr_data, columns):
         """
@@ -170,11 +273,11 @@ class Builder:
         """
         for instr in instr_data.keys():
             if instr == 'goes':
-                self.display_goes(grid, instr_data['goes'], columns)
+                self.panels[instr] = self.display_goes(grid, instr_data['goes'], columns)
             elif instr == 'srh':
-                self.display_srh(grid, instr_data['srh'], columns)
+                self.panels[instr] = self.display_srh(grid, instr_data['srh'], columns)
             elif instr == 'goes17':
-                self.display_goes(grid, instr_data['goes17'], columns)
+                self.panels[instr] = self.display_goes(grid, instr_data['goes17'], columns)
 
     def add_label(self, axis, name):
         """ Add instrument name to plot """
@@ -207,25 +310,62 @@ class Builder:
 
         return axis
 
-    def combine_spectrum(self, date_event, time_from, time_to, spectrometer,
-                         spectropolarimeter, time_profile, stokes):
+    def get_products_data(self, date_event, time_from, time_to, instruments, products):
         """
-        Create dynamic spectrum for certain period of time
+        Get data of several Stokes parameters for each instrument.
+        Instruments with several products process their file once
+        """
+        calculated_data = {product: {} for product in products}
+        for instrument in instruments:
+            instr_instance = self.factory.get_instrument(instrument, products[0])
+            if not self.has_coverage(instrument, instr_instance, date_event, time_from,
+                                     time_to):
+                instr_data = {product: instr_instance.create_empty_data()
+                              for product in products}
+            elif hasattr(instr_instance, 'get_products'):
+                instr_data = instr_instance.get_products(date_event, time_from, time_to,
+                                                         products)
+            else:
+                instr_data = {product: self.factory.get_instrument(
+                    instrument, product).get_data(date_event, time_from, time_to)
+                    for product in products}
+            for product in products:
+                calculated_data[product][instrument] = instr_data[product]
+
+        return calculated_data
+
+    def render_spectrum(self, date_event, time_from, time_to, spectrometer_data,
+                        spectropolarimeter_data, time_profile_data, stokes):
+        """
+        Build figure of dynamic spectrum from data of instruments and save it
+        """
+        self.draw_spectrum(date_event, time_from, time_to, spectrometer_data,
+                           spectropolarimeter_data, time_profile_data, stokes)
+
+        return self.save_figure(date_event, time_from, time_to, stokes)
+
+    def draw_spectrum(self, date_event, time_from, time_to, spectrometer_data,
+                      spectropolarimeter_data, time_profile_data, stokes):
+        """
+        Build figure of dynamic spectrum from data of instruments
         """
-        spectrometer_data = self.get_instrument_data(
-            date_event, time_from, time_to, spectrometer, stokes)
-        spectropolarimeter_data = self.get_instrument_data(
-            date_event, time_from, time_to, spectropolarimeter, stokes)
-        time_profile_data = self.get_instrument_data(
-            date_event, time_from, time_to, time_profile, stokes)
         start_axis = round(self.time_to_seconds(time_from))
         end_axis = round(self.time_to_seconds(time_to))
         all_columns = self.define_columns_of_grid(start_axis, end_axis)
         time_axis = self.create_time_axis_label(start_axis, end_axis)
 
-        plt.subplots_adjust(hspace=0, wspace=0)
+        layout = self.get_layout(all_columns, time_axis, spectrometer_data,
+                                 spectropolarimeter_data, time_profile_data, stokes)
+        if layout == self.layout and self.update_spectrum(
+                spectrometer_data, spectropolarimeter_data, time_profile_data, stokes):
+            self.update_general_plot(date_event, time_axis)
+            return
+
+        self.clear_figure()
+        self.fig.subplots_adjust(hspace=0, wspace=0)
         grid_general = GridSpec(1000, 1, figure=self.fig)
         grid = GridSpec(1000, all_columns, figure=self.fig)
+        self.grid = grid
 
         self.add_spectrometer(grid, spectrometer_data)
         self.add_spectropolarimeter_label(grid, all_columns)
@@ -236,20 +376,379 @@ class Builder:
         self.add_empty_background(grid, [700, 750], all_columns, '#aeabab')
 
         self.create_general_plot(grid_general, date_event, time_axis)
+        self.layout = layout
+
+    def get_layout(self, columns, time_axis, spectrometer_data, spectropolarimeter_data,
+                   time_profile_data, stokes):
+        """
+        Return key of figure layout. Figures of the same layout differ only
+        by data of images and lines, so axes are built once
+        """
+        return (columns, time_axis.shape[0], tuple(spectrometer_data),
+                tuple((instr, data.get('parameter', stokes))
+                      for instr, data in spectropolarimeter_data.items()),
+                tuple(time_profile_data), stokes)
+
+    def update_spectrum(self, spectrometer_data, spectropolarimeter_data,
+                        time_profile_data, stokes):
+        """
+        Replace data of images and lines in figure built for the same layout.
+        Return False if some panel can not be updated and figure is built again
+        """
+        for instr, data in spectrometer_data.items():
+            if not self.update_spectrum_panel(self.panels[instr], data):
+                return False
+        for instr, data in spectropolarimeter_data.items():
+            fixed_norm = instr == 'amateras' and data.get('parameter', stokes) != 'I'
+            if not self.update_spectrum_panel(self.panels[instr], data,
+                                              autoscale=not fixed_norm):
+                return False
+        for instr, data in time_profile_data.items():
+            if not self.update_profile_panel(self.panels[instr], data):
+                return False
+
+        return True
+
+    def get_spectra(self, instruments_data, stokes):
+        """
+        Return instrument names, data and frequency tables of spectra.
+        Frequency table read from file is kept in data, constants of
+        instrument are used for files without table
+        """
+        spectra = []
+        for instr, instr_data in instruments_data.items():
+            if 'array' in instr_data and instr_data['array'].size > 0:
+                channels = instr_data['array'].shape[0]
+                frequencies = instr_data.get('frequencies')
+                if frequencies is None or len(frequencies) != channels:
+                    frequencies = self.factory.get_instrument(
+                        instr, stokes).get_frequencies(channels)
+                spectra.append((instr, instr_data, frequencies))
+
+        return spectra
+
+    def set_frequency_axis(self, axis, regrid):
+        """ Label log-frequency axis of regridded spectrum """
+        ticks = [freq for freq in [0.01, 0.1, 1, 10, 100, 1000]
+                 if regrid.freq_min <= freq <= regrid.freq_max]
+        axis.set_yticks(np.log10(ticks))
+        axis.set_yticklabels([str(freq) for freq in ticks])
+        axis.set_ylabel('Frequency (MHz)')
+
+        return axis
+
+    def draw_regridded_spectrum(self, date_event, time_from, time_to, spectrometer_data,
+                                spectropolarimeter_data, time_profile_data, stokes,
+                                regrid=None):
+        """
+        Build figure of dynamic spectrum regridded on one log-frequency raster.
+        Spectrum is drawn by one image, time profiles are drawn over it
+        """
+        regrid = regrid or Regrid()
+        start_axis = round(self.time_to_seconds(time_from))
+        end_axis = round(self.time_to_seconds(time_to))
+        all_columns = self.define_columns_of_grid(start_axis, end_axis)
+        spectra = self.get_spectra(dict(spectrometer_data, **spectropolarimeter_data),
+                                   stokes)
+        raster = regrid.create_raster(spectra, all_columns, stokes)
+
+        self.clear_figure()
+        axis = self.fig.add_subplot(1, 1, 1)
+        cmap = matplotlib.colors.LinearSegmentedColormap.from_list(
+            '', ['white', 'black'] if stokes == 'I' else ['grey', 'black'])
+        cmap.set_bad('#aeabab')
+        log_edges = regrid.get_row_edges()
+        axis.imshow(raster[::-1], cmap=cmap, vmin=0, vmax=1, aspect='auto',
+                    interpolation='nearest',
+                    extent=(0, all_columns, log_edges[0], log_edges[-1]))
+        self.set_frequency_axis(axis, regrid)
+        axis.invert_yaxis()
 
+        time_axis = self.create_time_axis_label(start_axis, end_axis)
+        axis.set_xticks(np.linspace(0, all_columns, time_axis.shape[0]))
+        axis.set_xticklabels(time_axis)
+        axis.set_xlabel('Time (UT)')
+        axis.set_title(date_event.strftime("%Y-%m-%d"), pad=20)
+        self.panels['spectrum'] = axis
+
+        colors = {'goes': 'red', 'goes17': 'red', 'srh': 'green'}
+        for instr, instr_data in time_profile_data.items():
+            if not isinstance(instr_data['time'], np.ndarray) or instr_data['time'].size == 0:
+                continue
+            profile = axis.twinx().twiny()
+            profile.plot(instr_data['time'], instr_data['flux'],
+                         color=colors.get(instr, 'blue'))
+            if instr in ['goes', 'goes17']:
+                profile.set_yscale('log')
+            profile.set_xlim(instr_data['ncols'][0], instr_data['ncols'][1])
+            profile.set(yticks=[])
+            profile.set(xticks=[])
+            profile.set_yticks([], minor=True)
+            self.panels[instr] = profile
+
+        return raster
+
+    def combine_regridded_spectrum(self, date_event, time_from, time_to, spectrometer,
+                                   spectropolarimeter, time_profile, stokes):
+        """
+        Create dynamic spectrum of instruments regridded on one log-frequency raster
+        """
+        data = [self.get_instrument_data(date_event, time_from, time_to, instruments,
+                                         stokes)
+                for instruments in [spectrometer, spectropolarimeter, time_profile]]
+        self.draw_regridded_spectrum(date_event, time_from, time_to, *data, stokes)
         figure = self.save_figure(date_event, time_from, time_to, stokes)
+        self.release_figure()
+
+        return figure
+
+    def render_raster_image(self, date_event, time_from, time_to, spectrometer,
+                            spectropolarimeter, time_profile, stokes, image_format='png',
+                            quality=None, renderer=None):
+        """
+        Create dynamic spectrum without matplotlib and return encoded image bytes.
+        Spectra are regridded straight to pixels of plot area
+        """
+        renderer = renderer or RasterRenderer()
+        spectrometer_data, spectropolarimeter_data, time_profile_data = [
+            self.get_instrument_data(date_event, time_from, time_to, instruments, stokes)
+            for instruments in [spectrometer, spectropolarimeter, time_profile]]
+        start_axis = round(self.time_to_seconds(time_from))
+        end_axis = round(self.time_to_seconds(time_to))
 
-        plt.show()
+        columns, rows = renderer.plot_size
+        regrid = Regrid(rows=rows, columns=columns)
+        spectra = self.get_spectra(dict(spectrometer_data, **spectropolarimeter_data),
+                                   stokes)
+        raster = regrid.create_raster(spectra, end_axis - start_axis, stokes)
+
+        return renderer.render(raster, date_event.strftime("%Y-%m-%d"),
+                               self.create_time_axis_label(start_axis, end_axis),
+                               time_profile_data, stokes, regrid.freq_min,
+                               regrid.freq_max, image_format, quality)
+
+    def combine_spectrum(self, date_event, time_from, time_to, spectrometer,
+                         spectropolarimeter, time_profile, stokes):
+        """
+        Create dynamic spectrum for certain period of time
+        """
+        spectrometer_data = self.get_instrument_data(
+            date_event, time_from, time_to, spectrometer, stokes)
+        spectropolarimeter_data = self.get_instrument_data(
+            date_event, time_from, time_to, spectropolarimeter, stokes)
+        time_profile_data = self.get_instrument_data(
+            date_event, time_from, time_to, time_profile, stokes)
+
+        figure = self.render_spectrum(date_event, time_from, time_to, spectrometer_data,
+                                      spectropolarimeter_data, time_profile_data, stokes)
+        self.release_figure()
 
         return figure
 
+    @staticmethod
+    def is_empty(instr_data):
+        """ Determine instrument has no data for time window """
+        if 'array' in instr_data:
+            return np.size(instr_data['array']) == 0
+        return np.ndim(instr_data['flux']) == 0 or np.size(instr_data['flux']) == 0
+
+    def render_image(self, date_event, time_from, time_to, spectrometer,
+                     spectropolarimeter, time_profile, stokes, image_format='png',
+                     quality=None):
+        """
+        Create dynamic spectrum and return encoded image bytes.
+        Figure is rendered in memory by Agg canvas, nothing is written to disk
+        """
+        return self.create_image(date_event, time_from, time_to, spectrometer,
+                                 spectropolarimeter, time_profile, stokes, image_format,
+                                 quality)['image']
+
+    def create_image(self, date_event, time_from, time_to, spectrometer,
+                     spectropolarimeter, time_profile, stokes, image_format='png',
+                     quality=None):
+        """
+        Render image and determine all instruments have data. Image without
+        data of some instrument may change when its file becomes available
+        """
+        data = [self.get_instrument_data(date_event, time_from, time_to, instruments,
+                                         stokes)
+                for instruments in [spectrometer, spectropolarimeter, time_profile]]
+        self.draw_spectrum(date_event, time_from, time_to, *data, stokes)
+        image = self.encode_figure(image_format, quality)
+        self.release_figure()
+        complete = not any(self.is_empty(instr_data) for category in data
+                           for instr_data in category.values())
+
+        return {'image': image, 'complete': complete}
+
+    def get_image(self, date_event, time_from, time_to, spectrometer, spectropolarimeter,
+                  time_profile, stokes, image_format='png', quality=None, etag=None):
+        """
+        Return image of dynamic spectrum from cache or render it.
+        Cache is checked before data of instruments is processed. If ETag of
+        client matches the image, status 304 is returned without image.
+        Images of the current UT day and images where some instrument has
+        no data are not cached, because they may change later
+        """
+        if Download.is_current_day(date_event):
+            image = self.render_image(date_event, time_from, time_to, spectrometer,
+                                      spectropolarimeter, time_profile, stokes,
+                                      image_format, quality)
+            return {'status': 200, 'etag': None, 'image': image}
+
+        cache = ImageCache()
+        key = cache.create_key(date_event, time_from, time_to, spectrometer,
+                               spectropolarimeter, time_profile, stokes, image_format,
+                               quality)
+        cached = cache.get(key)
+        if cached is not None and etag == cached[1]:
+            return {'status': 304, 'etag': etag, 'image': None}
+        if cached is not None:
+            return {'status': 200, 'etag': cached[1], 'image': cached[0]}
+
+        rendered = self.create_image(date_event, time_from, time_to, spectrometer,
+                                     spectropolarimeter, time_profile, stokes,
+                                     image_format, quality)
+        if not rendered['complete']:
+            return {'status': 200, 'etag': None, 'image': rendered['image']}
+
+        return {'status': 200, 'etag': cache.put(key, rendered['image']),
+                'image': rendered['image']}
+
+    def encode_figure(self, image_format='png', quality=None):
+        """ Encode figure to PNG, JPEG or WebP bytes in memory buffer """
+        image_format = image_format.lower()
+        if image_format not in self.IMAGE_FORMATS:
+            raise exceptions.UnsupportedImageFormat(
+                "Image format is not supported: " + image_format)
+        pil_kwargs = {}
+        if quality is not None and image_format != 'png':
+            pil_kwargs['quality'] = quality
+
+        original_canvas = self.fig.canvas
+        buffer = io.BytesIO()
+        try:
+            FigureCanvasAgg(self.fig).print_figure(
+                buffer, format=self.IMAGE_FORMATS[image_format], dpi=self.fig.dpi,
+                pil_kwargs=pil_kwargs)
+        finally:
+            self.fig.set_canvas(original_canvas)
+
+        return buffer.getvalue()
+
+    def combine_spectrum_parallel(self, date_event, time_from, time_to, spectrometer,
+                                  spectropolarimeter, time_profile, stokes, processes=None):
+        """
+        Create dynamic spectrum processing instruments in pool of processes
+        """
+        with ProcessPoolExecutor(max_workers=processes) as executor, SharedResult() as shared:
+            data = [self.get_instrument_data_parallel(executor, shared, date_event,
+                                                      time_from, time_to, instruments, stokes)
+                    for instruments in [spectrometer, spectropolarimeter, time_profile]]
+            figure = self.render_spectrum(date_event, time_from, time_to, *data, stokes)
+            self.release_figure()
+
+        return figure
+
+    def update_spectrum_panel(self, axis, data, autoscale=True):
+        """
+        Replace image of spectrum panel and stretch panel to new time range.
+        Columns appended by incremental refresh are drawn by additional image,
+        columns already shown are not copied again
+        """
+        if data['array'].size == 0 or not axis.images:
+            return False
+        axis.set_subplotspec(self.grid[data['nrows'][0]:data['nrows'][1],
+                                       data['ncols'][0]:data['ncols'][1]])
+        rows, columns = data['array'].shape
+        shown = [image.get_array().shape for image in axis.images]
+        appended = data.get('appended')
+        if appended is not None and {shape[0] for shape in shown} == {rows} and\
+                sum(shape[1] for shape in shown) + appended == columns:
+            if appended:
+                self.append_spectrum_image(axis, data['array'][:, columns - appended:],
+                                           columns - appended, autoscale)
+        else:
+            for extra in axis.images[1:]:
+                extra.remove()
+            image = axis.images[0]
+            image.set_data(data['array'])
+            if autoscale:
+                image.autoscale()
+            image.set_extent((-0.5, columns - 0.5, rows - 0.5, -0.5))
+        axis.set_xlim(-0.5, columns - 0.5)
+        return True
+
+    def append_spectrum_image(self, axis, array, start, autoscale=True):
+        """
+        Draw columns of spectrum after column start. New image shares color
+        scale of panel, scale is widened to values of new columns
+        """
+        image = axis.images[0]
+        if autoscale:
+            image.norm.vmin = min(image.norm.vmin, np.nanmin(array))
+            image.norm.vmax = max(image.norm.vmax, np.nanmax(array))
+        rows, columns = array.shape
+        axis.imshow(array, cmap=image.get_cmap(), norm=image.norm, aspect='auto',
+                    interpolation=image.get_interpolation(),
+                    extent=(start - 0.5, start + columns - 0.5, rows - 0.5, -0.5))
+
+    def update_profile_panel(self, axis, data):
+        """ Replace lines of time profile panel """
+        profiles = [data] + list(data.get('frequencies', {}).values())
+        if not isinstance(data['time'], np.ndarray) or len(axis.lines) != len(profiles):
+            return False
+        for line, profile in zip(axis.lines, profiles):
+            line.set_data(profile['time'], profile['flux'])
+        axis.set_xlim(data['ncols'][0], data['ncols'][1])
+        axis.relim()
+        axis.autoscale_view(scalex=False)
+        return True
+
+    def refresh_spectrum(self, date_event, time_from, time_to, spectrometer,
+                         spectropolarimeter, time_profile, stokes):
+        """
+        Update dynamic spectrum of the current UT day. Instruments process
+        only samples added since the previous refresh, existing panels get
+        new data instead of building figure again
+        """
+        incremental = Incremental()
+        data = [incremental.get_instrument_data(date_event, time_from, time_to,
+                                                instruments, stokes)
+                for instruments in [spectrometer, spectropolarimeter, time_profile]]
+
+        return self.render_spectrum(date_event, time_from, time_to, *data, stokes)
+
+    def combine_products(self, date_event, time_from, time_to, spectrometer,
+                         spectropolarimeter, time_profile, products=('I', 'V')):
+        """
+        Create dynamic spectra of several Stokes parameters (I, V, V/I).
+        Data of each instrument is processed once for all figures
+        """
+        products = list(products)
+        spectrometer_data = self.get_instrument_data(
+            date_event, time_from, time_to, spectrometer, products[0])
+        spectropolarimeter_data = self.get_products_data(
+            date_event, time_from, time_to, spectropolarimeter, products)
+        time_profile_data = self.get_instrument_data(
+            date_event, time_from, time_to, time_profile, products[0])
+
+        figures = []
+        for product in products:
+            figures.append(self.render_spectrum(
+                date_event, time_from, time_to, spectrometer_data,
+                spectropolarimeter_data[product], time_profile_data, product))
+        self.release_figure()
+
+        return figures
+
     def save_figure(self, date, time_from, time_to, stokes_parameter):
         """ Save figure in the folder """
         date_part = date.strftime('%Y%m%d')
         time_from_part = time_from.strftime('%H%M')
         time_to_part = time_to.strftime('%H%M')
         fig_name = date_part + '_' + time_from_part + '_' + time_to_part +\
-            '_' + stokes_parameter + '.jpg'
+            '_' + stokes_parameter.replace('/', '') + '.jpg'
         folder = 'plots/'
 
         if not os.path.exists(folder):
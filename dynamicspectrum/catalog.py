@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+""" The class for catalog of instrument observations """
+import os
+import time
+import sqlite3
+import threading
+from dynamicspectrum.dynamicspectrum.download import SingletonMeta
+
+
+class Catalog(metaclass=SingletonMeta):
+    """
+    This class stores observation parameters of instrument files.
+    Records are filled from file headers, so availability of data can be
+    checked before any file is downloaded or decoded
+    """
+    DB_PATH = os.path.join('data', 'catalog.sqlite')
+
+    FIELDS = ['instrument', 'date', 'time_obs', 'time_end', 'cadence', 'freq_min',
+              'freq_max', 'channels', 'file_size', 'file_path']
+    FILE_FIELDS = ['file_path', 'folder', 'file_size', 'accessed']
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = {}
+        self.pid = None
+        self.connection = None
+
+    def connect(self):
+        """
+        Return connection to database. Reconnect in forked processes
+        """
+        if self.connection is None or self.pid != os.getpid():
+            folder = os.path.dirname(self.DB_PATH)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder, exist_ok=True)
+            self.connection = sqlite3.connect(self.DB_PATH, timeout=30,
+                                              check_same_thread=False)
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS observations ('
+                'instrument TEXT NOT NULL, date TEXT NOT NULL, time_obs REAL, '
+                'time_end REAL, cadence REAL, freq_min REAL, freq_max REAL, '
+                'channels INTEGER, file_size INTEGER, file_path TEXT, '
+                'PRIMARY KEY (instrument, date))')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS files ('
+                'file_path TEXT PRIMARY KEY, folder TEXT, file_size INTEGER, accessed REAL)')
+            self.connection.commit()
+            self.pid = os.getpid()
+            self.records = {}
+
+        return self.connection
+
+    @staticmethod
+    def create_date_part(date):
+        """ Create the date key of record """
+        return date.strftime('%Y-%m-%d')
+
+    def add_record(self, instrument, date, file_path, time_obs, time_end, cadence,
+                   freq_min, freq_max, channels):
+        """
+        Add observation parameters of instrument file to catalog.
+        Record which is already stored with the same values is not written again
+        """
+        file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        record = dict(zip(self.FIELDS, [instrument, self.create_date_part(date),
+                                        time_obs, time_end, cadence, freq_min,
+                                        freq_max, channels, file_size, file_path]))
+        if self.get_record(instrument, date) == record:
+            return record
+        with self.lock:
+            connection = self.connect()
+            connection.execute(
+                'INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [record[field] for field in self.FIELDS])
+            connection.commit()
+            self.records[(instrument, record['date'])] = record
+
+        return record
+
+    def has_record(self, instrument, date, file_path):
+        """
+        Determine catalog has record of the same file. Record of file which
+        was compressed or has grown since it was added is outdated
+        """
+        record = self.get_record(instrument, date)
+        return record is not None and record['file_path'] == file_path and\
+            os.path.exists(file_path) and record['file_size'] == os.path.getsize(file_path)
+
+    def ingest(self, instrument, name, date, file_path):
+        """
+        Read header of instrument file and add it to catalog
+        """
+        record = instrument.get_catalog_record(file_path)
+        return self.add_record(name, date, file_path, **record)
+
+    def get_record(self, instrument, date):
+        """
+        Return observation parameters of instrument for the day or None
+        """
+        key = (instrument, self.create_date_part(date))
+        with self.lock:
+            connection = self.connect()
+            if key not in self.records:
+                row = connection.execute(
+                    'SELECT * FROM observations WHERE instrument = ? AND date = ?',
+                    key).fetchone()
+                self.records[key] = dict(zip(self.FIELDS, row)) if row else None
+
+            return self.records[key]
+
+    def get_records(self, instruments, date_from, date_to):
+        """
+        Return records of instruments for range of dates
+        """
+        placeholders = ', '.join('?' * len(instruments))
+        query = 'SELECT * FROM observations WHERE instrument IN (' + placeholders +\
+            ') AND date BETWEEN ? AND ? ORDER BY instrument, date'
+        params = list(instruments) + [self.create_date_part(date_from),
+                                      self.create_date_part(date_to)]
+        with self.lock:
+            rows = self.connect().execute(query, params).fetchall()
+
+        return [dict(zip(self.FIELDS, row)) for row in rows]
+
+    def remove_record(self, instrument, date):
+        """ Remove record of instrument for the day """
+        key = (instrument, self.create_date_part(date))
+        with self.lock:
+            connection = self.connect()
+            connection.execute(
+                'DELETE FROM observations WHERE instrument = ? AND date = ?', key)
+            connection.commit()
+            self.records.pop(key, None)
+
+    def touch_file(self, file_path, accessed=None, replace=True):
+        """
+        Set access time of local file. Existing access time is kept
+        if replace is False
+        """
+        if not os.path.exists(file_path):
+            return
+        folder = os.path.basename(os.path.dirname(file_path))
+        values = [file_path, folder, os.path.getsize(file_path),
+                  time.time() if accessed is None else accessed]
+        query = 'INSERT OR REPLACE' if replace else 'INSERT OR IGNORE'
+        with self.lock:
+            connection = self.connect()
+            connection.execute(query + ' INTO files VALUES (?, ?, ?, ?)', values)
+            connection.commit()
+
+    def get_files(self):
+        """ Return local files from the least recently used """
+        with self.lock:
+            rows = self.connect().execute(
+                'SELECT * FROM files ORDER BY accessed, file_path').fetchall()
+
+        return [dict(zip(self.FILE_FIELDS, row)) for row in rows]
+
+    def remove_file(self, file_path):
+        """ Remove local file from catalog """
+        with self.lock:
+            connection = self.connect()
+            connection.execute('DELETE FROM files WHERE file_path = ?', [file_path])
+            connection.commit()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+""" The class for coverage timeline of instruments """
+import os
+import re
+from datetime import datetime, timedelta
+from dynamicspectrum.dynamicspectrum.instrumentFactory import InstrumentFactory
+from dynamicspectrum.dynamicspectrum.catalog import Catalog
+
+
+class Coverage:
+    """
+    This class returns observation intervals of instruments for range of dates.
+    Intervals are taken from catalog of observations, local files without
+    records are added to catalog from their headers
+    """
+    FILE_PATTERNS = {
+        'amateras': ('AMATERAS', r'^(\d{8})_IPRT\.fits(\.gz|\.fz)?$'),
+        'orfees': ('ORFEES', r'^int_orf(\d{8}).*\.fts(\.gz)?$'),
+        'wind1': ('WIND1', r'^(\d{8})\.R1(\.gz)?$'),
+        'wind2': ('WIND2', r'^(\d{8})\.R2(\.gz)?$'),
+        'stereo': ('STEREO', r'^swaves_average_(\d{8})_a\.sav(\.gz)?$'),
+        'goes': ('GOES', r'^go\d{2}(\d{8})\.fits(\.gz|\.fz)?$'),
+        'srh': ('SRH', r'^srh_cp_(\d{8})\.fits(\.gz|\.fz)?$'),
+        'assa': ('ASSA', r'^\D*(\d{8}).*\.fits?(\.gz|\.fz)?$'),
+    }
+
+    def __init__(self):
+        self.factory = InstrumentFactory()
+
+    def find_local_files(self, instrument, date_from, date_to):
+        """
+        Return local files of instrument by date for range of dates
+        """
+        folder, pattern = self.FILE_PATTERNS[instrument]
+        path = os.path.join('data', folder)
+        first, last = date_from.strftime('%Y%m%d'), date_to.strftime('%Y%m%d')
+        files = {}
+        if not os.path.exists(path):
+            return files
+
+        for name in sorted(os.listdir(path)):
+            match = re.match(pattern, name)
+            if match and first <= match.group(1) <= last:
+                files.setdefault(match.group(1), os.path.join(path, name))
+
+        return files
+
+    def ingest_local_files(self, instruments, date_from, date_to, records):
+        """
+        Add headers of local files without records to catalog
+        """
+        known = set((rec['instrument'], rec['date'].replace('-', '')) for rec in records)
+        new_records = []
+        for instrument in instruments:
+            files = self.find_local_files(instrument, date_from, date_to)
+            instr_instance = None
+            for date_part, file_path in files.items():
+                if (instrument, date_part) in known:
+                    continue
+                if instr_instance is None:
+                    instr_instance = self.factory.get_instrument(instrument, 'I')
+                try:
+                    date = datetime.strptime(date_part, '%Y%m%d')
+                    new_records.append(Catalog().ingest(instr_instance, instrument,
+                                                        date, file_path))
+                except (OSError, KeyError, ValueError, IndexError):
+                    print(instrument.upper() + ' header can not be read: ' + file_path)
+
+        return new_records
+
+    @staticmethod
+    def get_interval(record):
+        """
+        Return observation interval of record. Observation started before
+        midnight belongs to the previous day
+        """
+        day = datetime.strptime(record['date'], '%Y-%m-%d')
+        start = day + timedelta(seconds=record['time_obs'])
+        end = day + timedelta(seconds=record['time_end'])
+        if record['time_obs'] > record['time_end']:
+            start -= timedelta(days=1)
+
+        return start, end
+
+    @staticmethod
+    def merge_intervals(intervals, gap):
+        """ Merge intervals separated by less than gap seconds """
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and (start - merged[-1][1]).total_seconds() <= gap:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        return [tuple(interval) for interval in merged]
+
+    def get_timeline(self, date_from, date_to, instruments=None, gap=60):
+        """
+        Return observation intervals of instruments for range of dates
+        """
+        instruments = instruments or list(self.FILE_PATTERNS.keys())
+        records = Catalog().get_records(instruments, date_from, date_to)
+        records += self.ingest_local_files(instruments, date_from, date_to, records)
+
+        intervals = {instrument: [] for instrument in instruments}
+        for record in records:
+            intervals[record['instrument']].append(self.get_interval(record))
+
+        return {instrument: self.merge_intervals(intervals[instrument], gap)
+                for instrument in instruments}
+
+    def get_days(self, date_from, date_to, instruments=None):
+        """
+        Return dates with data for each instrument
+        """
+        instruments = instruments or list(self.FILE_PATTERNS.keys())
+        records = Catalog().get_records(instruments, date_from, date_to)
+        records += self.ingest_local_files(instruments, date_from, date_to, records)
+
+        days = {instrument: [] for instrument in instruments}
+        for record in records:
+            days[record['instrument']].append(
+                datetime.strptime(record['date'], '%Y-%m-%d').date())
+
+        return {instrument: sorted(set(days[instrument])) for instrument in instruments}
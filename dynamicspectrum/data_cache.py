@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+""" The class for size-bounded cache of instrument files """
+import os
+import time
+import threading
+from contextlib import contextmanager
+from dynamicspectrum.dynamicspectrum.download import Download, SingletonMeta
+from dynamicspectrum.dynamicspectrum.catalog import Catalog
+
+
+class DataCache(metaclass=SingletonMeta):
+    """
+    This class keeps size of data folder within limits. Access times of files
+    are stored in catalog, the least recently used files are removed when
+    total size or budget of instrument folder is exceeded.
+    Instruments touch file each time they resolve its path and hold shared
+    lock while file is open, locked file is not removed. A file is also kept
+    MIN_AGE seconds after it is touched, so it is not removed between
+    resolving its path and opening it
+    """
+    MAX_SIZE = 50 * 1024 ** 3
+    BUDGETS = {}
+    MIN_AGE = 60
+    SERVICE_FILES = ('.part', '.tail', '.meta.json', '.lock', '.sqlite', '.json')
+
+    def __init__(self, max_size=None, budgets=None):
+        self.max_size = max_size or self.MAX_SIZE
+        self.budgets = dict(self.BUDGETS, **(budgets or {}))
+        self.scanned = False
+        self.lock = threading.Lock()
+
+    def touch(self, file_path):
+        """ Set access time of file to now """
+        Catalog().touch_file(file_path)
+
+    @contextmanager
+    def reading(self, file_path):
+        """ Hold shared lock of file while it is read """
+        with Download().lock_file(file_path, shared=True):
+            yield
+
+    def scan(self):
+        """
+        Add local files which are not in catalog with access time of file system.
+        Remove files deleted by user from catalog
+        """
+        known = set(record['file_path'] for record in Catalog().get_files())
+        for folder in Download.FOLDERS:
+            path = os.path.join('data', folder)
+            if not os.path.exists(path):
+                continue
+            for name in os.listdir(path):
+                file_path = os.path.join(path, name)
+                if name.endswith(self.SERVICE_FILES) or not os.path.isfile(file_path):
+                    continue
+                if file_path not in known:
+                    Catalog().touch_file(file_path, os.path.getatime(file_path),
+                                         replace=False)
+
+        for file_path in known:
+            if not os.path.exists(file_path):
+                Catalog().remove_file(file_path)
+        self.scanned = True
+
+    @staticmethod
+    def get_usage(files):
+        """ Return size of files by folder """
+        usage = {}
+        for record in files:
+            usage[record['folder']] = usage.get(record['folder'], 0) + record['file_size']
+
+        return usage
+
+    def remove_file(self, file_path):
+        """
+        Remove file with its lock file if nobody downloads or reads it.
+        Return True if file is removed
+        """
+        with Download().lock_file(file_path, blocking=False) as locked:
+            if not locked:
+                return False
+            for path in [file_path, Download.get_meta_path(file_path)]:
+                if os.path.exists(path):
+                    os.remove(path)
+            Catalog().remove_file(file_path)
+            Download().remove_lock(file_path)
+
+        return True
+
+    def evict(self):
+        """
+        Remove the least recently used files while folder budgets or total size
+        are exceeded. Files accessed recently or locked are kept
+        """
+        with self.lock:
+            if not self.scanned:
+                self.scan()
+            files = Catalog().get_files()
+            usage = self.get_usage(files)
+            total = sum(usage.values())
+            now = time.time()
+            removed = []
+            for record in files:
+                folder = record['folder']
+                over_budget = folder in self.budgets and usage[folder] > self.budgets[folder]
+                if not over_budget and total <= self.max_size:
+                    continue
+                if now - record['accessed'] < self.MIN_AGE:
+                    continue
+                if self.remove_file(record['file_path']):
+                    usage[folder] -= record['file_size']
+                    total -= record['file_size']
+                    removed.append(record['file_path'])
+
+        return removed
@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
 import os
+import json
+import time
+import fcntl
+import shutil
 import urllib.request
+import http.client
 import errno
+from datetime import datetime
+from contextlib import contextmanager
 from progress.bar import ChargingBar
+from dynamicspectrum.dynamicspectrum.storage import Storage
 from dynamicspectrum.dynamicspectrum import exceptions
 
 
@@ -25,25 +33,264 @@ class Download(metaclass=SingletonMeta):
     def __init__(self):
         self.create_folders()
 
+    FOLDERS = ['AMATERAS', 'WIND1', 'WIND2', 'STEREO', 'ORFEES', 'GOES', 'SRH',
+               'QuietSun', 'ASSA']
+    LOCK_FOLDER = os.path.join('data', 'locks')
+    CHUNK_SIZE = 65536
+    CHECK_SIZE = 2880
+    OVERLAP_SIZE = 64
+
+    @staticmethod
+    def is_current_day(date):
+        """ Determine date is the current UT day """
+        return date.strftime('%Y%m%d') == datetime.utcnow().strftime('%Y%m%d')
+
     @staticmethod
-    def download_file(instrument, file_path, url):
+    def open_url(url, headers=None, method='GET'):
+        """ Send request to data server """
+        request = urllib.request.Request(url, headers=headers or {}, method=method)
+        return urllib.request.urlopen(request)
+
+    @staticmethod
+    def get_meta_path(file_path):
+        """ Return path of file with validators of remote file """
+        return file_path + '.meta.json'
+
+    def read_meta(self, file_path):
+        """ Read validators of remote file saved at the last download """
+        meta_path = self.get_meta_path(file_path)
+        if not os.path.exists(meta_path):
+            return {}
+        try:
+            with open(meta_path) as _f:
+                return json.load(_f)
+        except ValueError:
+            return {}
+
+    def save_meta(self, file_path, meta):
+        """ Save validators of remote file """
+        meta = dict(meta, size=os.path.getsize(file_path))
+        temp_path = self.get_meta_path(file_path) + '.part'
+        with open(temp_path, 'w') as _f:
+            json.dump(meta, _f)
+        os.replace(temp_path, self.get_meta_path(file_path))
+
+    @staticmethod
+    def get_validators(response):
+        """ Return size, ETag and Last-Modified of remote file """
+        headers = response.headers
+        size = headers.get('Content-Length')
+        if headers.get('Content-Range'):
+            size = headers.get('Content-Range').split('/')[-1]
+        return {'remote_size': int(size) if size and size.isdigit() else None,
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified')}
+
+    def write_response(self, instrument, response, file_path, mode='wb'):
+        """ Write body of response to file """
+        total = response.headers.get('Content-Length')
+        bar = ChargingBar(instrument + ' file is downloaded', max=100)
+        received = 0
+        with open(file_path, mode) as _f:
+            for chunk in iter(lambda: response.read(self.CHUNK_SIZE), b''):
+                _f.write(chunk)
+                received += len(chunk)
+                if total and total.isdigit() and int(total) > 0:
+                    bar.goto(min(100, received * 100 // int(total)))
+            _f.flush()
+            os.fsync(_f.fileno())
+        bar.goto(100)
+        bar.finish()
+
+    def fetch_file(self, instrument, file_path, url, response=None):
+        """
+        Download whole file. File is replaced only after download is complete
+        """
+        response = response or self.open_url(url)
+        temp_path = file_path + '.part'
+        with response:
+            self.write_response(instrument, response, temp_path)
+            meta = self.get_validators(response)
+        os.replace(temp_path, file_path)
+        self.save_meta(file_path, meta)
+
+    def read_local_bytes(self, file_path, start, size):
+        """ Read bytes of local file """
+        with open(file_path, 'rb') as _f:
+            _f.seek(start)
+            return _f.read(size)
+
+    def is_same_prefix(self, file_path, url, local_size):
+        """ Compare beginning of local and remote files """
+        size = min(self.CHECK_SIZE, local_size)
+        if size == 0:
+            return True
+        response = self.open_url(url, {'Range': 'bytes=0-' + str(size - 1)})
+        with response:
+            remote_bytes = response.read(size)
+        return remote_bytes == self.read_local_bytes(file_path, 0, size)
+
+    def append_tail(self, instrument, file_path, url, local_size, validator):
+        """
+        Download bytes added to remote file and append them to copy of local
+        file. Local file is replaced only after copy has size of remote file
+        """
+        overlap = min(self.OVERLAP_SIZE, local_size)
+        headers = {'Range': 'bytes=' + str(local_size - overlap) + '-'}
+        if validator:
+            headers['If-Range'] = validator
+        response = self.open_url(url, headers)
+        if response.status != 206:
+            return self.fetch_file(instrument, file_path, url, response)
+
+        with response:
+            remote_overlap = response.read(overlap)
+            if remote_overlap != self.read_local_bytes(file_path, local_size - overlap,
+                                                       overlap):
+                response.close()
+                return self.fetch_file(instrument, file_path, url)
+            temp_path = file_path + '.part'
+            shutil.copyfile(file_path, temp_path)
+            self.write_response(instrument, response, temp_path, 'ab')
+            meta = self.get_validators(response)
+
+        if meta['remote_size'] is not None and\
+                os.path.getsize(temp_path) != meta['remote_size']:
+            os.remove(temp_path)
+            raise ValueError('Tail of file is incomplete')
+        os.replace(temp_path, file_path)
+        self.save_meta(file_path, meta)
+
+    def update_file(self, instrument, file_path, url):
         """
-        Download file if does not exist. Saves to local folder
+        Bring local copy of growing remote file up to date.
+        Only new bytes are downloaded if remote file was appended
         """
-        if not os.path.exists(file_path):
+        meta = self.read_meta(file_path)
+        local_size = os.path.getsize(file_path)
+        with self.open_url(url, method='HEAD') as response:
+            remote = self.get_validators(response)
+            accept_ranges = response.headers.get('Accept-Ranges') == 'bytes'
+
+        validator = remote['etag'] or remote['last_modified']
+        is_same = (remote['etag'], remote['last_modified']) ==\
+            (meta.get('etag'), meta.get('last_modified'))
+        if remote['remote_size'] == local_size and (is_same or not meta):
+            self.save_meta(file_path, remote)
+        elif not accept_ranges or remote['remote_size'] is None or\
+                remote['remote_size'] <= local_size:
+            self.fetch_file(instrument, file_path, url)
+        elif not self.is_same_prefix(file_path, url, local_size):
+            self.fetch_file(instrument, file_path, url)
+        else:
+            self.append_tail(instrument, file_path, url, local_size, validator)
+
+    @classmethod
+    def get_lock_path(cls, file_path):
+        """
+        Return path of lock file for file in local folder. Compressed file
+        has the same lock file as the file it is made of
+        """
+        for suffix in [Storage.GZIP_SUFFIX, Storage.TILE_SUFFIX]:
+            if file_path.endswith(suffix):
+                file_path = file_path[:-len(suffix)]
+        name = os.path.relpath(file_path, 'data').replace(os.sep, '_')
+        return os.path.join(cls.LOCK_FOLDER, name + '.lock')
+
+    def open_lock(self, file_path, operation):
+        """
+        Open and lock lock file. Lock file removed while waiting for it is
+        opened again. Return None if file is locked by someone else
+        """
+        lock_path = self.get_lock_path(file_path)
+        while True:
+            lock = open(lock_path, 'a')
+            try:
+                fcntl.flock(lock.fileno(), operation)
+            except BlockingIOError:
+                lock.close()
+                return None
             try:
-                _file = urllib.request.urlopen(url)
-                record = _file.read()
-                bar = ChargingBar(instrument + ' file is downloaded', max=100)
-                for i in range(100):
-                    with open(file_path, 'wb') as _f:
-                        _f.write(record)
-                    _f.close()
-                    bar.next()
-                bar.finish()
-            except (BaseException,):
-                print('file no')
-                pass
+                is_current = os.path.samestat(os.fstat(lock.fileno()), os.stat(lock_path))
+            except FileNotFoundError:
+                is_current = False
+            if is_current:
+                return lock
+            lock.close()
+
+    @contextmanager
+    def lock_file(self, file_path, blocking=True, shared=False):
+        """
+        Lock file for other threads and processes. Download and removal
+        hold exclusive lock, readers hold shared lock while file is open.
+        Without blocking yields False if file is locked by someone else
+        """
+        os.makedirs(self.LOCK_FOLDER, exist_ok=True)
+        operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        if not blocking:
+            operation |= fcntl.LOCK_NB
+        lock = self.open_lock(file_path, operation)
+        if lock is None:
+            yield False
+            return
+        with lock:
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def remove_lock(self, file_path):
+        """ Remove lock file of removed file, it is called under exclusive lock """
+        lock_path = self.get_lock_path(file_path)
+        if os.path.exists(lock_path):
+            os.remove(lock_path)
+
+    def mark_growing(self, file_path, growing):
+        """
+        Remember local file was downloaded while its day was not over, so it
+        is completed once after the day is over
+        """
+        meta = self.read_meta(file_path)
+        if meta and os.path.exists(file_path) and meta.get('growing', False) != growing:
+            self.save_meta(file_path, dict(meta, growing=growing))
+
+    def is_just_updated(self, file_path, requested):
+        """ Determine file was brought up to date by other worker after request """
+        meta_path = self.get_meta_path(file_path)
+        return os.path.exists(meta_path) and os.path.getmtime(meta_path) >= requested
+
+    def download_file(self, instrument, file_path, url, date=None):
+        """
+        Download file if does not exist. Saves to local folder.
+        Files of the current UT day are brought up to date. File downloaded
+        during its day is brought up to date once more after the day is over,
+        then files of previous days are compressed if compression is enabled.
+        Only one thread or process downloads the file, others wait for it
+        """
+        requested = time.time()
+        downloaded = False
+        try:
+            with self.lock_file(file_path):
+                is_current = date is not None and self.is_current_day(date)
+                if not Storage.exists(file_path):
+                    self.fetch_file(instrument, file_path, url)
+                    downloaded = True
+                elif is_current and not self.is_just_updated(file_path, requested):
+                    self.update_file(instrument, file_path, url)
+                elif date is not None and not is_current and\
+                        self.read_meta(file_path).get('growing'):
+                    self.update_file(instrument, file_path, url)
+                if date is not None:
+                    self.mark_growing(file_path, is_current)
+                if date is not None and not is_current:
+                    Storage.compress(file_path)
+        except (OSError, ValueError, http.client.HTTPException) as exc:
+            print(instrument + ' file is not downloaded: ' + str(exc))
+
+        from dynamicspectrum.dynamicspectrum.data_cache import DataCache
+        DataCache().touch(Storage.find(file_path))
+        if downloaded:
+            DataCache().evict()
 
     @staticmethod
     def create_folders():
@@ -52,9 +299,7 @@ class Download(metaclass=SingletonMeta):
         if not os.path.exists('data/'):
             os.mkdir('data/')
 
-        folders = ['AMATERAS', 'WIND1', 'WIND2', 'STEREO', 'ORFEES', 'GOES', 'SRH',
-                   'QuietSun']
-        for folder in folders:
+        for folder in Download.FOLDERS:
             if not os.path.exists(os.path.join('data', folder)):
                 try:
                     os.mkdir(os.path.join('data', folder))
@@ -16,3 +16,27 @@ class OrfeesFileIsNotExists(Exception):
 
 class CannotCreateDirectory(Exception):
     code = "CANNOTCREATEDIRECTORY"
+
+
+class SRHFileIsNotExists(Exception):
+    code = "SRHFILEISNOTEXISTS"
+
+
+class UnsupportedImageFormat(Exception):
+    code = "UNSUPPORTEDIMAGEFORMAT"
+
+
+class EncoderIsNotFound(Exception):
+    code = "ENCODERISNOTFOUND"
+
+
+class InvalidRequest(Exception):
+    code = "INVALIDREQUEST"
+
+
+class JobIsRejected(Exception):
+    code = "JOBISREJECTED"
+
+
+class JobIsTooLarge(JobIsRejected):
+    code = "JOBISTOOLARGE"
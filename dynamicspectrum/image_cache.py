@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+""" The class for cache of rendered images """
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from dynamicspectrum.dynamicspectrum import __version__
+from dynamicspectrum.dynamicspectrum.download import SingletonMeta
+
+
+def get_code_version():
+    """
+    Return hash of source files of package. It changes with any change of
+    code, so images rendered by old code are not served from cache
+    """
+    digest = hashlib.sha256(__version__.encode())
+    package = os.path.dirname(os.path.abspath(__file__))
+    for root, dirs, files in os.walk(package):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith('.py'):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, package).encode())
+                with open(path, 'rb') as _f:
+                    digest.update(_f.read())
+
+    return digest.hexdigest()[:16]
+
+
+class ImageCache(metaclass=SingletonMeta):
+    """
+    This class keeps encoded images of dynamic spectrum in memory.
+    Images are addressed by hash of the full request and code version,
+    the least recently used images are evicted when cache exceeds its size
+    """
+    MAX_SIZE = 256 * 1024 * 1024
+    CODE_VERSION = get_code_version()
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size or self.MAX_SIZE
+        self.size = 0
+        self.images = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def create_key(date, time_from, time_to, spectrometer, spectropolarimeter,
+                   time_profile, stokes, image_format, quality):
+        """ Return hash of request and code version """
+        request = {'version': ImageCache.CODE_VERSION, 'date': date.strftime('%Y-%m-%d'),
+                   'time_from': time_from.strftime('%H:%M:%S'),
+                   'time_to': time_to.strftime('%H:%M:%S'),
+                   'spectrometer': list(spectrometer),
+                   'spectropolarimeter': list(spectropolarimeter),
+                   'time_profile': list(time_profile), 'stokes': stokes,
+                   'format': image_format.lower(), 'quality': quality}
+        encoded = json.dumps(request, sort_keys=True).encode()
+
+        return hashlib.sha256(encoded).hexdigest()
+
+    @staticmethod
+    def create_etag(key):
+        """ Return ETag of image. Image is addressed by its request """
+        return '"' + key[:32] + '"'
+
+    def get(self, key):
+        """ Return image bytes and ETag or None """
+        with self.lock:
+            image = self.images.get(key)
+            if image is None:
+                return None
+            self.images.move_to_end(key)
+
+        return image, self.create_etag(key)
+
+    def put(self, key, image):
+        """ Add image to cache and evict the least recently used images """
+        if len(image) > self.max_size:
+            return self.create_etag(key)
+        with self.lock:
+            if key in self.images:
+                self.size -= len(self.images.pop(key))
+            self.images[key] = image
+            self.size += len(image)
+            while self.size > self.max_size:
+                _, evicted = self.images.popitem(last=False)
+                self.size -= len(evicted)
+
+        return self.create_etag(key)
+
+    def clear(self):
+        """ Remove all images """
+        with self.lock:
+            self.images.clear()
+            self.size = 0
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+""" The class for incremental processing of the current UT day """
+import threading
+import numpy as np
+from datetime import datetime, date, timedelta
+from dynamicspectrum.dynamicspectrum.instrumentFactory import InstrumentFactory
+from dynamicspectrum.dynamicspectrum.download import Download
+
+
+class Incremental:
+    """
+    This class keeps processed data of instruments for the current UT day.
+    Each refresh processes only the time after the last processed sample
+    and appends it to the kept data. Data is kept by start of time window,
+    so refresh with later end of window extends the kept data. Spectrum data
+    has number of columns appended by the last refresh, so figure can draw
+    only them
+    """
+    _states = {}
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.factory = InstrumentFactory()
+
+    @staticmethod
+    def time_to_seconds(time):
+        """ Convert time to seconds """
+        timedelta_value = datetime.combine(date.min, time) - datetime.min
+        return timedelta_value.total_seconds()
+
+    @staticmethod
+    def seconds_to_time(seconds):
+        """ Convert seconds to time """
+        return (datetime.min + timedelta(seconds=seconds)).time()
+
+    @staticmethod
+    def is_spectrum(data):
+        """ Determine data dictionary belongs to spectrum """
+        return 'array' in data
+
+    @staticmethod
+    def has_data(data):
+        """ Determine data dictionary contains samples """
+        if 'array' in data:
+            return data['array'].size > 0
+        return isinstance(data['time'], np.ndarray) and data['time'].size > 0
+
+    def get_processed_to(self, data, time_from_sec):
+        """ Return time in seconds of the end of processed data """
+        if not self.has_data(data):
+            return None
+        if self.is_spectrum(data):
+            return time_from_sec + data['ncols'][1]
+        return float(data['time'][-1])
+
+    def append_spectrum(self, data, tail, offset):
+        """ Append columns of new spectrum to processed spectrum """
+        data['array'] = np.concatenate([data['array'], tail['array']], axis=1)
+        data['ncols'] = [data['ncols'][0], tail['ncols'][1] + int(round(offset))]
+        data['appended'] = tail['array'].shape[1]
+        return data
+
+    def append_profile(self, data, tail, processed_to):
+        """ Append samples of new time profile to processed time profile """
+        is_new = tail['time'] > processed_to
+        data['time'] = np.concatenate([data['time'], tail['time'][is_new]])
+        data['flux'] = np.concatenate([data['flux'], tail['flux'][is_new]])
+        return data
+
+    def get_data(self, name, stokes, date_event, time_from, time_to):
+        """
+        Return data of instrument. For the current UT day only samples after
+        the previous refresh are processed
+        """
+        instrument = self.factory.get_instrument(name, stokes)
+        if not Download.is_current_day(date_event):
+            return instrument.get_data(date_event, time_from, time_to)
+
+        key = (name, stokes, date_event.strftime('%Y%m%d'), time_from)
+        time_from_sec = self.time_to_seconds(time_from)
+        with self._lock:
+            state = self._states.get(key)
+
+        if state is None or state['processed_to'] is None or\
+                state['processed_to'] > self.time_to_seconds(time_to):
+            data = instrument.get_data(date_event, time_from, time_to)
+        else:
+            data = state['data']
+            if self.is_spectrum(data):
+                data = dict(data, appended=0)
+            processed_to = state['processed_to']
+            # tail is shorter than minimum observation of spectrometers
+            options = {'min_observation': 0} if hasattr(instrument, 'MIN_OBSERVATION') else {}
+            tail = instrument.get_data(date_event, self.seconds_to_time(processed_to),
+                                       time_to, **options)
+            if self.has_data(tail) and self.is_spectrum(data):
+                data = self.append_spectrum(dict(data), tail, processed_to - time_from_sec)
+            elif self.has_data(tail):
+                data = self.append_profile(dict(data), tail, processed_to)
+
+        with self._lock:
+            self._states[key] = {'data': data,
+                                 'processed_to': self.get_processed_to(data, time_from_sec)}
+            for old_key in [k for k in self._states if k[2] != key[2]]:
+                del self._states[old_key]
+
+        return data
+
+    def get_instrument_data(self, date_event, time_from, time_to, instruments, stokes):
+        """ Return data of instruments """
+        return {instrument: self.get_data(instrument, stokes, date_event, time_from, time_to)
+                for instrument in instruments}
@@ -6,6 +6,7 @@ from dynamicspectrum.dynamicspectrum.instruments.stereo import Stereo
 from dynamicspectrum.dynamicspectrum.instruments.goes import Goes
 from dynamicspectrum.dynamicspectrum.instruments.srh import SRH
 from dynamicspectrum.dynamicspectrum.instruments.goes17 import Goes17
+from dynamicspectrum.dynamicspectrum.instruments.assa import ASSA
 
 
 class InstrumentFactory:
@@ -37,3 +38,6 @@ class InstrumentFactory:
 
         elif name == 'goes17':
             return Goes17()
+
+        elif name == 'assa':
+            return ASSA(stokes_parameter)
@@ -3,10 +3,12 @@
 import os
 import numpy as np
 from urllib.parse import urljoin
-from astropy.io import fits
 from datetime import datetime
 from dynamicspectrum.dynamicspectrum.instruments.spectrum import Spectrum
 from dynamicspectrum.dynamicspectrum.download import Download
+from dynamicspectrum.dynamicspectrum.storage import Storage
+from dynamicspectrum.dynamicspectrum.catalog import Catalog
+from dynamicspectrum.dynamicspectrum.data_cache import DataCache
 
 
 def is_obs_time_within_interval(time_from, time_to, start_obs, end_obs):
@@ -23,6 +25,10 @@ class Amateras(Spectrum):
     """
     This class operates AMATERAS instrument data
     """
+    name = 'amateras'
+    FREQUENCY_RANGE = (150, 500)
+    MIN_OBSERVATION = 900
+
     def __init__(self, stokes):
         self.stokes = stokes
 
@@ -41,24 +47,31 @@ class Amateras(Spectrum):
         href = str(date.year) + '/' + file_name
         url = urljoin(base_url, href)
 
-        Download().download_file('AMATERAS', file_path, url)
+        Download().download_file('AMATERAS', file_path, url, date)
 
-        return file_path
+        return Storage.find(file_path)
 
     def read_header(self, file_path):
         """
-        Read header of FITS file
+        Read header of FITS image, compressed or not
+        """
+        with DataCache().reading(file_path):
+            return Storage.read_image_header(file_path)
+
+    def read_file(self, file_path, start=None, end=None):
+        """
+        Read columns of file. Return arrays of two polarizations
         """
-        header = fits.open(file_path)   
-        return header
+        with DataCache().reading(file_path), Storage.open_image(file_path) as hdu:
+            return self.read_window(hdu, start, end)
 
-    def read_file(self, file_path):
+    def read_window(self, hdu, start=None, end=None):
         """
-        Read file. Return array of data
+        Read columns of opened image. Only the window is read from file
         """
-        file_data = fits.getdata(file_path, dtype=float)
-        RCP = (file_data[0, :, :])
-        LCP = (file_data[1, :, :])
+        file_data = Storage.read_window(hdu, start, end)
+        RCP = file_data[0]
+        LCP = file_data[1]
 
         return RCP, LCP
 
@@ -66,7 +79,7 @@ class Amateras(Spectrum):
         """
         Get Quiet Sun values for two polarizations
         """
-        file_name = header[0].header[35].split(" ")[-1]
+        file_name = header[35].split(" ")[-1]
         path = os.path.join('data', 'QuietSun', file_name)
 
         url = urljoin(base_url, file_name)
@@ -105,15 +118,38 @@ class Amateras(Spectrum):
         """
         Get observation time of instrument
         """
-        start_obs = file_header[0].header['TIME-OBS']
-        end_obs = file_header[0].header['TIME-END']
-        time_step = file_header[0].header['CDELT1']
+        start_obs = file_header['TIME-OBS']
+        end_obs = file_header['TIME-END']
+        time_step = file_header['CDELT1']
 
         start_obs_sec = self.convert_instrument_time(start_obs)
         end_obs_sec = self.convert_instrument_time(end_obs)
 
         return start_obs_sec, end_obs_sec, time_step
 
+    def get_catalog_record(self, file_path):
+        """
+        Return observation parameters from header of FITS file
+        """
+        header = self.read_header(file_path)
+        start_obs = self.convert_instrument_time(header['TIME-OBS'])
+        end_obs = self.convert_instrument_time(header['TIME-END'])
+
+        return {'time_obs': start_obs, 'time_end': end_obs, 'cadence': header['CDELT1'],
+                'freq_min': self.FREQUENCY_RANGE[0], 'freq_max': self.FREQUENCY_RANGE[1],
+                'channels': header['NAXIS2']}
+
+    def has_observation(self, time_from, time_to, start_obs, end_obs, min_observation=None):
+        """
+        Determine there is enough data to build spectrum for selected time
+        """
+        if min_observation is None:
+            min_observation = self.MIN_OBSERVATION
+        interval_is_within = is_obs_time_within_interval(time_from, time_to,
+                                                         start_obs, end_obs)
+        return bool(interval_is_within) and time_from < end_obs and\
+            end_obs - time_from > min_observation
+
     def override_time_interval(self, time_to, end_obs):
         """
         Compare the range of user-selected time interval with observation time interval
@@ -178,12 +214,24 @@ class Amateras(Spectrum):
 
     def get_stokes_parameter(self, lcp, rcp):
         """ Calculate Stokes parameter """
-        if self.stokes == "I":
-            parameter = self.get_intensity(lcp, rcp)
-        elif self.stokes == "V":
-            parameter = self.get_polarization(lcp, rcp)
+        return self.get_stokes_parameters(lcp, rcp, [self.stokes])[self.stokes]
 
-        return parameter
+    def get_stokes_parameters(self, lcp, rcp, products):
+        """
+        Calculate several Stokes parameters (I, V, V/I) from the same components
+        """
+        parameters = {}
+        total = lcp + rcp
+        if 'I' in products:
+            parameters['I'] = self.get_intensity(lcp, rcp)
+        if 'V' in products or 'V/I' in products:
+            polarization = self.get_polarization(lcp, rcp)
+            if 'V' in products:
+                parameters['V'] = polarization
+            if 'V/I' in products:
+                parameters['V/I'] = super().get_polarization_degree(polarization, total)
+
+        return parameters
 
     def create_data_dict(self, array, start_point, end_point):
         """
@@ -196,53 +244,61 @@ class Amateras(Spectrum):
 
         return data
 
-    def get_data(self, date, time_from, time_to):
+    def get_data(self, date, time_from, time_to, min_observation=None):
         """
         Performs actions to process data
         """
+        return self.get_products(date, time_from, time_to, [self.stokes],
+                                 min_observation)[self.stokes]
+
+    def get_products(self, date, time_from, time_to, products, min_observation=None):
+        """
+        Performs actions to process data for several Stokes parameters.
+        File is opened once, only columns of the time window are read
+        """
         url = 'http://radio.gp.tohoku.ac.jp/db/IPRT-SUN/DATA2/'
         url_quiet_sun = 'http://radio.gp.tohoku.ac.jp/db/IPRT-SUN/CALIB/'
 
         try:
             file_path = self.get_file(date, url)
-            header = self.read_header(file_path)
-
-            start_obs, end_obs, step = self.get_observation_time(header)
-            user_time_from = super().time_to_seconds(time_from)
-            user_time_to = super().time_to_seconds(time_to)
-
-            interval_is_within = is_obs_time_within_interval(
-                            user_time_from, user_time_to, start_obs, end_obs)
-
-            if interval_is_within and abs(end_obs - user_time_from) > 900 and\
-               user_time_from < 25200:
-                rcp_init, lcp_init = self.read_file(file_path)
+            with DataCache().reading(file_path), Storage.open_image(file_path) as hdu:
+                header = hdu.header
+
+                start_obs, end_obs, step = self.get_observation_time(header)
+                Catalog().add_record(self.name, date, file_path, start_obs, end_obs, step,
+                                     self.FREQUENCY_RANGE[0], self.FREQUENCY_RANGE[1],
+                                     header['NAXIS2'])
+                user_time_from = super().time_to_seconds(time_from)
+                user_time_to = super().time_to_seconds(time_to)
+                has_observation = self.has_observation(user_time_from, user_time_to,
+                                                       start_obs, end_obs, min_observation)
+                if has_observation:
+                    refined_time_to = self.override_time_interval(user_time_to, end_obs)
+                    start, end = self.get_array_shape(start_obs, user_time_from,
+                                                      refined_time_to, step)
+                    rcp, lcp = self.read_window(hdu, start, end)
+                    header = header.copy()
+
+            if has_observation:
                 qs_rcp, qs_lcp = self.get_quiet_sun(header, url_quiet_sun)
+                cut_rcp = self.calibrate_data(rcp, qs_rcp)
+                cut_lcp = self.calibrate_data(lcp, qs_lcp)
 
-                RCP = self.calibrate_data(rcp_init, qs_rcp)
-                LCP = self.calibrate_data(lcp_init, qs_lcp)
-
-                refined_time_to = self.override_time_interval(user_time_to, end_obs)
-                start, end = self.get_array_shape(start_obs, user_time_from,
-                                                  refined_time_to, step)
-                cut_rcp = self.slice_array(RCP, start, end)
-                cut_lcp = self.slice_array(LCP, start, end)
-
-                final_array = self.get_stokes_parameter(cut_lcp, cut_rcp)
+                final_arrays = self.get_stokes_parameters(cut_lcp, cut_rcp, products)
 
                 grid_range_from = super().define_grid_range(user_time_from, user_time_from)
                 grid_range_to = super().define_grid_range(refined_time_to, user_time_from)
 
-                final_data = self.create_data_dict(final_array, grid_range_from,
-                                                   grid_range_to)
+                frequencies = self.get_header_frequencies(header, cut_rcp.shape[0])
+                final_data = {product: dict(self.create_data_dict(
+                    final_arrays[product], grid_range_from, grid_range_to),
+                    frequencies=frequencies) for product in products}
 
             else:
-                final_array = np.array([[]])
-                final_data = self.create_data_dict(final_array, 0, 0)
+                final_data = {product: self.create_empty_data() for product in products}
 
         except FileNotFoundError:
             print('AMATERAS file is not found')
-            final_array = np.array([[]])
-            final_data = self.create_data_dict(final_array, 0, 0)
+            final_data = {product: self.create_empty_data() for product in products}
 
         return final_data
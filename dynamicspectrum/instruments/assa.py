@@ -1,32 +1,51 @@
 #!/usr/bin/env python3
 """ The class for building dynamic radio spectrums """
 import os
+import fnmatch
 import numpy as np
-from urllib.parse import urljoin
-from astropy.io import fits
-from datetime import datetime, date
+from datetime import datetime
+from dynamicspectrum.dynamicspectrum.instruments.spectrum import Spectrum
+from dynamicspectrum.dynamicspectrum.catalog import Catalog
+from dynamicspectrum.dynamicspectrum.storage import Storage
+from dynamicspectrum.dynamicspectrum.data_cache import DataCache
 
 
-def time_to_seconds(time):
-    """ Convert time to seconds """
-    timedelta = datetime.combine(date.min, time) - datetime.min
-    seconds = timedelta.total_seconds()
-    return seconds
-
-
-class ASSA:
+class ASSA(Spectrum):
     """
     This class operates ASSA instrument data
     """
-    def read_header(self, file_path):
-        """ Read header of FITS file """
-        header = fits.open(file_path)
-        return header
+    name = 'assa'
+    FOLDER = os.path.join('data', 'ASSA')
+    FREQUENCY_RANGE = (100, 500)
+
+    def __init__(self, stokes='I'):
+        self.stokes = stokes
 
-    def read_file(self, file_path):
-        """ Read file. Return array of data """
-        file_data = fits.getdata(file_path, dtype=float)
-        return file_data
+    def get_file(self, date):
+        """ Return file path of instrument in local directory """
+        date_part = super().create_date_part(date)
+        if os.path.exists(self.FOLDER):
+            for name in sorted(os.listdir(self.FOLDER)):
+                if fnmatch.fnmatch(name, '*' + date_part + '*.fit*'):
+                    file_path = os.path.join(self.FOLDER, name)
+                    DataCache().touch(file_path)
+                    return file_path
+
+        raise FileNotFoundError('ASSA file is not found')
+
+    def read_header(self, file_path):
+        """ Read header of FITS file, tile-compressed or not """
+        with DataCache().reading(file_path):
+            return Storage.read_image_header(file_path)
+
+    def read_file(self, file_path, start=None, end=None):
+        """
+        Read columns of time window from memory-mapped file. Only tiles
+        of the window are decompressed in tile-compressed file.
+        Return array of data
+        """
+        with DataCache().reading(file_path):
+            return Storage.read_image_window(file_path, start, end)
 
     def convert_instrument_time(self, time, time_format):
         """ Convert time to seconds """
@@ -38,37 +57,50 @@ class ASSA:
 
     def get_observation_time(self, file_header):
         """ Get observation time of instrument """
-        start_obs = file_header[0].header['TIME-OBS']
-        end_obs = file_header[0].header['TIME-END']
-        time_step = file_header[0].header['CDELT1']
+        start_obs = file_header['TIME-OBS']
+        end_obs = file_header['TIME-END']
+        time_step = file_header['CDELT1']
 
         start_obs_sec = self.convert_instrument_time(start_obs, '%H:%M:%S.%f')
         end_obs_sec = self.convert_instrument_time(end_obs, '%H:%M:%S')
 
         return start_obs_sec, end_obs_sec, time_step
 
-    @staticmethod
-    def is_observation_time_within_interval(time_from, time_to, start_obs, end_obs):
-        """ Determine instrument observation time is within a specified range """
-        if time_from >= start_obs or time_to <= end_obs:
-            return True
-        elif time_from <= start_obs and time_to >= end_obs:
-            return True
+    def get_catalog_record(self, file_path):
+        """ Return observation parameters from header of FITS file """
+        header = self.read_header(file_path)
+        start_obs, end_obs, step = self.get_observation_time(header)
+
+        return {'time_obs': start_obs, 'time_end': end_obs, 'cadence': step,
+                'freq_min': self.FREQUENCY_RANGE[0], 'freq_max': self.FREQUENCY_RANGE[1],
+                'channels': header['NAXIS2']}
 
     @staticmethod
-    def override_time_interval(time_from, time_to, start_obs, end_obs):
+    def get_observation_start(start_obs, end_obs):
+        """ Return start of observation. Observation can start before midnight """
+        if start_obs > end_obs:
+            return start_obs - 86400
+        return start_obs
+
+    def has_observation(self, time_from, time_to, start_obs, end_obs):
+        """ Determine observation time overlaps the user-selected time interval """
+        start_obs = self.get_observation_start(start_obs, end_obs)
+        return time_from < end_obs and time_to > start_obs
+
+    def override_time_interval(self, time_from, time_to, start_obs, end_obs):
         """ Compare the range of user-selected time interval with observation time interval """
+        start_obs = self.get_observation_start(start_obs, end_obs)
         if time_from < start_obs:
             time_from = start_obs
         if time_to > end_obs:
             time_to = end_obs
         return time_from, time_to
 
-    def get_array_shape(self, start_obs, time_from, time_to, step):
-        """ Get shape of AMATERAS array considering the midnight """
-        until_mn = 86400 - start_obs
-        start = round((time_from + until_mn) / step)
-        end = round((time_to + until_mn) / step)
+    def get_array_shape(self, start_obs, end_obs, time_from, time_to, step):
+        """ Get shape of ASSA array considering the midnight """
+        start_obs = self.get_observation_start(start_obs, end_obs)
+        start = max(round((time_from - start_obs) / step), 0)
+        end = max(round((time_to - start_obs) / step), start)
 
         return start, end
 
@@ -81,23 +113,48 @@ class ASSA:
 
     def change_image_contrast(self, array):
         """ Improve image visibility """
-        array[385:402] = array[367:384]
-        array[(array > 45)] = 45
+        np.minimum(array, 45, out=array)
         return array
 
     def create_data_dict(self, array, start_point, end_point):
         """ Create dictionary with parameters to build spectrum """
-        data = {'array': array, 'ncols': [start_point, end_point]}
+        data = {'array': array, 'nrows': [750, 875], 'ncols': [start_point, end_point],
+                'parameter': 'I'}
         return data
 
-    def get_data(self, file_path, time_from, time_to):
+    def get_data(self, date, time_from, time_to):
         """ Performs actions to process data """
-        header = self.read_header(file_path)
-
-        start_obs, end_obs, step = self.get_observation_time(header)
-        user_time_from = time_to_seconds(time_from)
-        user_time_to = time_to_seconds(time_to)
-
-        interval_is_within = self.is_observation_time_within_interval(user_time_from, user_time_to, start_obs, end_obs)
-        if interval_is_within:
-            time_from, time_to = self.override_time_interval(user_time_from, user_time_to, start_obs, end_obs)
+        try:
+            file_path = self.get_file(date)
+            header = self.read_header(file_path)
+
+            start_obs, end_obs, step = self.get_observation_time(header)
+            Catalog().add_record(self.name, date, file_path, start_obs, end_obs, step,
+                                 self.FREQUENCY_RANGE[0], self.FREQUENCY_RANGE[1],
+                                 header['NAXIS2'])
+            user_time_from = super().time_to_seconds(time_from)
+            user_time_to = super().time_to_seconds(time_to)
+
+            if self.has_observation(user_time_from, user_time_to, start_obs, end_obs):
+                refined_time_from, refined_time_to = self.override_time_interval(
+                    user_time_from, user_time_to, start_obs, end_obs)
+                start, end = self.get_array_shape(start_obs, end_obs, refined_time_from,
+                                                  refined_time_to, step)
+                final_array = self.read_file(file_path, start, end)
+                final_array = self.change_image_contrast(final_array)
+
+                grid_range_from = super().define_grid_range(refined_time_from,
+                                                            user_time_from)
+                grid_range_to = super().define_grid_range(refined_time_to, user_time_from)
+                final_data = self.create_data_dict(final_array, grid_range_from,
+                                                   grid_range_to)
+                final_data['frequencies'] = self.get_header_frequencies(
+                    header, final_array.shape[0])
+            else:
+                final_data = self.create_empty_data()
+
+        except FileNotFoundError:
+            print('ASSA file is not found')
+            final_data = self.create_empty_data()
+
+        return final_data
@@ -1,19 +1,24 @@
 #!/usr/bin/env python3
 """ The class for building dynamic radio spectrums """
 import os
-import numpy as np
 import requests
+import numpy as np
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from astropy.io import fits
 from dynamicspectrum.dynamicspectrum.instruments.time_profile import TimeProfile
 from dynamicspectrum.dynamicspectrum.download import Download
+from dynamicspectrum.dynamicspectrum.storage import Storage
+from dynamicspectrum.dynamicspectrum.catalog import Catalog
+from dynamicspectrum.dynamicspectrum.data_cache import DataCache
 
 
 class Goes(TimeProfile):
     """
     This class operates GOES data
     """
+    name = 'goes'
+
     def get_file_name(self, date, url):
         """ Parse web-site to return file name """
         date_str = date.strftime("%Y-%m-%d")
@@ -38,9 +43,9 @@ class Goes(TimeProfile):
         href = str(date.year) + '/' + file_name
         url = urljoin(base_url, href)
 
-        Download().download_file('GOES', file_path, url)
+        Download().download_file('GOES', file_path, url, date)
 
-        return file_path
+        return Storage.find(file_path)
 
     def read_file(self, file_path):
         """
@@ -53,34 +58,93 @@ class Goes(TimeProfile):
         """
         Return array of GOES time data
         """
-        return file_data['Time'].T
+        return file_data['Time'][0]
 
     def get_flux_data(self, file_data):
         """ Return array of GOES flux data """
-        return file_data['Flux'][:, :, 0].T
+        return file_data['Flux'][0, :, 0]
+
+    @staticmethod
+    def convert_instrument_time(time):
+        """ Convert time of header to seconds """
+        hours, minutes, seconds = time.split(':')
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    def get_catalog_record(self, file_path):
+        """
+        Return observation parameters from headers of FITS file
+        """
+        with DataCache().reading(file_path), fits.open(file_path) as hdul:
+            return self.get_header_record(hdul[0].header, hdul[2].header)
+
+    def get_header_record(self, header, table_header):
+        """
+        Return observation parameters from headers already read
+        """
+        start_obs = self.convert_instrument_time(header['TIME-OBS'])
+        end_obs = self.convert_instrument_time(header['TIME-END'])
+        points = int(table_header['TFORM1'][:-1])
+        cadence = (end_obs - start_obs) / (points - 1) if points > 1 else 0
+
+        return {'time_obs': start_obs, 'time_end': end_obs, 'cadence': cadence,
+                'freq_min': None, 'freq_max': None, 'channels': 2}
 
     def align_profile(self, time, flux):
         """ Delete points close to zero """
         if not time.size == 0:
             null_value_index = self.find_index(flux, 0)
-            index = (np.where(flux == flux[null_value_index]))
-            time = np.delete(time, index)
-            flux = np.delete(flux, index)
+            is_valid = flux != flux[null_value_index]
+            time = time[is_valid]
+            flux = flux[is_valid]
 
         return time, flux
 
+    def read_profile(self, date):
+        """
+        Return time profile of the day ordered by time. Headers read with
+        data are added to catalog once for downloaded or stored file
+        """
+        file_path = self.get_file(date, 'https://hesperia.gsfc.nasa.gov/goes/')
+        with DataCache().reading(file_path), fits.open(file_path) as hdul:
+            if not Catalog().has_record(self.name, date, file_path):
+                Catalog().add_record(self.name, date, file_path,
+                                     **self.get_header_record(hdul[0].header,
+                                                              hdul[2].header))
+            file_data = hdul[2].data
+            time = np.array(self.get_time_data(file_data))
+            flux = np.array(self.get_flux_data(file_data))
+
+        return self.sort_profile(time, flux)
+
+    def get_windows(self, date, windows):
+        """
+        Return time profiles for many (time_from, time_to) windows of the day.
+        File is read once, windows are found with binary search
+        """
+        try:
+            time, flux = self.read_profile(date)
+            starts = [self.time_to_seconds(window[0]) for window in windows]
+            ends = [self.time_to_seconds(window[1]) for window in windows]
+
+            data = []
+            for (cut_time, cut_flux), start, end in zip(
+                    self.slice_windows(time, flux, starts, ends), starts, ends):
+                cut_time, cut_flux = self.align_profile(cut_time, cut_flux)
+                data.append(self.create_data_dict(cut_time, cut_flux, start, end))
+
+        except Exception:
+            data = [self.create_data_dict(0, 0, 0, 0) for window in windows]
+
+        return data
+
     def get_data(self, date, time_from, time_to):
         try:
-            file_path = self.get_file(date, 'https://hesperia.gsfc.nasa.gov/goes/')
-            file_data = self.read_file(file_path)
-            time = self.get_time_data(file_data)
-            flux = self.get_flux_data(file_data)
+            time, flux = self.read_profile(date)
 
             time_from_sec = super().time_to_seconds(time_from)
             time_to_sec = super().time_to_seconds(time_to)
 
-            start_index = super().find_index(time, time_from_sec)
-            end_index = super().find_index(time, time_to_sec)
+            start_index, end_index = super().find_windows(time, time_from_sec, time_to_sec)
 
             time = time[start_index:end_index]
             flux = flux[start_index:end_index]
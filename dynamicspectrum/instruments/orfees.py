@@ -2,17 +2,33 @@
 """ The class for building dynamic radio spectrums """
 import os
 import fnmatch
+import threading
 import numpy as np
 from astropy.io import fits
+from scipy import sparse
 from skimage.transform import resize
 from datetime import datetime
 from dynamicspectrum.dynamicspectrum.instruments.spectrum import Spectrum
+from dynamicspectrum.dynamicspectrum.catalog import Catalog
+from dynamicspectrum.dynamicspectrum.data_cache import DataCache
 
 
 class Orfees(Spectrum):
     """
     This class operates ORFEES instrument
     """
+    name = 'orfees'
+    FREQUENCY_RANGE = (144, 1004)
+    CHANNELS = 1000
+    MIN_OBSERVATION = 900
+    BAND_CHANNELS = 200
+    BANDS = {'I': ['STOKESI_B1', 'STOKESI_B2', 'STOKESI_B3', 'STOKESI_B4', 'STOKESI_B5'],
+             'V': ['STOKESV_B1', 'STOKESV_B2', 'STOKESV_B3', 'STOKESV_B4', 'STOKESV_B5']}
+    FREQUENCY_BANDS = ['FREQ_B1', 'FREQ_B2', 'FREQ_B3', 'FREQ_B4', 'FREQ_B5']
+
+    _resample_matrices = {}
+    _resample_lock = threading.Lock()
+
     def __init__(self, stokes):
         self.stokes = stokes
 
@@ -26,6 +42,7 @@ class Orfees(Spectrum):
             for name in files:
                 if fnmatch.fnmatch(name, 'int_orf' + date_part + '*.fts'):
                     path = os.path.join(root, name)
+                    DataCache().touch(path)
                     return path
 
     def read_file(self, file_path):
@@ -36,33 +53,67 @@ class Orfees(Spectrum):
 
         return file_data
 
-    def combine_bands(self, file_data, bands):
+    @classmethod
+    def get_resample_matrix(cls, channels):
         """
-        Combime bands. Return array of data
+        Return sparse matrix resampling frequency channels of band to 200
+        channels. Weights are taken from anti-aliased resize of identity
+        matrix, matrix is built once for band shape and kept for the process
         """
-        size_time, = file_data.shape
-        instr_data = np.array([])
-        first_iteration = True
+        with cls._resample_lock:
+            matrix = cls._resample_matrices.get(channels)
+            if matrix is None:
+                weights = resize(np.eye(channels), (channels, cls.BAND_CHANNELS),
+                                 anti_aliasing=True)
+                weights[np.abs(weights) < 1e-12] = 0
+                matrix = sparse.csr_matrix(weights.T)
+                cls._resample_matrices[channels] = matrix
+
+        return matrix
 
+    def combine_bands(self, file_data, bands):
+        """
+        Combime bands resampled to 200 channels. Return array of data
+        """
+        instr_data = []
         for b in bands:
-            band = resize(file_data[b], (size_time, 200), anti_aliasing=True)
-            if first_iteration:
-                instr_data = band
-                first_iteration = False
-            else:
-                instr_data = np.concatenate(([instr_data, band]), axis=1)
+            band = np.ascontiguousarray(file_data[b].T, dtype=float)
+            instr_data.append(self.get_resample_matrix(band.shape[0]) @ band)
 
-        return instr_data[:, :].T
+        return np.concatenate(instr_data, axis=0)
+
+    def read_frequencies(self, file_path):
+        """
+        Read frequencies of bands in MHz and resample them like data of bands.
+        Bands are not contiguous, so frequencies are not evenly spaced
+        """
+        with fits.open(file_path, memmap=True) as hdul:
+            return self.get_band_frequencies(hdul)
+
+    def get_band_frequencies(self, hdul):
+        """ Return resampled frequencies of bands from opened file """
+        try:
+            table = hdul[1].data
+            bands = [np.asarray(table[name], dtype=float).ravel()
+                     for name in self.FREQUENCY_BANDS]
+        except (IndexError, KeyError):
+            return self.get_frequencies(self.CHANNELS)
+
+        return np.concatenate([self.get_resample_matrix(band.size) @ band for band in bands])
 
     def get_stokes_parameter(self, file_data):
         """ Define Stokes Parameter """
-        if self.stokes == "I":
-            bands = ['STOKESI_B1', 'STOKESI_B2', 'STOKESI_B3', 'STOKESI_B4', 'STOKESI_B5']
-            data = self.combine_bands(file_data, bands)
-        elif self.stokes == "V":
-            bands = ['STOKESV_B1', 'STOKESV_B2', 'STOKESV_B3', 'STOKESV_B4', 'STOKESV_B5']
-            data = self.combine_bands(file_data, bands)
-            # data = self.get_polarization(array)
+        return self.get_stokes_parameters(file_data, [self.stokes])[self.stokes]
+
+    def get_stokes_parameters(self, file_data, products):
+        """
+        Combine bands of Stokes parameters needed for products (I, V, V/I)
+        """
+        stokes = set(part for product in products for part in product.split('/'))
+        data = {}
+        for parameter in ['I', 'V']:
+            if parameter in stokes:
+                data[parameter] = self.combine_bands(file_data, self.BANDS[parameter])
 
         return data
 
@@ -83,11 +134,16 @@ class Orfees(Spectrum):
         """
         Get observation time of instrument
         """
-        file_header = fits.getheader(file_path, ext=0)
+        with DataCache().reading(file_path), fits.open(file_path, memmap=True) as hdul:
+            return self.get_header_time(hdul)
 
-        start_obs = file_header['TIME-OBS']
-        end_obs = file_header['TIME-END']
-        step = fits.getheader(file_path, ext=2)['EXPTIME']
+    def get_header_time(self, hdul):
+        """
+        Get observation time from headers of opened file
+        """
+        start_obs = hdul[0].header['TIME-OBS']
+        end_obs = hdul[0].header['TIME-END']
+        step = hdul[2].header['EXPTIME']
 
         start_obs_sec = self.convert_instrument_time(start_obs)
         end_obs_sec = self.convert_instrument_time(end_obs)
@@ -105,6 +161,26 @@ class Orfees(Spectrum):
 
         return seconds
 
+    def get_catalog_record(self, file_path):
+        """
+        Return observation parameters from headers of FITS file
+        """
+        start_obs, end_obs, step = self.get_observation_time(file_path)
+
+        return {'time_obs': start_obs, 'time_end': end_obs, 'cadence': step,
+                'freq_min': self.FREQUENCY_RANGE[0], 'freq_max': self.FREQUENCY_RANGE[1],
+                'channels': self.CHANNELS}
+
+    def has_observation(self, time_from, time_to, start_obs, end_obs, min_observation=None):
+        """
+        Determine there is enough data to build spectrum for selected time
+        """
+        if min_observation is None:
+            min_observation = self.MIN_OBSERVATION
+        interval_is_within = self.is_observation_time_within_interval(
+            time_from, time_to, start_obs, end_obs)
+        return bool(interval_is_within) and abs(end_obs - time_from) >= min_observation
+
     def is_observation_time_within_interval(self, time_from, time_to, start_obs, end_obs):
         """
         Determine instrument observation time is within a specified range
@@ -134,6 +210,12 @@ class Orfees(Spectrum):
 
         return start_array, end_array
 
+    def slice_records(self, file_data, start, end, step):
+        """
+        Slice rows of file data for period of observation time
+        """
+        return file_data[round(start / step):round(end / step)]
+
     def slice_array(self, array, start, end, step):
         """
         Slice array for period of observation time
@@ -204,44 +286,68 @@ class Orfees(Spectrum):
         print('orfees', start_point, end_point)
         return data
 
-    def get_data(self, date, time_from, time_to):
+    def get_data(self, date, time_from, time_to, min_observation=None):
         """
         Performs actions to process data
         """
+        return self.get_products(date, time_from, time_to, [self.stokes],
+                                 min_observation)[self.stokes]
+
+    def get_products(self, date, time_from, time_to, products, min_observation=None):
+        """
+        Performs actions to process data for several Stokes parameters.
+        File is opened once, only records of the time window are read
+        """
         file_path = self.get_file(date)
         try:
-            file_data = self.read_file(file_path)
-            instr_data = self.get_stokes_parameter(file_data)
-
-            start_obs, end_obs, step = self.get_observation_time(file_path)
-            user_time_from = self.time_to_seconds(time_from)
-            user_time_to = self.time_to_seconds(time_to)
-
-            interval_is_within = self.is_observation_time_within_interval(
-                            user_time_from, user_time_to, start_obs, end_obs)
-
-            if interval_is_within and abs(end_obs - user_time_from) >= 900:
-                refined_time_from, refined_time_to = self.override_time_interval(
-                                        user_time_from, user_time_to, start_obs, end_obs)
-                start, end = self.get_array_shape(start_obs, refined_time_from,
-                                                  refined_time_to)
-                final_array = self.slice_array(instr_data, start, end, step)
-
-                final_array = self.change_image_contrast(final_array)
-
-                grid_range_from = self.define_grid_range(refined_time_from,
-                                                         user_time_from)
-                grid_range_to = self.define_grid_range(refined_time_to, user_time_from)
-                final_data = self.create_data_dict(final_array, grid_range_from,
-                                                   grid_range_to)
-
-            else:
-                final_array = np.array([[]])
-                final_data = self.create_data_dict(final_array, 0, 0)
+            with DataCache().reading(file_path), fits.open(file_path, memmap=True) as hdul:
+                final_data = self.get_file_products(hdul, date, file_path, time_from,
+                                                    time_to, products, min_observation)
 
         except ValueError:
             print('ORFEES file is not found')
-            final_array = np.array([[]])
-            final_data = self.create_data_dict(final_array, 0, 0)
+            final_data = {product: self.create_empty_data() for product in products}
+
+        return final_data
+
+    def get_file_products(self, hdul, date, file_path, time_from, time_to, products,
+                          min_observation=None):
+        """
+        Build data of Stokes parameters from opened file
+        """
+        start_obs, end_obs, step = self.get_header_time(hdul)
+        Catalog().add_record(self.name, date, file_path, start_obs, end_obs, step,
+                             self.FREQUENCY_RANGE[0], self.FREQUENCY_RANGE[1],
+                             self.CHANNELS)
+        user_time_from = self.time_to_seconds(time_from)
+        user_time_to = self.time_to_seconds(time_to)
+
+        if self.has_observation(user_time_from, user_time_to, start_obs, end_obs,
+                                min_observation):
+            refined_time_from, refined_time_to = self.override_time_interval(
+                                    user_time_from, user_time_to, start_obs, end_obs)
+            start, end = self.get_array_shape(start_obs, refined_time_from,
+                                              refined_time_to)
+            file_data = self.slice_records(hdul[2].data, start, end, step)
+            sliced = self.get_stokes_parameters(file_data, products)
+
+            grid_range_from = self.define_grid_range(refined_time_from,
+                                                     user_time_from)
+            grid_range_to = self.define_grid_range(refined_time_to, user_time_from)
+            frequencies = self.get_band_frequencies(hdul)
+
+            final_data = {}
+            for product in products:
+                if product == 'V/I':
+                    final_array = self.get_polarization_degree(sliced['V'], sliced['I'])
+                else:
+                    final_array = self.change_image_contrast(sliced[product])
+                final_data[product] = self.create_data_dict(final_array,
+                                                            grid_range_from,
+                                                            grid_range_to)
+                final_data[product]['frequencies'] = frequencies
+
+        else:
+            final_data = {product: self.create_empty_data() for product in products}
 
         return final_data
@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import numpy as np
 from abc import ABCMeta, abstractmethod
 from datetime import datetime, date
 
@@ -58,3 +59,38 @@ class Spectrum(object):
     def define_grid_range(self, instr_time, start_point):
         """ Define points of instrument range on the grid """
         return round(instr_time - start_point)
+
+    def has_observation(self, time_from, time_to, start_obs, end_obs):
+        """
+        Determine observation time overlaps the user-selected time interval
+        """
+        return time_from < end_obs and time_to > start_obs
+
+    def get_polarization_degree(self, polarization, intensity):
+        """ Return ratio of polarization to intensity """
+        polarization = np.asarray(polarization, dtype=float)
+        ratio = np.divide(polarization, intensity, out=np.zeros_like(polarization),
+                          where=intensity != 0)
+        return np.clip(ratio, -1, 1)
+
+    def get_frequencies(self, channels):
+        """
+        Return frequencies of channels in MHz from constants of instrument,
+        used when file has no frequency table. Rows of instrument array go
+        from the lowest frequency
+        """
+        return np.linspace(self.FREQUENCY_RANGE[0], self.FREQUENCY_RANGE[1], channels)
+
+    def get_header_frequencies(self, header, channels):
+        """
+        Return frequencies of channels in MHz from linear frequency axis of
+        FITS header, the second axis of image
+        """
+        if 'CRVAL2' not in header or 'CDELT2' not in header:
+            return self.get_frequencies(channels)
+        pixels = np.arange(1, channels + 1)
+        return header['CRVAL2'] + (pixels - header.get('CRPIX2', 1)) * header['CDELT2']
+
+    def create_empty_data(self):
+        """ Create dictionary of instrument without data """
+        return self.create_data_dict(np.array([[]]), 0, 0)
@@ -1,55 +1,175 @@
 #!/usr/bin/env python3
 """ The class for building dynamic radio spectrums """
 import os
+import time
+import glob
+import threading
 import numpy as np
+from collections import OrderedDict
 from astropy.io import fits
-from raodata.Data import Data
 from dynamicspectrum.dynamicspectrum.instruments.time_profile import TimeProfile
+from dynamicspectrum.dynamicspectrum.catalog import Catalog
+from dynamicspectrum.dynamicspectrum.manifest import Manifest
+from dynamicspectrum.dynamicspectrum.download import Download
+from dynamicspectrum.dynamicspectrum.data_cache import DataCache
+from dynamicspectrum.dynamicspectrum import exceptions
 
 
 class SRH(TimeProfile):
     """
     This class operates SRH data
     """
+    name = 'srh'
+    FOLDER = os.path.join('data', 'SRH')
+    OFFLINE = False
+    FREQUENCY = 5700
+    CACHED_FILES = 4
+    EMPTY_TTL = 600
+
+    _profiles = OrderedDict()
+    _profiles_lock = threading.Lock()
+
+    def __init__(self, offline=None, client=None, frequencies=None):
+        self.offline = self.OFFLINE if offline is None else offline
+        self.client = client
+        self.frequencies = frequencies or []
+
+    def get_client(self):
+        """ Return client of RAO data service """
+        if self.client is None:
+            from raodata.Data import Data
+            self.client = Data()
+        return self.client
+
+    def query_files(self, date):
+        """
+        Return list of SRH files for the day from data service
+        """
+        try:
+            return list(self.get_client().get_files('SRH', 'cp', date, date))
+        except Exception as error:
+            raise exceptions.SRHFileIsNotExists(str(error))
+
+    def find_local_files(self, date):
+        """ Return names of SRH files of the day found in directory """
+        pattern = os.path.join(self.FOLDER, 'srh_cp_' + date.strftime('%Y%m%d') + '*')
+        return sorted(os.path.basename(path) for path in glob.glob(pattern)
+                      if not path.endswith('.part'))
+
+    def is_known_empty(self, manifest, date):
+        """
+        Determine data service has returned no files for the day. Result for
+        the current UT day expires, because files may still appear
+        """
+        if manifest.get_files(date) != []:
+            return False
+        if not Download.is_current_day(date):
+            return True
+        checked = manifest.get_checked(date)
+        return checked is not None and time.time() - checked < self.EMPTY_TTL
+
     def get_file(self, date):
         """
-        Return file path of instrument in directory
+        Return file path of instrument in directory. Files listed in local
+        manifest or found in directory are opened without querying data service.
+        Days without files are remembered in manifest
         """
-        # file_path = 'data/SRH/srh_cp_' + date.strftime('%Y%m%d') + '.fits'
-        # print(file_path)
-        files = Data().get_files('SRH', 'cp', date, date)
+        manifest = Manifest(self.FOLDER)
+        paths = manifest.get_local_paths(date)
+        if not paths:
+            names = self.find_local_files(date)
+            if names:
+                manifest.set_files(date, names)
+                paths = [os.path.join(self.FOLDER, name) for name in names]
+        if paths:
+            DataCache().touch(paths[-1])
+            return paths[-1]
+        if self.offline:
+            raise exceptions.SRHFileIsNotExists('SRH file is not found in offline mode')
+        if self.is_known_empty(manifest, date):
+            raise exceptions.SRHFileIsNotExists('SRH file is not found')
+
+        files = self.query_files(date)
+        os.makedirs(self.FOLDER, exist_ok=True)
         for f in files:
-            if not os.path.exists('data/SRH/'+f.name):
-                f.save_to('data/SRH/'+f.name)
-        file_path = os.path.join('data', 'SRH', f.name)
+            self.save_file(f, os.path.join(self.FOLDER, f.name))
+        if not files:
+            manifest.set_files(date, [])
+            raise exceptions.SRHFileIsNotExists('SRH file is not found')
+
+        manifest.set_files(date, [f.name for f in files])
+        file_path = os.path.join(self.FOLDER, files[-1].name)
+        DataCache().touch(file_path)
+        DataCache().evict()
         return file_path
 
+    def save_file(self, remote_file, file_path):
+        """
+        Save file of data service to directory. Only one thread or process
+        downloads the file, file appears only after it is saved completely
+        """
+        with Download().lock_file(file_path):
+            if not os.path.exists(file_path):
+                remote_file.save_to(file_path + '.part')
+                os.replace(file_path + '.part', file_path)
+
     def read_file(self, file_path):
         """
         Read file. Return array of data
         """
-        file_data = fits.getdata(file_path, ext=2, dtype=np.float)
+        file_data = fits.getdata(file_path, ext=2, dtype=float)
         return file_data
 
-    def define_frequency_index(self, file_path):
+    def read_profiles(self, file_path):
+        """
+        Read frequency table, time and flux of all frequencies in one pass
+        of memory-mapped file. Profiles are cached for repeated requests
+        """
+        key = (file_path, os.path.getmtime(file_path))
+        with self._profiles_lock:
+            if key in self._profiles:
+                self._profiles.move_to_end(key)
+                return self._profiles[key]
+
+        with DataCache().reading(file_path), fits.open(file_path, memmap=True) as hdul:
+            frequencies = np.array(hdul[1].data['frequencies'], dtype=float).ravel()
+            time = np.array(hdul[2].data['time'], dtype=float)
+            flux = np.array(hdul[2].data['I'], dtype=float)
+        profiles = {'frequencies': frequencies, 'time': time, 'I': flux, 'series': {}}
+
+        with self._profiles_lock:
+            self._profiles[key] = profiles
+            while len(self._profiles) > self.CACHED_FILES:
+                self._profiles.popitem(last=False)
+
+        return profiles
+
+    def define_frequency_index(self, frequencies, frequency=None):
         """
         Define index of frequency in array
         """
-        file_data = fits.getdata(file_path, ext=1, dtype=np.float)
-        freq_array = file_data['frequencies']
-        freq_index = super().find_index(freq_array, 5700)
+        return super().find_index(frequencies, frequency or self.FREQUENCY)
 
-        return freq_index
+    def get_series(self, profiles, index):
+        """
+        Return time profile of frequency ordered by time
+        """
+        if index not in profiles['series']:
+            time = self.get_time_data(profiles, index)
+            flux = self.get_flux_data(profiles, index)
+            profiles['series'][index] = super().sort_profile(time, flux)
+
+        return profiles['series'][index]
 
     def get_time_data(self, file_data, index):
         """
-        Return array of SRH time data for 5.7 GHz
+        Return array of SRH time data for frequency index
         """
         return file_data['time'][index]
 
     def get_flux_data(self, file_data, index):
         """
-        Return array of SRH flux data for 5.7 GHz
+        Return array of SRH flux data for frequency index
         """
         return file_data['I'][index]
 
@@ -66,43 +186,96 @@ class SRH(TimeProfile):
         elif time_from <= start_obs and time_to >= end_obs:
             return True
 
+    def get_catalog_record(self, file_path):
+        """
+        Return observation parameters from frequency table and time column
+        """
+        with DataCache().reading(file_path), fits.open(file_path, memmap=True) as hdul:
+            freq_array = np.asarray(hdul[1].data['frequencies'], dtype=float).ravel()
+            freq_index = self.define_frequency_index(freq_array)
+            time = np.asarray(hdul[2].data['time'][freq_index], dtype=float)
+
+        return self.create_catalog_record(time, freq_array)
+
+    def create_catalog_record(self, time, freq_array):
+        """ Create observation parameters of SRH file """
+        cadence = (time[-1] - time[0]) / (time.size - 1) if time.size > 1 else 0
+
+        return {'time_obs': float(time[0]), 'time_end': float(time[-1]),
+                'cadence': float(cadence), 'freq_min': float(freq_array.min()),
+                'freq_max': float(freq_array.max()), 'channels': int(freq_array.size)}
+
+    def has_observation(self, time_from, time_to, start_obs, end_obs):
+        """
+        Determine there is data to build time profile for selected time
+        """
+        return bool(self.is_observation_time_within_interval(
+            time_from, time_to, start_obs, end_obs))
+
     def align_profile(self, flux, time):
         """
         Delete points close to zero
         """
-        index = (np.where(flux <= 0.003))
-        time = np.delete(time, index)
-        flux = np.delete(flux, index)
+        is_valid = flux > 0.003
+        time = time[is_valid]
+        flux = flux[is_valid]
 
         return flux, time
 
-    def get_data(self, date, time_from, time_to):
-        file_path = self.get_file(date)
+    def cut_profile(self, time, flux, time_from_sec, time_to_sec):
+        """
+        Cut time profile for selected time
+        """
+        if self.has_observation(time_from_sec, time_to_sec, time[0], time[-1]):
+            start_index, end_index = super().find_windows(time, time_from_sec,
+                                                          time_to_sec)
+            flux, time = self.align_profile(flux[start_index:end_index],
+                                            time[start_index:end_index])
+        else:
+            time = 0
+            flux = 0
+
+        return super().create_data_dict(time, flux, time_from_sec, time_to_sec)
+
+    def get_profiles(self, date, time_from, time_to, frequencies):
+        """
+        Return dictionary of time profiles for list of frequencies in MHz.
+        All frequencies are read from file at once
+        """
         try:
-            file_data = self.read_file(file_path)
-            freq_index = self.define_frequency_index(file_path)
-            time = self.get_time_data(file_data, freq_index)
-            flux = self.get_flux_data(file_data, freq_index)
+            file_path = self.get_file(date)
+            profiles = self.read_profiles(file_path)
+
+            time, flux = self.get_series(
+                profiles, self.define_frequency_index(profiles['frequencies']))
+            Catalog().add_record(self.name, date, file_path, **self.create_catalog_record(
+                time, profiles['frequencies']))
 
             time_from_sec = super().time_to_seconds(time_from)
             time_to_sec = super().time_to_seconds(time_to)
 
-            is_within = self.is_observation_time_within_interval(
-                time_from_sec, time_to_sec, time[0], time[-1])
-            if is_within:
-                start_index = super().find_index(time, time_from_sec)
-                end_index = super().find_index(time, time_to_sec)
-
-                time = time[start_index:end_index]
-                flux = flux[start_index:end_index]
+            data = {}
+            for frequency in frequencies:
+                index = self.define_frequency_index(profiles['frequencies'], frequency)
+                time, flux = self.get_series(profiles, index)
+                data[frequency] = self.cut_profile(time, flux, time_from_sec, time_to_sec)
 
-                flux, time = self.align_profile(flux, time)
-            else:
-                time = 0
-                flux = 0
+        except (FileNotFoundError, exceptions.SRHFileIsNotExists):
+            print('SRH file is not found')
+            data = {frequency: self.create_data_dict(0, 0, 0, 0) for frequency in frequencies}
+        return data
 
-            data = super().create_data_dict(time, flux, time_from_sec, time_to_sec)
+    def get_data(self, date, time_from, time_to):
+        """
+        Return time profile of main frequency. Profiles of other frequencies
+        are kept in its 'frequencies' dictionary
+        """
+        frequencies = [self.FREQUENCY] + [freq for freq in self.frequencies
+                                          if freq != self.FREQUENCY]
+        profiles = self.get_profiles(date, time_from, time_to, frequencies)
 
-        except FileNotFoundError:
-            data = self.create_data_dict(0, 0, 0, 0)
+        data = profiles[self.FREQUENCY]
+        if len(frequencies) > 1:
+            data['frequencies'] = {frequency: profile for frequency, profile
+                                   in profiles.items() if frequency != self.FREQUENCY}
         return data
@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 """ The class for building dynamic radio spectrums """
 import os
+import numpy as np
 from urllib.parse import urljoin
-from scipy.io import readsav
 from dynamicspectrum.dynamicspectrum.instruments.spectrum import Spectrum
 from dynamicspectrum.dynamicspectrum.download import Download
+from dynamicspectrum.dynamicspectrum.storage import Storage
+from dynamicspectrum.dynamicspectrum.catalog import Catalog
+from dynamicspectrum.dynamicspectrum.data_cache import DataCache
 
 
 class Stereo(Spectrum):
@@ -12,8 +15,12 @@ class Stereo(Spectrum):
     This class operates Stereo instrument data
     """
 
+    name = 'stereo'
     START_OBS = 0
     END_OBS = 86400
+    CADENCE = 60
+    CHANNELS = 319
+    FREQUENCY_RANGE = (0.0025, 16.025)
 
     def get_file_name(self, date):
         """ Return file name to download from instrument server """
@@ -31,16 +38,39 @@ class Stereo(Spectrum):
         href = str(date.year) + '/' + file_name
         url = urljoin(base_url, href)
 
-        Download().download_file('STEREO', file_path, url)
+        Download().download_file('STEREO', file_path, url, date)
 
-        return file_path
+        return Storage.find(file_path)
 
     def read_file(self, file_path):
         """ Read file. Return array of data """
-        file_data = readsav(file_path)
-        spectrum = file_data["spectrum"].T
-
-        return spectrum
+        return self.get_spectrum(self.read_sav(file_path))
+
+    def read_sav(self, file_path):
+        """ Read IDL save file while it is protected from removal """
+        with DataCache().reading(file_path):
+            return Storage.read_sav(file_path)
+
+    def get_spectrum(self, file_data):
+        """ Return array of data from content of file """
+        return file_data["spectrum"].T
+
+    def get_frequencies(self, channels):
+        """ Return log-spaced frequencies of channels in MHz """
+        return np.geomspace(self.FREQUENCY_RANGE[0], self.FREQUENCY_RANGE[1], channels)
+
+    def get_file_frequencies(self, file_data, channels):
+        """ Return frequencies of channels in MHz from table of file in kHz """
+        frequencies = file_data.get('frequencies')
+        if frequencies is None or np.size(frequencies) != channels:
+            return self.get_frequencies(channels)
+        return np.asarray(frequencies, dtype=float).ravel() / 1000
+
+    def get_catalog_record(self, file_path, channels=None):
+        """ Return observation parameters of instrument file without reading it """
+        return {'time_obs': self.START_OBS, 'time_end': self.END_OBS,
+                'cadence': self.CADENCE, 'freq_min': self.FREQUENCY_RANGE[0],
+                'freq_max': self.FREQUENCY_RANGE[1], 'channels': channels or self.CHANNELS}
 
     def override_time_interval(self, time_from, time_to):
         """ Check the user-selected time interval for data availability """
@@ -82,7 +112,10 @@ class Stereo(Spectrum):
         url = "https://solar-radio.gsfc.nasa.gov/data/stereo/new_summary/"
         try:
             file_path = self.get_file(date, url)
-            instr_data = self.read_file(file_path)
+            file_data = self.read_sav(file_path)
+            instr_data = self.get_spectrum(file_data)
+            Catalog().add_record(self.name, date, file_path, **self.get_catalog_record(
+                file_path, instr_data.shape[0]))
 
             user_time_from = super().time_to_seconds(time_from)
             user_time_to = super().time_to_seconds(time_to)
@@ -98,6 +131,8 @@ class Stereo(Spectrum):
 
             final_data = self.create_data_dict(final_array, grid_range_from,
                                                grid_range_to)
+            final_data['frequencies'] = self.get_file_frequencies(file_data,
+                                                                  instr_data.shape[0])
 
         except FileNotFoundError:
             print('STEREO file is not found')
@@ -47,6 +47,48 @@ class TimeProfile(object):
         index = (np.abs(array - value)).argmin()
         return index
 
+    def sort_profile(self, time, flux):
+        """
+        Return time profile ordered by time. Ordered profile is returned as is
+        """
+        if time.size > 1 and np.any(time[1:] < time[:-1]):
+            order = np.argsort(time, kind='stable')
+            time = time[order]
+            flux = flux[order]
+
+        return time, flux
+
+    def find_sorted_index(self, array, value):
+        """
+        Find index of nearest value in sorted array with binary search.
+        Value can be an array of values
+        """
+        if array.size < 2:
+            return np.zeros(np.shape(value), dtype=int)[()]
+
+        index = np.clip(np.searchsorted(array, value), 1, array.size - 1)
+        closer_to_left = (value - array[index - 1]) <= (array[index] - value)
+
+        return index - closer_to_left
+
+    def find_windows(self, time, starts, ends):
+        """
+        Find start and end indexes of many time windows in sorted time array
+        """
+        start_index = self.find_sorted_index(time, np.asarray(starts))
+        end_index = self.find_sorted_index(time, np.asarray(ends))
+
+        return start_index, end_index
+
+    def slice_windows(self, time, flux, starts, ends):
+        """
+        Return views of time profile for many time windows
+        """
+        start_index, end_index = self.find_windows(time, starts, ends)
+
+        return [(time[start:end], flux[start:end])
+                for start, end in zip(start_index, end_index)]
+
     def create_data_dict(self, time, flux, start_point, end_point):
         """
         Create dictionary with parameters to build time profile
@@ -54,3 +96,13 @@ class TimeProfile(object):
         data = {'time': time, 'flux': flux, 'ncols': [start_point, end_point]}
 
         return data
+
+    def has_observation(self, time_from, time_to, start_obs, end_obs):
+        """
+        Determine observation time overlaps the user-selected time interval
+        """
+        return time_from < end_obs and time_to > start_obs
+
+    def create_empty_data(self):
+        """ Create dictionary of instrument without data """
+        return self.create_data_dict(0, 0, 0, 0)
@@ -2,10 +2,12 @@
 """ The class for building dynamic radio spectrums """
 import os
 import numpy as np
-import scipy.io as sp
 from urllib.parse import urljoin
 from dynamicspectrum.dynamicspectrum.instruments.spectrum import Spectrum
 from dynamicspectrum.dynamicspectrum.download import Download
+from dynamicspectrum.dynamicspectrum.storage import Storage
+from dynamicspectrum.dynamicspectrum.catalog import Catalog
+from dynamicspectrum.dynamicspectrum.data_cache import DataCache
 
 
 class Wind(Spectrum):
@@ -15,9 +17,17 @@ class Wind(Spectrum):
 
     START_OBS = 0
     END_OBS = 86460
+    CADENCE = 60
+    CHANNELS = 256
+    FREQUENCY_RANGE = {'rad1': (0.02, 1.04), 'rad2': (1.075, 13.825)}
+    FREQUENCY_STEP = {'rad1': 0.004, 'rad2': 0.05}
 
     def __init__(self, receiver):
         self.receiver = receiver
+        if self.receiver == 'rad1':
+            self.name = 'wind1'
+        elif self.receiver == 'rad2':
+            self.name = 'wind2'
 
     def get_file_name(self, date):
         """ Return file name to download from instrument server """
@@ -42,19 +52,30 @@ class Wind(Spectrum):
             href = 'rad2/' + str(date.year) + '/rad2/' + file_name
 
         url = urljoin(base_url, href)
-        Download().download_file('WIND', path, url)
+        Download().download_file('WIND', path, url, date)
 
-        return path
+        return Storage.find(path)
 
     def read_file(self, file_path):
         """
         Read file. Return array of data
         """
-        file_data = sp.readsav(file_path)
+        with DataCache().reading(file_path):
+            file_data = Storage.read_sav(file_path)
         instr_data = file_data["arrayb"]
 
         return instr_data
 
+    def get_catalog_record(self, file_path, channels=None):
+        """
+        Return observation parameters of instrument file without reading it
+        """
+        freq_min, freq_max = self.FREQUENCY_RANGE[self.receiver]
+
+        return {'time_obs': self.START_OBS, 'time_end': self.END_OBS,
+                'cadence': self.CADENCE, 'freq_min': freq_min, 'freq_max': freq_max,
+                'channels': channels or self.CHANNELS}
+
     def override_time_interval(self, time_from, time_to):
         """
         Check the user-selected time interval for data availability
@@ -93,6 +114,14 @@ class Wind(Spectrum):
 
         return array
 
+    def get_frequencies(self, channels):
+        """
+        Return frequencies of receiver channels in MHz. Channels of RAD1 and
+        RAD2 are spaced by 4 and 50 kHz from the lowest frequency
+        """
+        freq_min = self.FREQUENCY_RANGE[self.receiver][0]
+        return freq_min + self.FREQUENCY_STEP[self.receiver] * np.arange(channels)
+
     def create_data_dict(self, array, start_point, end_point):
         """
         Create dictionary with parameters to build spectrum
@@ -113,6 +142,8 @@ class Wind(Spectrum):
         file_path = self.get_file(date, 'https://solar-radio.gsfc.nasa.gov/data/wind/')
         try:
             instr_data = self.read_file(file_path)
+            Catalog().add_record(self.name, date, file_path, **self.get_catalog_record(
+                file_path, instr_data.shape[0]))
 
             user_time_from = super().time_to_seconds(time_from)
             user_time_to = super().time_to_seconds(time_to)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+""" The classes to serve instrument files from local folder like raodata """
+import os
+import re
+import shutil
+
+
+class LocalFile:
+    """
+    This class represents file of local archive
+    """
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+
+    def save_to(self, file_path):
+        """ Copy file to the path """
+        shutil.copyfile(self.path, file_path)
+
+
+class LocalData:
+    """
+    This class replaces raodata Data client. Files are searched in
+    folder by instrument name, file type and date in file name
+    """
+    def __init__(self, folder):
+        self.folder = folder
+        self.requests = 0
+
+    def get_files(self, instrument, filetype, timefrom, timeto):
+        """ Return list of files for a period """
+        self.requests += 1
+        instrument_folder = os.path.join(self.folder, instrument)
+        if not os.path.exists(instrument_folder):
+            return []
+
+        first, last = timefrom.strftime('%Y%m%d'), timeto.strftime('%Y%m%d')
+        files = []
+        for name in sorted(os.listdir(instrument_folder)):
+            match = re.search(r'(\d{8})', name)
+            if match and '_' + filetype + '_' in name and first <= match.group(1) <= last:
+                files.append(LocalFile(name, os.path.join(instrument_folder, name)))
+
+        return files
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+""" The class for local manifest of instrument files """
+import os
+import time
+import json
+import threading
+
+
+class Manifest:
+    """
+    This class stores names of instrument files found on data server
+    for each day, so local files are resolved without remote queries
+    """
+    FILE_NAME = 'manifest.json'
+    CHECKED = '_checked'
+    _lock = threading.Lock()
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.path = os.path.join(folder, self.FILE_NAME)
+
+    def read(self):
+        """ Read manifest file. Return dictionary of files by date """
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as _f:
+                return json.load(_f)
+        except ValueError:
+            return {}
+
+    def write(self, content):
+        """ Write manifest file atomically """
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder, exist_ok=True)
+        temp_path = self.path + '.' + str(os.getpid()) + '.tmp'
+        with open(temp_path, 'w') as _f:
+            json.dump(content, _f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    @staticmethod
+    def create_date_part(date):
+        """ Create the date key of manifest """
+        return date.strftime('%Y-%m-%d')
+
+    def get_files(self, date):
+        """ Return list of file names for the day or None if day is unknown """
+        return self.read().get(self.create_date_part(date))
+
+    def set_files(self, date, names):
+        """
+        Save list of file names for the day. Time of saving is kept to know
+        when empty list of the day has to be checked again
+        """
+        date_part = self.create_date_part(date)
+        with self._lock:
+            content = self.read()
+            content[date_part] = list(names)
+            content.setdefault(self.CHECKED, {})[date_part] = time.time()
+            self.write(content)
+
+    def get_checked(self, date):
+        """ Return time when list of files for the day was saved or None """
+        return self.read().get(self.CHECKED, {}).get(self.create_date_part(date))
+
+    def get_local_paths(self, date):
+        """
+        Return paths of files for the day if all of them exist locally
+        """
+        names = self.get_files(date)
+        if not names:
+            return None
+
+        paths = [os.path.join(self.folder, name) for name in names]
+        if all(os.path.exists(path) for path in paths):
+            return paths
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+""" The class for rendering dynamic spectrum without matplotlib """
+import io
+import threading
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from dynamicspectrum.dynamicspectrum import exceptions
+
+
+class RasterRenderer:
+    """
+    This class renders regridded dynamic spectrum straight into image buffer.
+    Values are converted to 8 bits and colored by lookup tables, frame, ticks
+    and frequency labels are taken from cached template
+    """
+    WIDTH = 800
+    HEIGHT = 600
+    BOX = (100, 72, 720, 528)
+    BACKGROUND = (174, 171, 171)
+    PROFILE_COLORS = {'goes': (255, 0, 0), 'goes17': (255, 0, 0), 'srh': (0, 128, 0)}
+    FREQUENCY_TICKS = [0.01, 0.1, 1, 10, 100, 1000]
+    IMAGE_FORMATS = {'png': 'PNG', 'jpeg': 'JPEG', 'jpg': 'JPEG', 'webp': 'WEBP'}
+
+    _templates = {}
+    _templates_lock = threading.Lock()
+
+    def __init__(self, width=None, height=None, box=None):
+        self.width = width or self.WIDTH
+        self.height = height or self.HEIGHT
+        self.box = box or self.BOX
+
+    @property
+    def plot_size(self):
+        """ Return width and height of plot area in pixels """
+        return self.box[2] - self.box[0], self.box[3] - self.box[1]
+
+    @staticmethod
+    def get_font(size=10):
+        """ Return default font of PIL """
+        try:
+            return ImageFont.load_default(size=size)
+        except TypeError:
+            return ImageFont.load_default()
+
+    def create_lut(self, stokes):
+        """
+        Create lookup table of colormap. Intensity is drawn from white to
+        black like gray_r, polarization from grey to black. The last color
+        is used for cells without data
+        """
+        values = np.linspace(0, 1, 256)
+        if stokes == 'I':
+            levels = (1 - values) * 255
+        else:
+            levels = (1 - values) * 128
+        lut = np.repeat(np.round(levels)[:, None], 3, axis=1)
+
+        return np.vstack([lut, [self.BACKGROUND]]).astype(np.uint8)
+
+    @staticmethod
+    def to_indices(raster):
+        """ Convert values from 0 to 1 to indices of lookup table """
+        indices = np.round(np.clip(np.nan_to_num(raster), 0, 1) * 255).astype(np.uint16)
+        indices[np.isnan(raster)] = 256
+
+        return indices
+
+    def get_frequency_position(self, frequency, freq_min, freq_max):
+        """ Return vertical pixel of frequency, the lowest frequency is on top """
+        share = (np.log10(frequency) - np.log10(freq_min)) /\
+            (np.log10(freq_max) - np.log10(freq_min))
+        return self.box[1] + share * (self.box[3] - self.box[1])
+
+    def create_template(self, freq_min, freq_max):
+        """ Draw frame, frequency ticks and labels """
+        image = Image.new('RGB', (self.width, self.height), 'white')
+        draw = ImageDraw.Draw(image)
+        font = self.get_font()
+        left, top, right, bottom = self.box
+        draw.rectangle([left - 1, top - 1, right, bottom], outline='black')
+
+        for frequency in self.FREQUENCY_TICKS:
+            if not freq_min <= frequency <= freq_max:
+                continue
+            y = round(self.get_frequency_position(frequency, freq_min, freq_max))
+            draw.line([left - 5, y, left - 1, y], fill='black')
+            draw.text((left - 8, y), str(frequency), fill='black', font=font, anchor='rm')
+
+        label = Image.new('RGB', (120, 14), 'white')
+        ImageDraw.Draw(label).text((60, 7), 'Frequency (MHz)', fill='black', font=font,
+                                   anchor='mm')
+        label = label.rotate(90, expand=True)
+        image.paste(label, (left - 70, (top + bottom - label.height) // 2))
+        draw.text(((left + right) // 2, bottom + 30), 'Time (UT)', fill='black',
+                  font=font, anchor='mt')
+
+        return np.asarray(image).copy()
+
+    def get_template(self, freq_min, freq_max):
+        """ Return cached template of image """
+        key = (self.width, self.height, self.box, freq_min, freq_max)
+        with self._templates_lock:
+            template = self._templates.get(key)
+            if template is None:
+                template = self.create_template(freq_min, freq_max)
+                self._templates[key] = template
+
+        return template
+
+    def draw_time_labels(self, draw, time_axis):
+        """ Draw time ticks and labels """
+        left, top, right, bottom = self.box
+        font = self.get_font()
+        positions = np.linspace(left, right - 1, len(time_axis))
+        for x, label in zip(positions, time_axis):
+            draw.line([x, bottom, x, bottom + 4], fill='black')
+            draw.text((x, bottom + 8), str(label), fill='black', font=font, anchor='mt')
+
+    def draw_profile(self, draw, name, data):
+        """ Draw time profile over spectrum """
+        time, flux = data['time'], data['flux']
+        if not isinstance(time, np.ndarray) or time.size < 2:
+            return
+        flux = np.asarray(flux, dtype=float)
+        if name in ['goes', 'goes17']:
+            flux = np.log10(np.clip(flux, 1e-12, None))
+        left, top, right, bottom = self.box
+        step = max(1, time.size // (2 * (right - left)))
+        time, flux = time[::step], flux[::step]
+
+        low, high = np.nanmin(flux), np.nanmax(flux)
+        margin = (high - low) * 0.05 or 1
+        span = data['ncols'][1] - data['ncols'][0] or 1
+        x = left + (time - data['ncols'][0]) / span * (right - left)
+        y = bottom - (flux - low + margin) / (high - low + 2 * margin) * (bottom - top)
+        inside = (x >= left) & (x <= right) & np.isfinite(y)
+        draw.line(list(zip(x[inside], y[inside])),
+                  fill=self.PROFILE_COLORS.get(name, (0, 0, 255)), width=1)
+
+    def render(self, raster, title, time_axis, profiles, stokes, freq_min, freq_max,
+               image_format='png', quality=None):
+        """
+        Render raster of plot size with profiles and labels.
+        Return encoded image bytes
+        """
+        image_format = image_format.lower()
+        if image_format not in self.IMAGE_FORMATS:
+            raise exceptions.UnsupportedImageFormat(
+                "Image format is not supported: " + image_format)
+
+        pixels = self.get_template(freq_min, freq_max).copy()
+        left, top, right, bottom = self.box
+        pixels[top:bottom, left:right] = self.create_lut(stokes)[self.to_indices(raster)]
+
+        image = Image.fromarray(pixels)
+        draw = ImageDraw.Draw(image)
+        draw.text(((left + right) // 2, top - 20), title, fill='black',
+                  font=self.get_font(12), anchor='mb')
+        self.draw_time_labels(draw, time_axis)
+        for name, data in profiles.items():
+            self.draw_profile(draw, name, data)
+
+        options = {} if quality is None or image_format == 'png' else {'quality': quality}
+        buffer = io.BytesIO()
+        image.save(buffer, format=self.IMAGE_FORMATS[image_format], **options)
+
+        return buffer.getvalue()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+""" The class for regridding spectra of instruments on one raster """
+import threading
+import numpy as np
+from scipy import sparse
+
+
+class Regrid:
+    """
+    This class maps spectra of instruments onto one log-frequency and time
+    raster using frequency tables of instruments. Frequency weights are
+    cached for each frequency table, overlapping instruments are averaged
+    """
+    FREQ_MIN = 0.01
+    FREQ_MAX = 1100
+    ROWS = 1000
+    COLUMNS = 1600
+
+    _weights = {}
+    _weights_lock = threading.Lock()
+
+    def __init__(self, rows=None, columns=None, freq_min=None, freq_max=None):
+        self.rows = rows or self.ROWS
+        self.columns = columns or self.COLUMNS
+        self.freq_min = freq_min or self.FREQ_MIN
+        self.freq_max = freq_max or self.FREQ_MAX
+
+    def get_row_edges(self):
+        """ Return log10 of frequency edges of raster rows, from the lowest """
+        return np.linspace(np.log10(self.freq_min), np.log10(self.freq_max),
+                           self.rows + 1)
+
+    def get_frequency_axis(self):
+        """ Return frequencies of raster rows centres in MHz """
+        edges = self.get_row_edges()
+        return 10 ** ((edges[:-1] + edges[1:]) / 2)
+
+    def create_weights(self, frequencies):
+        """
+        Create sparse matrix mapping channels to raster rows. Channels
+        inside row are averaged, rows between channels are interpolated
+        """
+        log_freq = np.log10(np.asarray(frequencies, dtype=float))
+        edges = self.get_row_edges()
+        centres = (edges[:-1] + edges[1:]) / 2
+        row_index, channel_index, values = [], [], []
+
+        channel_rows = np.searchsorted(edges, log_freq, side='right') - 1
+        inside = (channel_rows >= 0) & (channel_rows < self.rows)
+        counts = np.bincount(channel_rows[inside], minlength=self.rows)
+        channels = np.flatnonzero(inside)
+        row_index.append(channel_rows[channels])
+        channel_index.append(channels)
+        values.append(1 / counts[channel_rows[channels]])
+
+        order = np.argsort(log_freq)
+        sorted_freq = log_freq[order]
+        rows = np.flatnonzero((counts == 0) & (centres >= sorted_freq[0]) &
+                              (centres <= sorted_freq[-1]))
+        if rows.size and sorted_freq.size > 1:
+            upper = np.clip(np.searchsorted(sorted_freq, centres[rows]), 1,
+                            sorted_freq.size - 1)
+            lower = upper - 1
+            span = sorted_freq[upper] - sorted_freq[lower]
+            fraction = np.divide(centres[rows] - sorted_freq[lower], span,
+                                 out=np.zeros(rows.size), where=span > 0)
+            row_index += [rows, rows]
+            channel_index += [order[lower], order[upper]]
+            values += [1 - fraction, fraction]
+
+        return sparse.csr_matrix(
+            (np.concatenate(values), (np.concatenate(row_index),
+                                      np.concatenate(channel_index))),
+            shape=(self.rows, log_freq.size))
+
+    def get_weights(self, name, frequencies):
+        """ Return cached frequency weights of frequency table of instrument """
+        frequencies = np.asarray(frequencies, dtype=float)
+        key = (name, self.rows, self.freq_min, self.freq_max, frequencies.tobytes())
+        with self._weights_lock:
+            weights = self._weights.get(key)
+        if weights is None:
+            weights = self.create_weights(frequencies)
+            with self._weights_lock:
+                self._weights[key] = weights
+
+        return weights
+
+    def resample_time(self, array, ncols, duration):
+        """
+        Resample columns of array to raster columns. Columns of array inside
+        raster column are averaged. Return first raster column and array
+        """
+        edges = np.linspace(0, duration, self.columns + 1)
+        first = np.searchsorted(edges[1:], ncols[0], side='right')
+        last = np.searchsorted(edges[:-1], ncols[1], side='left')
+        if last <= first or ncols[1] <= ncols[0]:
+            return first, np.empty((array.shape[0], 0))
+
+        samples = array.shape[1]
+        scale = samples / (ncols[1] - ncols[0])
+        start = np.clip(np.floor((edges[first:last] - ncols[0]) * scale), 0,
+                        samples - 1).astype(int)
+        end = np.clip(np.floor((edges[first + 1:last + 1] - ncols[0]) * scale), 0,
+                      samples).astype(int)
+        end = np.maximum(end, start + 1)
+        cumulative = np.zeros((array.shape[0], samples + 1))
+        np.cumsum(array, axis=1, out=cumulative[:, 1:])
+
+        return first, (cumulative[:, end] - cumulative[:, start]) / (end - start)
+
+    @staticmethod
+    def normalize(array, parameter):
+        """ Scale values of instrument to range from 0 to 1 """
+        array = np.asarray(array, dtype=float)
+        if parameter == 'V/I':
+            return (np.clip(array, -1, 1) + 1) / 2
+        low, high = np.nanmin(array), np.nanmax(array)
+        if high <= low:
+            return np.zeros_like(array)
+
+        return (array - low) / (high - low)
+
+    def add(self, raster, counts, name, data, frequencies, duration, parameter='I'):
+        """ Accumulate spectrum of instrument on raster """
+        array = data['array']
+        if array.size == 0:
+            return
+        array = self.normalize(array, data.get('parameter', parameter))
+        weights = self.get_weights(name, frequencies)
+        first, columns = self.resample_time(array, data['ncols'], duration)
+        if columns.shape[1] == 0:
+            return
+
+        covered = np.asarray(weights.sum(axis=1)).ravel() > 0
+        window = slice(first, first + columns.shape[1])
+        raster[covered, window] += (weights @ columns)[covered]
+        counts[covered, window] += 1
+
+    def create_raster(self, spectra, duration, parameter='I'):
+        """
+        Return raster of spectra. Spectra is list of tuples with instrument
+        name, data and frequency table. Raster rows go from the lowest
+        frequency, cells without data are NaN
+        """
+        raster = np.zeros((self.rows, self.columns))
+        counts = np.zeros((self.rows, self.columns))
+        for name, data, frequencies in spectra:
+            self.add(raster, counts, name, data, frequencies, duration, parameter)
+
+        return np.divide(raster, counts, out=np.full_like(raster, np.nan),
+                         where=counts > 0)
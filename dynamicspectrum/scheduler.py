@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+""" The class for scheduling render jobs by priority and memory """
+import heapq
+import itertools
+import threading
+from datetime import datetime, date
+from concurrent.futures import Future, ThreadPoolExecutor
+from dynamicspectrum.dynamicspectrum.builder import Builder
+from dynamicspectrum.dynamicspectrum.catalog import Catalog
+from dynamicspectrum.dynamicspectrum import exceptions
+
+
+class Job:
+    """
+    This class represents render job waiting in scheduler queue
+    """
+    def __init__(self, priority, func, args, kwargs, cost):
+        self.priority = priority
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.cost = cost
+        self.future = Future()
+
+
+class Scheduler:
+    """
+    This class runs render jobs in pool of threads. Interactive jobs are
+    started before batch jobs, a job is started when its estimated memory
+    fits into the budget. Batch jobs use only part of the budget, so memory
+    is left for interactive users. Jobs are rejected when they can never
+    fit, when queue of their class is full or expected wait is too long
+    """
+    PRIORITIES = {'interactive': 0, 'batch': 1}
+    WORKERS = 4
+    MEMORY_BUDGET = 2 * 1024 ** 3
+    BATCH_SHARE = 0.75
+    MAX_QUEUE = {'interactive': 32, 'batch': 1024}
+    MAX_WAIT = {'interactive': 30, 'batch': None}
+    BYTES_PER_VALUE = 8
+    COPIES = 4
+    FIGURE_MEMORY = 32 * 1024 ** 2
+    VALUES_PER_SECOND = 2 * 10 ** 7
+    DEFAULT_RECORD = {'cadence': 1.0, 'channels': 400}
+    DEFAULT_RECORDS = {'orfees': {'cadence': 0.1, 'channels': 1000},
+                       'amateras': {'cadence': 1.17, 'channels': 410},
+                       'assa': {'cadence': 1.17, 'channels': 410},
+                       'wind1': {'cadence': 60, 'channels': 256},
+                       'wind2': {'cadence': 60, 'channels': 256},
+                       'stereo': {'cadence': 60, 'channels': 319},
+                       'goes': {'cadence': 2.0, 'channels': 2},
+                       'goes17': {'cadence': 1.0, 'channels': 2}}
+
+    def __init__(self, workers=WORKERS, memory_budget=MEMORY_BUDGET):
+        self.workers = workers
+        self.memory_budget = memory_budget
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.queue = []
+        self.counter = itertools.count()
+        self.running = []
+        self.memory_used = 0
+
+    def get_builder(self):
+        """ Return builder of the current worker thread """
+        if not hasattr(self.local, 'builder'):
+            self.local.builder = Builder()
+        return self.local.builder
+
+    @staticmethod
+    def get_window(time_from, time_to):
+        """ Return length of time window in seconds """
+        window = datetime.combine(date.min, time_to) - datetime.combine(date.min, time_from)
+        return max(window.total_seconds(), 0)
+
+    def estimate_cost(self, date_event, time_from, time_to, instruments):
+        """
+        Estimate memory in bytes and CPU time in seconds of job from catalog.
+        Number of values is window length divided by cadence of instrument
+        multiplied by its channels. Instruments without record in catalog
+        get typical cadence and channels of instrument
+        """
+        window = self.get_window(time_from, time_to)
+        values = 0
+        for instrument in instruments:
+            default = self.DEFAULT_RECORDS.get(instrument, self.DEFAULT_RECORD)
+            record = Catalog().get_record(instrument, date_event) or default
+            cadence = record['cadence'] or default['cadence']
+            channels = record['channels'] or default['channels']
+            values += window / cadence * channels
+
+        return {'memory': int(values * self.BYTES_PER_VALUE * self.COPIES) +
+                self.FIGURE_MEMORY,
+                'cpu': values / self.VALUES_PER_SECOND}
+
+    def get_memory_limit(self, priority):
+        """ Return part of memory budget available for priority class """
+        if priority == 'batch':
+            return self.memory_budget * self.BATCH_SHARE
+        return self.memory_budget
+
+    def get_expected_wait(self, priority):
+        """
+        Return estimated seconds until new job of priority class is started.
+        Jobs of the same or higher priority are ahead of it
+        """
+        ahead = sum(job.cost['cpu'] for job in self.running) +\
+            sum(job.cost['cpu'] for _, _, job in self.queue
+                if self.PRIORITIES[job.priority] <= self.PRIORITIES[priority])
+
+        return ahead / self.workers
+
+    def check_admission(self, priority, cost):
+        """ Raise exception if job can not be queued """
+        if priority not in self.PRIORITIES:
+            raise ValueError('Unknown priority: ' + str(priority))
+        if cost['memory'] > self.get_memory_limit(priority):
+            raise exceptions.JobIsTooLarge(
+                "Job needs more memory than budget: {} bytes".format(cost['memory']))
+        queued = sum(1 for _, _, job in self.queue if job.priority == priority)
+        if queued >= self.MAX_QUEUE[priority]:
+            raise exceptions.JobIsRejected("Queue of {} jobs is full".format(priority))
+        max_wait = self.MAX_WAIT[priority]
+        if max_wait is not None and self.get_expected_wait(priority) > max_wait:
+            raise exceptions.JobIsRejected(
+                "Expected wait of {} jobs is too long".format(priority))
+
+    def submit(self, func, *args, priority='interactive', cost=None, **kwargs):
+        """
+        Queue job and return future of its result. Job is rejected with
+        JobIsRejected exception to apply backpressure to caller
+        """
+        cost = cost or {'memory': self.FIGURE_MEMORY, 'cpu': 0}
+        job = Job(priority, func, args, kwargs, cost)
+        with self.lock:
+            self.check_admission(priority, cost)
+            heapq.heappush(self.queue, (self.PRIORITIES[priority], next(self.counter), job))
+            started = self.dispatch()
+        self.start(started)
+
+        return job.future
+
+    def raise_priority(self, future, priority):
+        """
+        Move queued job of future to higher priority class. Running and
+        finished jobs are not changed. Return True if job is moved
+        """
+        started = None
+        with self.lock:
+            for index, (rank, count, job) in enumerate(self.queue):
+                if job.future is future and self.PRIORITIES[priority] < rank:
+                    job.priority = priority
+                    self.queue[index] = (self.PRIORITIES[priority], count, job)
+                    heapq.heapify(self.queue)
+                    started = self.dispatch()
+                    break
+        if started is None:
+            return False
+        self.start(started)
+
+        return True
+
+    def dispatch(self):
+        """
+        Take jobs which can start now from queue. Jobs are started in order of
+        priority and arrival, job which does not fit into memory waits and
+        holds back jobs behind it
+        """
+        started = []
+        while self.queue and len(self.running) < self.workers:
+            job = self.queue[0][2]
+            limit = self.get_memory_limit(job.priority)
+            if self.memory_used + job.cost['memory'] > limit:
+                break
+            heapq.heappop(self.queue)
+            self.running.append(job)
+            self.memory_used += job.cost['memory']
+            started.append(job)
+
+        return started
+
+    def start(self, jobs):
+        """ Run jobs in worker threads """
+        for job in jobs:
+            self.executor.submit(self.run_job, job)
+
+    def run_job(self, job):
+        """ Run job and release its memory """
+        try:
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(job.func(*job.args, **job.kwargs))
+                except Exception as e:
+                    job.future.set_exception(e)
+        finally:
+            with self.lock:
+                self.running.remove(job)
+                self.memory_used -= job.cost['memory']
+                started = self.dispatch()
+            self.start(started)
+
+    def submit_spectrum(self, date_event, time_from, time_to, spectrometer,
+                        spectropolarimeter, time_profile, stokes, priority='interactive'):
+        """ Queue Builder.combine_spectrum job with cost estimated from catalog """
+        cost = self.estimate_cost(date_event, time_from, time_to,
+                                  spectrometer + spectropolarimeter + time_profile)
+
+        return self.submit(self.combine_spectrum, date_event, time_from, time_to,
+                           spectrometer, spectropolarimeter, time_profile, stokes,
+                           priority=priority, cost=cost)
+
+    def combine_spectrum(self, *args):
+        """ Create dynamic spectrum by builder of worker thread """
+        return self.get_builder().combine_spectrum(*args)
+
+    def get_stats(self):
+        """ Return numbers of running and queued jobs and used memory """
+        with self.lock:
+            queued = {priority: 0 for priority in self.PRIORITIES}
+            for _, _, job in self.queue:
+                queued[job.priority] += 1
+            return {'running': len(self.running), 'queued': queued,
+                    'memory_used': self.memory_used}
+
+    def shutdown(self, wait=True):
+        """ Stop worker threads """
+        self.executor.shutdown(wait=wait)
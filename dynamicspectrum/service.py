@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+""" The class for HTTP service of dynamic spectrum """
+import json
+import asyncio
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+from dynamicspectrum.dynamicspectrum.batch import Batch
+from dynamicspectrum.dynamicspectrum.scheduler import Scheduler
+from dynamicspectrum.dynamicspectrum.image_cache import ImageCache
+from dynamicspectrum.dynamicspectrum import exceptions
+
+
+class SpectrumService:
+    """
+    This class serves images of dynamic spectrum over HTTP with asyncio.
+    Rendering runs in pool of threads of scheduler, each thread has its own
+    builder. Identical requests arriving while image is rendered wait for
+    the same computation instead of starting a new one, queued computation
+    gets the highest priority of requests waiting for it
+    """
+    HOST = '127.0.0.1'
+    PORT = 8080
+    WORKERS = 4
+    MAX_HEADER_SIZE = 16384
+    CONTENT_TYPES = {'png': 'image/png', 'jpeg': 'image/jpeg', 'jpg': 'image/jpeg',
+                     'webp': 'image/webp'}
+    REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 422: 'Unprocessable Entity', 500: 'Internal Server Error',
+               503: 'Service Unavailable'}
+    RETRY_AFTER = 5
+    STOKES = ['I', 'V', 'V/I']
+    INSTRUMENTS = {'spectrometer': Batch.SPECTROMETERS,
+                   'spectropolarimeter': Batch.SPECTROPOLARIMETERS,
+                   'time_profile': Batch.TIME_PROFILES}
+
+    def __init__(self, host=HOST, port=PORT, workers=WORKERS, scheduler=None):
+        self.host = host
+        self.port = port
+        self.scheduler = scheduler or Scheduler(workers)
+        self.inflight = {}
+        self.server = None
+
+    @staticmethod
+    def split_list(query, name):
+        """ Return list of instruments from comma separated query parameter """
+        value = query.get(name, [''])[0]
+        return [item.strip().lower() for item in value.split(',') if item.strip()]
+
+    def parse_request(self, target):
+        """
+        Return parameters of spectrum from query string. Query has date,
+        from, to, spectrometer, spectropolarimeter, time_profile, stokes,
+        format and quality. Instruments, Stokes parameter and time window
+        are validated, so wrong request is rejected before rendering
+        """
+        query = parse_qs(urlsplit(target).query)
+        try:
+            priority = query.get('priority', ['interactive'])[0].lower()
+            if priority not in Scheduler.PRIORITIES:
+                raise ValueError('unknown priority ' + priority)
+            image_format = query.get('format', ['png'])[0].lower()
+            if image_format not in self.CONTENT_TYPES:
+                raise exceptions.UnsupportedImageFormat(
+                    "Image format is not supported: " + image_format)
+            quality = query.get('quality', [None])[0]
+            params = {'date_event': datetime.strptime(query['date'][0], '%Y-%m-%d'),
+                      'time_from': Batch.parse_time(query['from'][0]),
+                      'time_to': Batch.parse_time(query['to'][0]),
+                      'stokes': query.get('stokes', ['I'])[0].upper(),
+                      'image_format': image_format,
+                      'quality': int(quality) if quality is not None else None}
+            if params['time_from'] >= params['time_to']:
+                raise ValueError('time from is not before time to')
+            if params['stokes'] not in self.STOKES:
+                raise ValueError('unknown Stokes parameter ' + params['stokes'])
+            for category, known in self.INSTRUMENTS.items():
+                params[category] = self.split_list(query, category)
+                unknown = [name for name in params[category] if name not in known]
+                if unknown:
+                    raise ValueError('unknown {}: {}'.format(category, ', '.join(unknown)))
+            return params, priority
+        except (KeyError, ValueError) as e:
+            raise exceptions.InvalidRequest("Invalid request: " + str(e))
+
+    def create_key(self, params):
+        """ Return key of request to coalesce identical requests """
+        return ImageCache.create_key(params['date_event'], params['time_from'],
+                                     params['time_to'], params['spectrometer'],
+                                     params['spectropolarimeter'], params['time_profile'],
+                                     params['stokes'], params['image_format'],
+                                     params['quality'])
+
+    def render(self, params):
+        """ Render image in worker thread. Return image and ETag """
+        response = self.scheduler.get_builder().get_image(**params)
+
+        return response['image'], response['etag']
+
+    async def submit(self, params, request):
+        """
+        Estimate cost of request from catalog in thread, queries of catalog
+        would block event loop. Queue rendering job with priority of request
+        """
+        cost = await asyncio.get_running_loop().run_in_executor(
+            None, self.scheduler.estimate_cost, params['date_event'], params['time_from'],
+            params['time_to'], params['spectrometer'] + params['spectropolarimeter'] +
+            params['time_profile'])
+        request['job'] = self.scheduler.submit(self.render, params,
+                                               priority=request['priority'], cost=cost)
+
+        return await asyncio.wrap_future(request['job'])
+
+    async def get_image(self, params, priority='interactive'):
+        """
+        Return image and ETag of request. The first request submits rendering
+        job to scheduler, identical requests wait for its result. Request of
+        higher priority raises priority of queued job
+        """
+        key = self.create_key(params)
+        request = self.inflight.get(key)
+        if request is None:
+            request = {'priority': priority, 'job': None}
+            request['task'] = asyncio.ensure_future(self.submit(params, request))
+            self.inflight[key] = request
+            request['task'].add_done_callback(lambda done: self.inflight.pop(key, None))
+        elif Scheduler.PRIORITIES[priority] < Scheduler.PRIORITIES[request['priority']]:
+            request['priority'] = priority
+            if request['job'] is not None:
+                self.scheduler.raise_priority(request['job'], priority)
+
+        return await asyncio.shield(request['task'])
+
+    async def handle_request(self, method, target, headers):
+        """ Return status, headers and body of response """
+        path = urlsplit(target).path
+        if path == '/health':
+            return 200, {'Content-Type': 'text/plain'}, b'ok'
+        if path != '/spectrum':
+            return 404, {'Content-Type': 'text/plain'}, b'not found'
+        if method not in ['GET', 'HEAD']:
+            return 405, {'Content-Type': 'text/plain', 'Allow': 'GET, HEAD'}, b''
+
+        try:
+            params, priority = self.parse_request(target)
+        except (exceptions.InvalidRequest, exceptions.UnsupportedImageFormat) as e:
+            return 400, {'Content-Type': 'application/json'},\
+                json.dumps({'code': e.code, 'message': str(e)}).encode()
+        try:
+            image, etag = await self.get_image(params, priority)
+        except exceptions.JobIsTooLarge as e:
+            return 422, {'Content-Type': 'application/json'},\
+                json.dumps({'code': e.code, 'message': str(e)}).encode()
+        except exceptions.JobIsRejected as e:
+            return 503, {'Content-Type': 'application/json',
+                         'Retry-After': str(self.RETRY_AFTER)},\
+                json.dumps({'code': e.code, 'message': str(e)}).encode()
+        except Exception as e:
+            print('Spectrum is not rendered:', repr(e))
+            return 500, {'Content-Type': 'text/plain'}, b'spectrum is not rendered'
+
+        response_headers = {'Content-Type': self.CONTENT_TYPES[params['image_format']]}
+        if etag is not None:
+            response_headers['ETag'] = etag
+            response_headers['Cache-Control'] = 'public, max-age=86400'
+            if headers.get('if-none-match') == etag:
+                return 304, response_headers, b''
+        else:
+            response_headers['Cache-Control'] = 'no-cache'
+
+        return 200, response_headers, image
+
+    async def read_request(self, reader):
+        """ Read request line and headers. Return None if connection is closed """
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return None
+        lines = head.decode('latin-1').split('\r\n')
+        parts = lines[0].split()
+        if len(parts) != 3:
+            return None
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        return parts[0].upper(), parts[1], headers
+
+    async def handle_connection(self, reader, writer):
+        """ Serve requests of one connection """
+        try:
+            while True:
+                request = await self.read_request(reader)
+                if request is None:
+                    break
+                method, target, headers = request
+                status, response_headers, body = await self.handle_request(
+                    method, target, headers)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                response_headers['Content-Length'] = str(len(body))
+                response_headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+                head = 'HTTP/1.1 {} {}\r\n'.format(status, self.REASONS[status]) +\
+                    ''.join('{}: {}\r\n'.format(name, value)
+                            for name, value in response_headers.items()) + '\r\n'
+                writer.write(head.encode('latin-1'))
+                if method != 'HEAD' and status != 304:
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        """ Start listening. Return asyncio server """
+        self.server = await asyncio.start_server(self.handle_connection, self.host,
+                                                 self.port, limit=self.MAX_HEADER_SIZE)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+        return self.server
+
+    async def serve_forever(self):
+        """ Serve requests until task is cancelled """
+        server = await self.start()
+        print('Serving dynamic spectrum on http://{}:{}/spectrum'.format(self.host,
+                                                                          self.port))
+        async with server:
+            await server.serve_forever()
+
+    def run(self):
+        """ Run service in event loop of the current thread """
+        try:
+            asyncio.run(self.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.scheduler.shutdown(wait=False)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+""" The class for compressed storage of instrument files """
+import os
+import gzip
+import shutil
+import tempfile
+from contextlib import contextmanager
+from astropy.io import fits
+from scipy.io import readsav
+
+
+class Storage:
+    """
+    This class stores instrument files compressed and opens compressed files.
+    Files are compressed with gzip block by block. FITS images read by time
+    window are tile-compressed, so only tiles of the window are decompressed.
+    FITS tables read by rows are kept plain, so only rows of the window are read
+    """
+    COMPRESSION = None
+    GZIP_SUFFIX = '.gz'
+    TILE_SUFFIX = '.fz'
+    TILE_FOLDERS = ['ASSA', 'AMATERAS']
+    PLAIN_FOLDERS = ['ORFEES']
+    TILE_COLUMNS = 1024
+    BLOCK_SIZE = 1024 * 1024
+
+    @classmethod
+    def find(cls, file_path):
+        """ Return path of stored file, compressed or not """
+        for path in [file_path, file_path + cls.TILE_SUFFIX, file_path + cls.GZIP_SUFFIX]:
+            if os.path.exists(path):
+                return path
+
+        return file_path
+
+    @classmethod
+    def exists(cls, file_path):
+        """ Determine file is stored in any form """
+        return os.path.exists(cls.find(file_path))
+
+    @classmethod
+    def is_compressed(cls, file_path):
+        """ Determine file is compressed """
+        return file_path.endswith((cls.GZIP_SUFFIX, cls.TILE_SUFFIX))
+
+    @classmethod
+    def get_method(cls, file_path):
+        """ Return compression method of file """
+        folder = os.path.basename(os.path.dirname(file_path))
+        if folder in cls.PLAIN_FOLDERS:
+            return None
+        if cls.COMPRESSION == 'gzip' and folder in cls.TILE_FOLDERS:
+            return 'tile'
+        return cls.COMPRESSION
+
+    @classmethod
+    def compress(cls, file_path, method=None):
+        """
+        Replace file with compressed one. Compressed file appears only after
+        it is written completely. Return path of stored file
+        """
+        method = method or cls.get_method(file_path)
+        if method is None or cls.is_compressed(file_path) or not os.path.exists(file_path):
+            return cls.find(file_path)
+
+        if method == 'tile':
+            compressed_path = file_path + cls.TILE_SUFFIX
+            cls.write_tiles(file_path, compressed_path + '.part')
+        else:
+            compressed_path = file_path + cls.GZIP_SUFFIX
+            with open(file_path, 'rb') as source,\
+                    gzip.open(compressed_path + '.part', 'wb', compresslevel=6) as target:
+                shutil.copyfileobj(source, target, cls.BLOCK_SIZE)
+        os.replace(compressed_path + '.part', compressed_path)
+        os.remove(file_path)
+        if os.path.exists(file_path + '.meta.json'):
+            os.remove(file_path + '.meta.json')
+
+        return compressed_path
+
+    @classmethod
+    def write_tiles(cls, file_path, compressed_path):
+        """
+        Write image of FITS file as tile-compressed FITS. Tile holds all rows of
+        a plane and a block of columns, floats are not quantized
+        """
+        with fits.open(file_path) as hdul:
+            data = hdul[0].data
+            compression = 'RICE_1' if data.dtype.kind in 'iu' else 'GZIP_2'
+            tile_shape = (1,) * (data.ndim - 2) + \
+                (data.shape[-2], min(cls.TILE_COLUMNS, data.shape[-1]))
+            hdu = fits.CompImageHDU(data, hdul[0].header, compression_type=compression,
+                                    tile_shape=tile_shape, quantize_level=0.0)
+            hdu.writeto(compressed_path, overwrite=True)
+
+    @staticmethod
+    def get_image_hdu(hdul):
+        """ Return HDU with image, tile-compressed image is in extension """
+        if len(hdul) > 1 and isinstance(hdul[1], fits.CompImageHDU):
+            return hdul[1]
+        return hdul[0]
+
+    @classmethod
+    def open_fits(cls, file_path, **kwargs):
+        """ Open FITS file, compressed or not """
+        return fits.open(cls.find(file_path), **kwargs)
+
+    @classmethod
+    @contextmanager
+    def open_image(cls, file_path):
+        """ Open FITS file once and yield HDU with image, data is not read """
+        with cls.open_fits(file_path, memmap=True) as hdul:
+            yield cls.get_image_hdu(hdul)
+
+    @staticmethod
+    def read_window(hdu, start=None, end=None):
+        """
+        Read columns of image HDU. Only tiles of the window are decompressed
+        in tile-compressed file, gzip file is decompressed as one stream,
+        because it can not be read by sections
+        """
+        file_info = hdu.fileinfo()
+        if file_info and file_info['file'].compression:
+            return hdu.data[..., start:end].astype(float)
+        return hdu.section[..., start:end].astype(float)
+
+    @classmethod
+    def read_image_header(cls, file_path):
+        """ Read header of FITS image, compressed or not """
+        with cls.open_fits(file_path) as hdul:
+            return cls.get_image_hdu(hdul).header.copy()
+
+    @classmethod
+    def read_image_window(cls, file_path, start=None, end=None):
+        """ Read columns of FITS image, compressed or not """
+        with cls.open_image(file_path) as hdu:
+            return cls.read_window(hdu, start, end)
+
+    @classmethod
+    def read_sav(cls, file_path):
+        """
+        Read IDL save file. Compressed file is decompressed block by block
+        into temporary file, because reader needs file on disk
+        """
+        file_path = cls.find(file_path)
+        if not file_path.endswith(cls.GZIP_SUFFIX):
+            return readsav(file_path)
+
+        with gzip.open(file_path, 'rb') as source,\
+                tempfile.NamedTemporaryFile(suffix='.sav') as target:
+            shutil.copyfileobj(source, target, cls.BLOCK_SIZE)
+            target.flush()
+            return readsav(target.name)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+""" The classes to pass instrument data between processes through shared memory """
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+_builder = None
+
+
+class SharedArray:
+    """
+    Descriptor of array placed in shared memory. Only descriptor is pickled
+    """
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    @classmethod
+    def create(cls, array):
+        """
+        Copy array to new block of shared memory. Block is owned by the
+        process which attaches it, so it is not removed when worker exits
+        """
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        try:
+            resource_tracker.unregister(block._name, 'shared_memory')
+        except (AttributeError, KeyError):
+            pass
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        descriptor = cls(block.name, array.shape, array.dtype.str)
+        block.close()
+
+        return descriptor
+
+    def attach(self):
+        """ Return block of shared memory and array view on it """
+        block = shared_memory.SharedMemory(name=self.name)
+        array = np.ndarray(self.shape, dtype=np.dtype(self.dtype), buffer=block.buf)
+
+        return block, array
+
+    def unlink(self):
+        """ Remove block of shared memory which is not attached """
+        try:
+            block = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return
+        block.close()
+        block.unlink()
+
+
+def export_dict(data, created, seen):
+    """
+    Export arrays of dictionary recursively. Descriptors of created blocks
+    are added to list, dictionaries which contain themselves are skipped
+    """
+    seen = seen | {id(data)}
+    exported = {}
+    for key, value in data.items():
+        if isinstance(value, np.ndarray) and value.size > 0:
+            exported[key] = SharedArray.create(value)
+            created.append(exported[key])
+        elif isinstance(value, dict):
+            if id(value) not in seen:
+                exported[key] = export_dict(value, created, seen)
+        else:
+            exported[key] = value
+
+    return exported
+
+
+def export_data(data):
+    """
+    Replace non-empty arrays of data dictionary with shared memory descriptors.
+    Blocks are removed if export fails, nobody else could release them
+    """
+    created = []
+    try:
+        return export_dict(data, created, set())
+    except BaseException:
+        for descriptor in created:
+            descriptor.unlink()
+        raise
+
+
+def process_instrument(name, stokes, date_event, time_from, time_to):
+    """
+    Get data of instrument in worker process and place arrays in shared memory
+    """
+    global _builder
+    if _builder is None:
+        from dynamicspectrum.dynamicspectrum.builder import Builder
+        _builder = Builder()
+
+    data = _builder.get_instrument_data(date_event, time_from, time_to, [name], stokes)
+
+    return export_data(data[name])
+
+
+class SharedResult:
+    """
+    This class attaches shared memory of worker results and releases it.
+    Use it as context manager, arrays are valid until release
+    """
+    def __init__(self):
+        self.blocks = []
+
+    def import_data(self, data):
+        """
+        Replace shared memory descriptors of data dictionary with arrays
+        """
+        imported = {}
+        for key, value in data.items():
+            if isinstance(value, SharedArray):
+                block, imported[key] = value.attach()
+                self.blocks.append(block)
+            elif isinstance(value, dict):
+                imported[key] = self.import_data(value)
+            else:
+                imported[key] = value
+
+        return imported
+
+    def release(self):
+        """ Close and remove all attached blocks of shared memory """
+        while self.blocks:
+            block = self.blocks.pop()
+            try:
+                block.close()
+            except BufferError:
+                pass
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
@@ -1,5 +1,6 @@
 import sys
 import warnings
+import matplotlib.pyplot as plt
 from datetime import datetime, time
 from dynamicspectrum.builder import Builder
 
@@ -17,6 +18,7 @@ spectropolarimeter = ['orfees']
 time_profile = ['goes']
 parameter = 'I'
 
-spectrum = Builder()
+spectrum = Builder(plt.figure(figsize=(8, 6)))
 spectrum.combine_spectrum(user_date, user_time_from, user_time_to,
                           spectrometer, spectropolarimeter, time_profile, parameter)
+plt.show()
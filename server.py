@@ -0,0 +1,17 @@
+import sys
+import argparse
+import warnings
+from dynamicspectrum.service import SpectrumService
+
+
+if not sys.warnoptions:
+    warnings.simplefilter('ignore')
+
+parser = argparse.ArgumentParser(description='HTTP service of dynamic spectrum')
+parser.add_argument('--host', default=SpectrumService.HOST)
+parser.add_argument('--port', type=int, default=SpectrumService.PORT)
+parser.add_argument('--workers', type=int, default=SpectrumService.WORKERS,
+                    help='number of rendering threads')
+args = parser.parse_args()
+
+SpectrumService(args.host, args.port, args.workers).run()
@@ -0,0 +1,50 @@
+"""
+Benchmark of ASSA window reads against full-file reads on synthetic data.
+Run from the repository root: python -m tests.benchmark_assa
+"""
+import os
+import shutil
+import tempfile
+import timeit
+import numpy as np
+from astropy.io import fits
+from datetime import datetime, time
+from dynamicspectrum.instruments.assa import ASSA
+from tests.synthetic import create_spectrum_file
+
+
+def read_full_file(file_path, start, end):
+    """ Read whole file, calibrate and slice as AMATERAS does """
+    array = fits.getdata(file_path, dtype=float)
+    array[(array > 45)] = 45
+    return array[:, start:end]
+
+
+def main():
+    folder = tempfile.mkdtemp()
+    current_folder = os.getcwd()
+    try:
+        os.chdir(folder)
+        create_spectrum_file(os.path.join('data', 'ASSA', 'ASSA_20190410.fits'),
+                             channels=410, samples=30000)
+        file_path = ASSA().get_file(datetime(2019, 4, 10))
+        start, end = ASSA().get_array_shape(77828, 28173, 3600, 5400, 1.17321)
+
+        full = timeit.repeat(lambda: read_full_file(file_path, start, end),
+                             number=5, repeat=3)
+        window = timeit.repeat(lambda: ASSA().get_data(datetime(2019, 4, 10),
+                                                       time(1, 0), time(1, 30)),
+                               number=5, repeat=3)
+        assert np.array_equal(read_full_file(file_path, start, end),
+                              ASSA().get_data(datetime(2019, 4, 10), time(1, 0),
+                                              time(1, 30))['array'])
+
+        print('full file read:   %.1f ms' % (min(full) / 5 * 1000))
+        print('window read:      %.1f ms' % (min(window) / 5 * 1000))
+    finally:
+        os.chdir(current_folder)
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of disk size against read time for compressed storage of
+instrument files on synthetic and sample data.
+Run from the repository root: python -m tests.benchmark_storage
+"""
+import os
+import shutil
+import tempfile
+import timeit
+from astropy.io import fits
+from datetime import datetime, time
+from dynamicspectrum.instruments.assa import ASSA
+from dynamicspectrum.storage import Storage
+from tests.synthetic import create_spectrum_file
+
+GOES_FILE = os.path.join('tests', 'dataset', 'go1420190410.fits')
+
+
+def measure_window_read(file_path):
+    """ Return size of ASSA file and time of window read in ms """
+    window = timeit.repeat(lambda: ASSA().get_data(datetime(2019, 4, 10), time(1, 0),
+                                                   time(1, 30)),
+                           number=5, repeat=3)
+    return os.path.getsize(Storage.find(file_path)), min(window) / 5 * 1000
+
+
+def measure_full_read(file_path):
+    """ Return size of GOES file and time of full read in ms """
+    full = timeit.repeat(lambda: fits.getdata(Storage.find(file_path), ext=2),
+                         number=20, repeat=3)
+    return os.path.getsize(Storage.find(file_path)), min(full) / 20 * 1000
+
+
+def main():
+    folder = tempfile.mkdtemp()
+    goes_file = os.path.abspath(GOES_FILE)
+    current_folder = os.getcwd()
+    try:
+        os.chdir(folder)
+        results = []
+        assa_path = os.path.join('data', 'ASSA', 'ASSA_20190410.fits')
+        create_spectrum_file(assa_path, channels=410, samples=30000)
+        results.append(('ASSA raw', *measure_window_read(assa_path)))
+        Storage.compress(assa_path, 'tile')
+        results.append(('ASSA tile-compressed', *measure_window_read(assa_path)))
+        os.remove(Storage.find(assa_path))
+        create_spectrum_file(assa_path, channels=410, samples=30000)
+        Storage.compress(assa_path, 'gzip')
+        results.append(('ASSA gzip', *measure_window_read(assa_path)))
+
+        goes_path = os.path.join('data', 'GOES', 'go1420190410.fits')
+        os.makedirs(os.path.dirname(goes_path))
+        shutil.copyfile(goes_file, goes_path)
+        results.append(('GOES raw', *measure_full_read(goes_path)))
+        Storage.compress(goes_path, 'gzip')
+        results.append(('GOES gzip', *measure_full_read(goes_path)))
+
+        for name, size, duration in results:
+            print('%-22s %8.1f KB %8.1f ms' % (name, size / 1024, duration))
+    finally:
+        os.chdir(current_folder)
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
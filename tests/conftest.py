@@ -0,0 +1,31 @@
+"""DynamicSpectrum Test fixtures"""
+import os
+import pytest
+from datetime import datetime, time
+from dynamicspectrum.catalog import Catalog
+from dynamicspectrum.download import SingletonMeta
+from tests.synthetic import create_spectrum_file
+
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dataset')
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """ Catalog in data folder of temporary working directory """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Catalog, 'DB_PATH', os.path.join('data', 'catalog.sqlite'))
+    SingletonMeta._instances.pop(Catalog, None)
+    yield Catalog()
+    SingletonMeta._instances.pop(Catalog, None)
+
+
+@pytest.fixture
+def assa_file(catalog):
+    """ Synthetic ASSA file of 2019-04-10. Return array of the file """
+    return create_spectrum_file(os.path.join('data', 'ASSA', 'ASSA_20190410.fits'))
+
+
+@pytest.fixture
+def assa_data(assa_file):
+    return datetime(2019, 4, 10), time(1, 0), time(2, 0)
@@ -0,0 +1,22 @@
+"""Synthetic instrument files for tests and benchmarks"""
+import os
+import numpy as np
+from astropy.io import fits
+
+
+def create_spectrum_file(file_path, channels=410, samples=30000, time_obs='21:37:08.000',
+                         time_end='07:49:33', step=1.17321, seed=0):
+    """ Write FITS file with spectrum of instrument like AMATERAS and ASSA """
+    folder = os.path.dirname(file_path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+
+    rng = np.random.default_rng(seed)
+    data = rng.integers(0, 60, size=(channels, samples), dtype=np.uint8)
+    header = fits.Header()
+    header['TIME-OBS'] = time_obs
+    header['TIME-END'] = time_end
+    header['CDELT1'] = step
+    fits.writeto(file_path, data, header, overwrite=True)
+
+    return data
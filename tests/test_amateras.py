@@ -61,6 +61,12 @@ class TestAmateras:
         response = is_obs_time_within_interval(35000, 55000, 77828, 28173)
         assert response is None
 
+    def test_should_have_observation_of_tail_after_seven(self):
+        amateras = Amateras('I')
+        assert amateras.has_observation(27500, 28800, 77828, 28173, min_observation=0)
+        assert not amateras.has_observation(27500, 28800, 77828, 28173)
+        assert not amateras.has_observation(28200, 28800, 77828, 28173, min_observation=0)
+
     def test_should_ovveride_time_interval(self):
         response = Amateras().override_time_interval(30000, 25000)
         assert response == 25000
@@ -99,3 +105,15 @@ class TestAmateras:
 
         # with pytest.raises(FileNotFoundError):
             # Amateras().get_data(datetime(2019, 5, 10), time(20, 00, 0), time(22, 00, 0))
+
+    def test_should_get_several_stokes_parameters(self):
+        rng = np.random.default_rng(0)
+        lcp = rng.normal(10, 1, (410, 50))
+        rcp = rng.normal(10, 1, (410, 50))
+        response = Amateras('I').get_stokes_parameters(lcp.copy(), rcp.copy(),
+                                                        ['I', 'V', 'V/I'])
+        intensity = Amateras('I').get_stokes_parameter(lcp.copy(), rcp.copy())
+        polarization = Amateras('V').get_stokes_parameter(lcp.copy(), rcp.copy())
+        assert (response['I'] == intensity).all()
+        assert (response['V'] == polarization).all()
+        assert np.allclose(response['V/I'], polarization / (lcp + rcp))
@@ -0,0 +1,92 @@
+"""DynamicSpectrum Test"""
+import os
+import shutil
+import numpy as np
+import pytest
+from datetime import time
+from PIL import Image
+from dynamicspectrum.animation import Animation, FFmpegWriter
+from dynamicspectrum.instruments.assa import ASSA
+from dynamicspectrum import exceptions
+
+
+class FrameList:
+    """ Writer keeping frames in memory """
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(frame)
+
+    def close(self):
+        return len(self.frames)
+
+
+class TestAnimation:
+    """ Test sliding-window animation of dynamic spectrum """
+
+    def test_should_get_windows_of_frames(self):
+        animation = Animation(window=1800, step=600)
+        windows = animation.get_windows(time(1, 0), time(2, 0))
+        assert windows == [(3600, 5400), (4200, 6000), (4800, 6600), (5400, 7200)]
+
+    def test_should_slice_view_of_spectrum(self):
+        array = np.arange(20 * 100).reshape(20, 100)
+        data = {'array': array, 'nrows': [1, 480], 'ncols': [0, 200]}
+        frame = Animation().slice_spectrum(data, 50, 150)
+        assert np.shares_memory(frame['array'], array)
+        assert frame['array'].shape == (20, 50)
+        assert frame['ncols'] == [0, 100]
+
+        late = Animation().slice_spectrum(dict(data, ncols=[100, 300]), 50, 150)
+        assert late['array'].shape == (20, 25) and late['ncols'] == [50, 100]
+        assert Animation().slice_spectrum(data, 300, 400)['array'].size == 0
+
+    def test_should_slice_time_profile(self):
+        data = {'time': np.arange(0, 1000, 10.0), 'flux': np.arange(100.0),
+                'ncols': [0, 1000]}
+        frame = Animation().slice_profile(data, 100, 200)
+        assert frame['time'][0] == 100 and frame['time'][-1] == 190
+        assert frame['ncols'] == [100, 200]
+
+    def test_should_read_file_once_and_reuse_artists(self, assa_data, monkeypatch):
+        date_event, time_from, time_to = assa_data
+        reads = []
+        read_file = ASSA.read_file
+
+        def count_read(self, *args):
+            reads.append(args)
+            return read_file(self, *args)
+        monkeypatch.setattr(ASSA, 'read_file', count_read)
+
+        animation = Animation(window=1800, step=600)
+        writer = FrameList()
+        axes = []
+
+        def render_frame(*args):
+            frame = Animation.render_frame(animation, *args)
+            axes.append(list(animation.builder.fig.axes))
+            return frame
+        monkeypatch.setattr(animation, 'render_frame', render_frame)
+
+        frames = animation.export('frames', date_event, [], ['assa'], [], 'I', time_from,
+                                  time_to, writer=writer)
+        assert frames == 4 and len(reads) == 1
+        assert all(frame_axes == axes[0] for frame_axes in axes)
+        assert writer.frames[0].shape == (600, 800, 3)
+        assert not np.array_equal(writer.frames[0], writer.frames[1])
+
+    def test_should_write_image_sequence(self, assa_data):
+        date_event, time_from, time_to = assa_data
+        frames = Animation(window=1800, step=900).export(
+            'frames', date_event, [], ['assa'], [], 'I', time_from, time_to)
+        assert frames == 3
+        assert sorted(os.listdir('frames')) == ['frame_00000.png', 'frame_00001.png',
+                                                'frame_00002.png']
+        assert Image.open(os.path.join('frames', 'frame_00000.png')).size == (800, 600)
+
+    def test_should_not_encode_movie_without_ffmpeg(self, monkeypatch):
+        monkeypatch.setattr(shutil, 'which', lambda name: None)
+        assert isinstance(Animation().create_writer('movie.mp4'), FFmpegWriter)
+        with pytest.raises(exceptions.EncoderIsNotFound):
+            FFmpegWriter('movie.mp4', 10).write(np.zeros((10, 10, 3), dtype=np.uint8))
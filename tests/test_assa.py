@@ -0,0 +1,49 @@
+"""DynamicSpectrum Test"""
+import os
+import numpy as np
+from datetime import datetime, time
+from dynamicspectrum.catalog import Catalog
+from dynamicspectrum.instruments.assa import ASSA
+from dynamicspectrum.instrumentFactory import InstrumentFactory
+
+
+class TestASSA:
+    """ Test ASSA instrument class """
+
+    def test_should_be_created_by_factory(self):
+        assert isinstance(InstrumentFactory().get_instrument('assa', 'I'), ASSA)
+
+    def test_should_get_file(self, assa_file):
+        response = ASSA().get_file(datetime(2019, 4, 10))
+        assert response == os.path.join('data', 'ASSA', 'ASSA_20190410.fits')
+
+    def test_should_read_window_of_file(self, assa_file):
+        data = assa_file
+        response = ASSA().read_file(os.path.join('data', 'ASSA', 'ASSA_20190410.fits'),
+                                    100, 250)
+        assert response.dtype == float
+        assert (response == data[:, 100:250]).all()
+
+    def test_should_get_array_shape(self):
+        response = ASSA().get_array_shape(77000, 28000, 0, 3600, 1.0)
+        assert response == (9400, 13000)
+        response = ASSA().get_array_shape(3600, 28000, 3600, 7200, 2.0)
+        assert response == (0, 1800)
+
+    def test_should_change_image_contrast(self):
+        array = np.array([[10., 50.], [45., 70.]])
+        response = ASSA().change_image_contrast(array)
+        assert (response == np.array([[10., 45.], [45., 45.]])).all()
+
+    def test_should_get_data(self, assa_file):
+        data = assa_file
+        response = ASSA().get_data(datetime(2019, 4, 10), time(1, 0, 0), time(2, 0, 0))
+        start, end = ASSA().get_array_shape(77828, 28173, 3600, 7200, 1.17321)
+        assert response['ncols'] == [0, 3600]
+        assert (response['array'] == np.minimum(data[:, start:end], 45)).all()
+        assert Catalog().get_record('assa', datetime(2019, 4, 10))['channels'] == 410
+
+        response = ASSA().get_data(datetime(2019, 4, 10), time(12, 0, 0), time(13, 0, 0))
+        assert response['ncols'] == [0, 0]
+        response = ASSA().get_data(datetime(2019, 4, 11), time(1, 0, 0), time(2, 0, 0))
+        assert response['ncols'] == [0, 0]
@@ -0,0 +1,83 @@
+"""DynamicSpectrum Test"""
+import os
+import json
+from datetime import datetime, time
+from dynamicspectrum.batch import Batch, Event, load_group, split_instruments
+from dynamicspectrum.builder import Builder
+from tests.synthetic import create_spectrum_file
+
+
+EVENTS = """date,start,end,instruments,stokes
+2019-04-10,01:00,01:30,assa,I
+2019-04-10,01:10,01:40,assa,
+2019-04-11,02:00:00,02:30:00,assa;unknown,I
+2019-04-11,02:00,02:30,assa,I
+"""
+
+
+class TestBatch:
+    """ Test batch rendering of event list """
+
+    def create_events(self):
+        create_spectrum_file(os.path.join('data', 'ASSA', 'ASSA_20190411.fits'), seed=1)
+        with open('events.csv', 'w') as _f:
+            _f.write(EVENTS)
+
+    def test_should_read_events(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        self.create_events()
+        events = Batch().read_events('events.csv')
+        assert len(events) == 4
+        assert events[1].stokes == 'I' and events[1].time_to == time(1, 40)
+        assert events[2].instruments == ['assa', 'unknown']
+        assert len(Batch().group_events(events)) == 2
+
+    def test_should_split_instruments(self):
+        assert split_instruments(['wind1', 'orfees', 'goes', 'stereo']) == (
+            ['wind1', 'stereo'], ['orfees'], ['goes'])
+
+    def test_should_load_day_once_for_all_stokes(self, assa_data, monkeypatch):
+        events = [Event(assa_data[0], time(1, 0), time(1, 30), ['assa'], 'I'),
+                  Event(assa_data[0], time(1, 10), time(1, 40), ['assa'], 'V/I')]
+        assert len(Batch().group_events(events)) == 1
+        calls = []
+        get_products_data = Builder.get_products_data
+        monkeypatch.setattr(Builder, 'get_products_data', lambda self, *args:
+                            calls.append(args[-1]) or get_products_data(self, *args))
+
+        data, errors, time_from = load_group(Builder(), events)
+        assert calls == [['I', 'V/I']]
+        assert sorted(data) == ['I', 'V/I'] and errors == {}
+        assert data['I']['assa']['array'].size > 0
+        assert time_from == time(1, 0)
+
+    def test_should_render_events_and_isolate_failure(self, assa_data):
+        self.create_events()
+        batch = Batch('batch', processes=2)
+        records = batch.run(batch.read_events('events.csv'))
+
+        results = batch.read_manifest()
+        assert len(records) == 4 and len(results) == 4
+        failed = [record for record in results.values() if record['status'] != 'ok']
+        assert [record['instruments'] for record in failed] == [['assa', 'unknown']]
+        for record in results.values():
+            if record['status'] == 'ok':
+                with open(os.path.join('batch', record['image']), 'rb') as _f:
+                    assert _f.read(8) == b'\x89PNG\r\n\x1a\n'
+
+    def test_should_resume_run(self, assa_data):
+        self.create_events()
+        batch = Batch('batch', processes=1)
+        events = batch.read_events('events.csv')
+        batch.run(events[:2])
+        os.remove(os.path.join('batch', events[1].key + '.png'))
+
+        records = batch.run(events)
+        assert sorted(record['event'] for record in records) == sorted(
+            event.key for event in events[1:])
+        with open(batch.manifest_path) as _f:
+            assert len([json.loads(line) for line in _f]) == 5
+
+    def test_should_create_key_of_event(self):
+        event = Event(datetime(2019, 4, 10), time(1, 0), time(1, 30), ['assa', 'goes'], 'V/I')
+        assert event.key == '20190410_010000_013000_VI_assa-goes'
@@ -0,0 +1,110 @@
+"""DynamicSpectrum Test"""
+import os
+import pytest
+import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time
+from dynamicspectrum.builder import Builder
+from dynamicspectrum.download import SingletonMeta
+from dynamicspectrum.image_cache import ImageCache
+from dynamicspectrum import exceptions
+
+
+class TestBuilder:
+    """ Test rendering of dynamic spectrum """
+
+    def test_should_render_image_in_memory(self, assa_data, monkeypatch):
+        def show():
+            raise AssertionError('GUI backend is used')
+        monkeypatch.setattr(plt, 'show', show)
+
+        image = Builder().render_image(*assa_data, [], ['assa'], [], 'I')
+        assert image.startswith(b'\x89PNG\r\n\x1a\n')
+        assert not os.path.exists('plots')
+
+    def test_should_render_image_formats(self, assa_data):
+        builder = Builder()
+        jpeg = builder.render_image(*assa_data, [], ['assa'], [], 'I', 'jpeg', quality=90)
+        webp = builder.render_image(*assa_data, [], ['assa'], [], 'I', 'webp', quality=80)
+        low = builder.render_image(*assa_data, [], ['assa'], [], 'I', 'jpg', quality=20)
+        assert jpeg.startswith(b'\xff\xd8')
+        assert webp[:4] == b'RIFF' and webp[8:12] == b'WEBP'
+        assert len(low) < len(jpeg)
+
+    def test_should_not_render_unsupported_format(self, assa_data):
+        with pytest.raises(exceptions.UnsupportedImageFormat):
+            Builder().render_image(*assa_data, [], ['assa'], [], 'I', 'gif')
+
+    def test_should_get_image_from_cache(self, assa_data, monkeypatch):
+        SingletonMeta._instances.pop(ImageCache, None)
+        builder = Builder()
+        response = builder.get_image(*assa_data, [], ['assa'], [], 'I')
+        assert response['status'] == 200 and response['etag']
+
+        def get_data(*args):
+            raise AssertionError('data is processed again')
+        monkeypatch.setattr(builder, 'get_instrument_data', get_data)
+        cached = builder.get_image(*assa_data, [], ['assa'], [], 'I')
+        assert cached == response
+
+        not_modified = builder.get_image(*assa_data, [], ['assa'], [], 'I',
+                                         etag=response['etag'])
+        assert not_modified['status'] == 304 and not_modified['image'] is None
+        SingletonMeta._instances.pop(ImageCache, None)
+
+    def test_should_not_cache_image_without_data(self, assa_data):
+        SingletonMeta._instances.pop(ImageCache, None)
+        response = Builder().get_image(datetime(2019, 4, 11), time(1, 0), time(2, 0), [],
+                                       ['assa'], [], 'I')
+        assert response['status'] == 200 and response['image']
+        assert response['etag'] is None and ImageCache().size == 0
+        SingletonMeta._instances.pop(ImageCache, None)
+
+    def test_should_not_use_pyplot_figures(self, assa_data):
+        figures = plt.get_fignums()
+        first, second = Builder(), Builder()
+        assert first.fig is not second.fig
+        first.render_image(*assa_data, [], ['assa'], [], 'I')
+        assert plt.get_fignums() == figures
+
+    def test_should_render_in_parallel_threads(self, assa_data):
+        date_event = assa_data[0]
+        windows = [(time(1, 0), time(2, 0)), (time(0, 30), time(1, 0)),
+                   (time(3, 0), time(5, 0)), (time(22, 0), time(23, 0))]
+        expected = [Builder().render_image(date_event, *window, [], ['assa'], [], 'I')
+                    for window in windows]
+
+        def render(index):
+            window = windows[index % len(windows)]
+            return Builder().render_image(date_event, *window, [], ['assa'], [], 'I')
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            images = list(executor.map(render, range(32)))
+        for index, image in enumerate(images):
+            assert image == expected[index % len(windows)]
+
+    def test_should_reuse_figure_template_of_same_layout(self, assa_data):
+        date_event = assa_data[0]
+        builder = Builder()
+        builder.render_image(date_event, time(1, 0), time(2, 0), [], ['assa'], [], 'I')
+        axes = list(builder.fig.axes)
+        images = [image for axis in axes for image in axis.images]
+
+        image = builder.render_image(date_event, time(3, 0), time(4, 0), [], ['assa'],
+                                     [], 'I')
+        assert builder.fig.axes == axes
+        assert [image for axis in axes for image in axis.images] == images
+        assert image == Builder().render_image(date_event, time(3, 0), time(4, 0), [],
+                                               ['assa'], [], 'I')
+
+    def test_should_rebuild_figure_of_other_layout(self, assa_data):
+        date_event = assa_data[0]
+        builder = Builder()
+        builder.render_image(date_event, time(1, 0), time(2, 0), [], ['assa'], [], 'I')
+        axes = list(builder.fig.axes)
+
+        image = builder.render_image(date_event, time(1, 0), time(3, 0), [], ['assa'],
+                                     [], 'I')
+        assert builder.fig.axes[0] not in axes
+        assert image == Builder().render_image(date_event, time(1, 0), time(3, 0), [],
+                                               ['assa'], [], 'I')
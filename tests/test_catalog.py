@@ -0,0 +1,75 @@
+"""DynamicSpectrum Test"""
+import os
+from datetime import datetime, time
+from dynamicspectrum.catalog import Catalog
+from dynamicspectrum.download import SingletonMeta
+from dynamicspectrum.instruments.goes import Goes
+from dynamicspectrum.instruments.amateras import Amateras
+from dynamicspectrum.builder import Builder
+from tests.conftest import DATASET
+
+
+class TestCatalog:
+    """ Test catalog of observations """
+
+    def test_should_add_and_get_record(self, catalog):
+        date = datetime(2019, 4, 10)
+        catalog.add_record('orfees', date, 'missing.fts', 25000, 55000, 0.1, 144, 1004, 1000)
+        record = catalog.get_record('orfees', date)
+        assert record['time_obs'] == 25000
+        assert record['time_end'] == 55000
+        assert record['file_size'] == 0
+        assert catalog.get_record('orfees', datetime(2019, 4, 11)) is None
+
+    def test_should_keep_records_between_instances(self, catalog):
+        date = datetime(2019, 4, 10)
+        catalog.add_record('srh', date, 'missing.fits', 1000, 30000, 1.5, 2800, 11800, 16)
+        SingletonMeta._instances.pop(Catalog, None)
+        assert Catalog().get_record('srh', date)['channels'] == 16
+
+    def test_should_get_records_for_range_of_dates(self, catalog):
+        for day in range(1, 6):
+            catalog.add_record('goes', datetime(2019, 4, day), 'x', 0, 86400, 2, None, None, 2)
+        records = catalog.get_records(['goes'], datetime(2019, 4, 2), datetime(2019, 4, 4))
+        assert [rec['date'] for rec in records] == ['2019-04-02', '2019-04-03', '2019-04-04']
+
+    def test_should_ingest_header(self, catalog):
+        date = datetime(2019, 4, 10)
+        record = catalog.ingest(Goes(), 'goes', date, os.path.join(DATASET, 'go1420190410.fits'))
+        assert record['time_obs'] == 0
+        assert round(record['time_end']) == 86396
+        assert record['file_size'] > 0
+
+    def test_should_ingest_goes_file_once(self, catalog, monkeypatch):
+        date = datetime(2019, 4, 10)
+        file_path = os.path.join(DATASET, 'go1420190410.fits')
+        monkeypatch.setattr(Goes, 'get_file', lambda self, date, base_url: file_path)
+        Goes().read_profile(date)
+        assert catalog.has_record('goes', date, file_path)
+
+        def add_record(*args, **kwargs):
+            raise AssertionError('record is written again')
+        monkeypatch.setattr(catalog, 'add_record', add_record)
+        time, flux = Goes().read_profile(date)
+        assert time.size == flux.size > 0
+
+    def test_should_skip_instrument_without_coverage(self, catalog):
+        date = datetime(2019, 4, 10)
+        catalog.add_record('amateras', date, 'x', 77828, 28173, 1.17, 150, 500, 410)
+        builder = Builder.__new__(Builder)
+        instrument = Amateras('I')
+        assert builder.has_coverage('amateras', instrument, date, time(1, 0), time(2, 0))
+        assert not builder.has_coverage('amateras', instrument, date, time(20, 0), time(22, 0))
+        assert builder.has_coverage('amateras', instrument, datetime(2019, 4, 11),
+                                    time(20, 0), time(22, 0))
+
+    def test_should_not_write_unchanged_record(self, catalog):
+        date = datetime(2019, 4, 10)
+        catalog.add_record('orfees', date, 'missing.fts', 25000, 55000, 0.1, 144, 1004, 1000)
+        changes = catalog.connect().total_changes
+        catalog.add_record('orfees', date, 'missing.fts', 25000, 55000, 0.1, 144, 1004, 1000)
+        assert catalog.connect().total_changes == changes
+
+        catalog.add_record('orfees', date, 'missing.fts', 25000, 56000, 0.1, 144, 1004, 1000)
+        assert catalog.connect().total_changes == changes + 1
+        assert catalog.get_record('orfees', date)['time_end'] == 56000
@@ -0,0 +1,52 @@
+"""DynamicSpectrum Test"""
+import os
+import shutil
+import pytest
+import numpy as np
+from astropy.io import fits
+from datetime import datetime
+from dynamicspectrum.coverage import Coverage
+from tests.conftest import DATASET
+
+
+@pytest.fixture
+def local_files(catalog):
+    """ Create data folder with instrument files """
+    for folder in ['AMATERAS', 'GOES', 'WIND1']:
+        os.makedirs(os.path.join('data', folder))
+
+    shutil.copy(os.path.join(DATASET, 'go1420190410.fits'), 'data/GOES/')
+    header = fits.Header()
+    header['TIME-OBS'] = '21:37:08.000'
+    header['TIME-END'] = '07:49:33.000'
+    header['CDELT1'] = 1.17321
+    for day in ['20190410', '20190411']:
+        fits.writeto('data/AMATERAS/' + day + '_IPRT.fits',
+                     np.zeros((2, 4, 8), dtype=np.uint8), header)
+        open('data/WIND1/' + day + '.R1', 'w').close()
+
+
+class TestCoverage:
+    """ Test coverage timeline of instruments """
+
+    def test_should_find_local_files(self, local_files):
+        response = Coverage().find_local_files('amateras', datetime(2019, 4, 11),
+                                               datetime(2019, 4, 30))
+        assert list(response.keys()) == ['20190411']
+
+    def test_should_get_timeline(self, local_files):
+        response = Coverage().get_timeline(datetime(2019, 4, 1), datetime(2019, 4, 30),
+                                           ['amateras', 'goes', 'wind1', 'orfees'])
+        assert response['amateras'][0] == (datetime(2019, 4, 9, 21, 37, 8),
+                                           datetime(2019, 4, 10, 7, 49, 33))
+        assert len(response['amateras']) == 2
+        assert response['wind1'] == [(datetime(2019, 4, 10), datetime(2019, 4, 12, 0, 1))]
+        assert response['goes'][0][0] == datetime(2019, 4, 10)
+        assert response['orfees'] == []
+
+    def test_should_use_catalog_for_known_files(self, local_files):
+        Coverage().get_timeline(datetime(2019, 4, 1), datetime(2019, 4, 30), ['goes'])
+        os.remove('data/GOES/go1420190410.fits')
+        response = Coverage().get_days(datetime(2019, 4, 1), datetime(2019, 4, 30),
+                                       ['goes'])
+        assert response['goes'] == [datetime(2019, 4, 10).date()]
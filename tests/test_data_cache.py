@@ -0,0 +1,102 @@
+"""DynamicSpectrum Test"""
+import os
+import time
+import pytest
+from datetime import datetime
+from dynamicspectrum.catalog import Catalog
+from dynamicspectrum.data_cache import DataCache
+from dynamicspectrum.download import Download, SingletonMeta
+from dynamicspectrum.instruments.assa import ASSA
+from dynamicspectrum.instruments.orfees import Orfees
+
+
+def create_file(folder, name, size, accessed):
+    """ Write local file of instrument with access time """
+    file_path = os.path.join('data', folder, name)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'wb') as _f:
+        _f.write(b'0' * size)
+    os.utime(file_path, (accessed, accessed))
+    return file_path
+
+
+@pytest.fixture
+def data_folder(catalog):
+    for cls in [DataCache, Download]:
+        SingletonMeta._instances.pop(cls, None)
+    yield time.time() - 3600
+    for cls in [DataCache, Download]:
+        SingletonMeta._instances.pop(cls, None)
+
+
+class TestDataCache:
+    """ Test eviction of instrument files """
+
+    def test_should_scan_local_files(self, data_folder):
+        create_file('GOES', 'go1520190410.fits', 100, data_folder)
+        create_file('GOES', 'go1520190410.fits.part', 100, data_folder)
+        DataCache().scan()
+        files = Catalog().get_files()
+        assert [record['file_path'] for record in files] ==\
+            [os.path.join('data', 'GOES', 'go1520190410.fits')]
+        assert files[0]['folder'] == 'GOES' and files[0]['file_size'] == 100
+
+    def test_should_evict_least_recently_used(self, data_folder):
+        old = create_file('WIND1', '20190401.R1', 100, data_folder)
+        hot = create_file('WIND1', '20190402.R1', 100, data_folder + 10)
+        new = create_file('GOES', 'go1520190403.fits', 100, data_folder + 20)
+        cache = DataCache(max_size=250)
+        cache.scan()
+        cache.touch(hot)
+
+        removed = cache.evict()
+        assert removed == [old]
+        assert not os.path.exists(old) and os.path.exists(hot) and os.path.exists(new)
+
+    def test_should_evict_over_budget_of_instrument(self, data_folder):
+        first = create_file('WIND1', '20190401.R1', 100, data_folder)
+        second = create_file('WIND1', '20190402.R1', 100, data_folder + 10)
+        goes = create_file('GOES', 'go1520190301.fits', 100, data_folder - 10)
+
+        removed = DataCache(budgets={'WIND1': 150}).evict()
+        assert removed == [first]
+        assert os.path.exists(second) and os.path.exists(goes)
+
+    def test_should_keep_locked_and_recent_files(self, data_folder):
+        locked = create_file('WIND1', '20190401.R1', 100, data_folder)
+        create_file('WIND1', '20190402.R1', 100, data_folder + 10)
+        recent = create_file('WIND1', '20190403.R1', 100, time.time())
+        cache = DataCache(max_size=50)
+        cache.scan()
+        cache.touch(recent)
+
+        with Download().lock_file(locked):
+            removed = cache.evict()
+        assert os.path.exists(locked) and os.path.exists(recent)
+        assert removed == [os.path.join('data', 'WIND1', '20190402.R1')]
+        assert [record['file_path'] for record in Catalog().get_files()] == [locked, recent]
+
+    def test_should_keep_files_being_read(self, data_folder):
+        read = create_file('ASSA', 'ASSA_20190401.fits.fz', 100, data_folder)
+        other = create_file('ASSA', 'ASSA_20190402.fits', 100, data_folder + 10)
+        cache = DataCache(max_size=50)
+        cache.scan()
+
+        with cache.reading(read):
+            removed = cache.evict()
+        assert removed == [other] and os.path.exists(read)
+        assert not os.path.exists(Download.get_lock_path(other))
+
+        assert cache.evict() == [read]
+        assert os.listdir(Download.LOCK_FOLDER) == []
+
+    def test_should_keep_files_resolved_by_instruments(self, data_folder):
+        assa = create_file('ASSA', 'ASSA_20190401.fits', 100, data_folder)
+        orfees = create_file('ORFEES', 'int_orf20190401_000000_0.1.fts', 100, data_folder)
+        wind = create_file('WIND1', '20190402.R1', 100, data_folder + 10)
+        cache = DataCache(max_size=250)
+        cache.scan()
+
+        assert ASSA().get_file(datetime(2019, 4, 1)) == assa
+        assert Orfees('I').get_file(datetime(2019, 4, 1)) == orfees
+        assert cache.evict() == [wind]
@@ -0,0 +1,255 @@
+"""DynamicSpectrum Test"""
+import os
+import gzip
+import time
+import threading
+import multiprocessing
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from dynamicspectrum.download import Download, SingletonMeta
+from dynamicspectrum.storage import Storage
+
+
+class RemoteFile:
+    """ Content of growing file on stand-in data server """
+    def __init__(self, content, etag='"1"'):
+        self.content = content
+        self.etag = etag
+        self.sent = 0
+        self.requests = 0
+        self.delay = 0
+        self.dropped = 0
+
+
+def create_handler(remote):
+    """ Return request handler of stand-in data server supporting Range requests """
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send_headers(self, status, length, content_range=None):
+            self.send_response(status)
+            self.send_header('Content-Length', str(length))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', remote.etag)
+            if content_range:
+                self.send_header('Content-Range', content_range)
+            self.end_headers()
+
+        def do_HEAD(self):
+            self.send_headers(200, len(remote.content))
+
+        def do_GET(self):
+            remote.requests += 1
+            time.sleep(remote.delay)
+            content = remote.content
+            range_header = self.headers.get('Range')
+            if_range = self.headers.get('If-Range')
+            if range_header and (if_range is None or if_range == remote.etag):
+                first, last = range_header.split('=')[1].split('-')
+                first = int(first)
+                end = int(last) if last else len(content) - 1
+                if first >= len(content):
+                    self.send_headers(416, 0)
+                    return
+                body = content[first:end + 1]
+                self.send_headers(206, len(body), 'bytes {}-{}/{}'.format(
+                    first, first + len(body) - 1, len(content)))
+                if not last:
+                    body = body[:len(body) - remote.dropped]
+            else:
+                body = content
+                self.send_headers(200, len(body))
+            self.wfile.write(body)
+            remote.sent += len(body)
+
+    return Handler
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    SingletonMeta._instances.pop(Download, None)
+    remote = RemoteFile(bytes(range(256)) * 40)
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), create_handler(remote))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield remote, 'http://127.0.0.1:{}/day.fits'.format(httpd.server_port)
+    httpd.shutdown()
+    httpd.server_close()
+    SingletonMeta._instances.pop(Download, None)
+
+
+class TestDownload:
+    """ Test downloading of growing day files """
+
+    def test_should_download_missing_file(self, server):
+        remote, url = server
+        Download().download_file('TEST', 'day.fits', url, datetime.utcnow())
+        with open('day.fits', 'rb') as _f:
+            assert _f.read() == remote.content
+        assert not os.path.exists('day.fits.part')
+
+    def test_should_fetch_only_appended_tail(self, server):
+        remote, url = server
+        Download().download_file('TEST', 'day.fits', url, datetime.utcnow())
+        remote.content += b'new data' * 100
+        remote.etag = '"2"'
+        remote.sent = 0
+
+        Download().download_file('TEST', 'day.fits', url, datetime.utcnow())
+        with open('day.fits', 'rb') as _f:
+            assert _f.read() == remote.content
+        assert remote.sent < Download.CHECK_SIZE + Download.OVERLAP_SIZE + 800 + 1
+        assert remote.sent < len(remote.content)
+
+    def test_should_keep_local_file_if_tail_is_broken(self, server):
+        remote, url = server
+        Download().download_file('TEST', 'day.fits', url, datetime.utcnow())
+        local_content = remote.content
+        remote.content += b'new data' * 100
+        remote.etag = '"2"'
+        remote.dropped = 100
+
+        Download().download_file('TEST', 'day.fits', url, datetime.utcnow())
+        with open('day.fits', 'rb') as _f:
+            assert _f.read() == local_content
+
+    def test_should_not_transfer_unchanged_file(self, server):
+        remote, url = server
+        Download().download_file('TEST', 'day.fits', url, datetime.utcnow())
+        remote.sent = 0
+        Download().download_file('TEST', 'day.fits', url, datetime.utcnow())
+        assert remote.sent == 0
+
+    def test_should_download_rewritten_file(self, server):
+        remote, url = server
+        Download().download_file('TEST', 'day.fits', url, datetime.utcnow())
+        remote.content = b'rewritten' * 2000
+        remote.etag = '"3"'
+
+        Download().download_file('TEST', 'day.fits', url, datetime.utcnow())
+        with open('day.fits', 'rb') as _f:
+            assert _f.read() == remote.content
+
+    def test_should_not_refresh_past_day(self, server):
+        remote, url = server
+        past_day = datetime.utcnow() - timedelta(days=2)
+        Download().download_file('TEST', 'day.fits', url, past_day)
+        remote.content += b'new data'
+        remote.sent = 0
+
+        Download().download_file('TEST', 'day.fits', url, past_day)
+        assert remote.sent == 0
+        assert os.path.getsize('day.fits') == len(remote.content) - 8
+
+    def test_should_complete_file_after_day_is_over(self, server, monkeypatch):
+        remote, url = server
+        monkeypatch.setattr(Storage, 'COMPRESSION', 'gzip')
+        file_path = os.path.join('data', 'GOES', 'day.fits')
+        yesterday = datetime.utcnow() - timedelta(days=1)
+        monkeypatch.setattr(Download, 'is_current_day', staticmethod(lambda date: True))
+        Download().download_file('TEST', file_path, url, yesterday)
+        remote.content += b'last data' * 100
+        remote.etag = '"2"'
+
+        monkeypatch.setattr(Download, 'is_current_day', staticmethod(lambda date: False))
+        Download().download_file('TEST', file_path, url, yesterday)
+        with gzip.open(file_path + '.gz') as _f:
+            assert _f.read() == remote.content
+
+    def test_should_download_once_for_concurrent_threads(self, server):
+        remote, url = server
+        remote.delay = 0.3
+
+        def download(index):
+            Download().download_file('TEST', os.path.join('data', 'day.fits'), url)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(download, range(8)))
+
+        assert remote.requests == 1
+        with open(os.path.join('data', 'day.fits'), 'rb') as _f:
+            assert _f.read() == remote.content
+
+    def test_should_download_once_for_concurrent_processes(self, server):
+        remote, url = server
+        remote.delay = 0.5
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=download_in_process, args=(url,))
+                     for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        assert remote.requests == 1
+        with open(os.path.join('data', 'day.fits'), 'rb') as _f:
+            assert _f.read() == remote.content
+
+    def test_should_not_lock_file_locked_by_other(self, server):
+        file_path = os.path.join('data', 'day.fits')
+        with Download().lock_file(file_path) as locked:
+            assert locked
+            context = multiprocessing.get_context('fork')
+            queue = context.Queue()
+            process = context.Process(target=try_lock_in_process, args=(file_path, queue))
+            process.start()
+            process.join()
+            assert queue.get() is False
+
+
+    def test_should_lock_file_again_after_lock_file_is_removed(self, server):
+        file_path = os.path.join('data', 'day.fits')
+        acquired = threading.Event()
+
+        def wait_for_lock():
+            with Download().lock_file(file_path):
+                assert os.path.exists(Download.get_lock_path(file_path))
+                acquired.set()
+
+        with Download().lock_file(file_path):
+            thread = threading.Thread(target=wait_for_lock)
+            thread.start()
+            time.sleep(0.1)
+            assert not acquired.is_set()
+            Download().remove_lock(file_path)
+        thread.join(5)
+        assert acquired.is_set()
+        assert Download.get_lock_path(file_path + '.gz') == Download.get_lock_path(file_path)
+
+def download_in_process(url):
+    """ Download file in worker process """
+    SingletonMeta._instances.pop(Download, None)
+    Download().download_file('TEST', os.path.join('data', 'day.fits'), url)
+
+
+def try_lock_in_process(file_path, queue):
+    """ Try to lock file without blocking in worker process """
+    with Download().lock_file(file_path, blocking=False) as locked:
+        queue.put(locked)
+
+
+class TestDownloadCompressed:
+    """ Test compressed storage of downloaded files """
+
+    def test_should_compress_file_of_past_day(self, server, monkeypatch):
+        remote, url = server
+        monkeypatch.setattr(Storage, 'COMPRESSION', 'gzip')
+        file_path = os.path.join('data', 'GOES', 'day.fits')
+        past_day = datetime.utcnow() - timedelta(days=2)
+        Download().download_file('TEST', file_path, url, past_day)
+        assert Storage.find(file_path) == file_path + '.gz'
+        with gzip.open(file_path + '.gz') as _f:
+            assert _f.read() == remote.content
+
+        Download().download_file('TEST', file_path, url, past_day)
+        assert remote.requests == 1
+
+    def test_should_not_compress_file_of_current_day(self, server, monkeypatch):
+        remote, url = server
+        monkeypatch.setattr(Storage, 'COMPRESSION', 'gzip')
+        file_path = os.path.join('data', 'GOES', 'day.fits')
+        Download().download_file('TEST', file_path, url, datetime.utcnow())
+        assert Storage.find(file_path) == file_path
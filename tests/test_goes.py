@@ -62,3 +62,33 @@ class TestGoes:
 
     def test_should_get_data(self):
         pass
+
+    def test_should_find_sorted_index(self):
+        array = np.array([1, 2, 3, 4, 5, 6, 7, 8])
+        assert Goes().find_sorted_index(array, 5) == 4
+        assert Goes().find_sorted_index(array, 4.5) == 3
+        assert Goes().find_sorted_index(array, -10) == 0
+        assert Goes().find_sorted_index(array, 100) == 7
+        response = Goes().find_sorted_index(array, np.array([0, 2.6, 9]))
+        assert (response == np.array([0, 2, 7])).all()
+
+    def test_should_sort_profile(self):
+        time_array = np.array([3, 1, 2])
+        flux_array = np.array([30, 10, 20])
+        response = Goes().sort_profile(time_array, flux_array)
+        assert (response[0] == np.array([1, 2, 3])).all()
+        assert (response[1] == np.array([10, 20, 30])).all()
+
+    def test_should_slice_windows(self):
+        file_data = Goes().read_file('tests/dataset/go1420190410.fits')
+        time_array = Goes().get_time_data(file_data)
+        flux_array = Goes().get_flux_data(file_data)
+        starts = np.array([3600, 7200, 36000])
+        ends = starts + 1800
+        response = Goes().slice_windows(time_array, flux_array, starts, ends)
+        assert len(response) == 3
+        for (cut_time, cut_flux), start, end in zip(response, starts, ends):
+            assert np.shares_memory(cut_time, time_array)
+            assert cut_time[0] == time_array[Goes().find_index(time_array, start)]
+            assert cut_time.size == Goes().find_index(time_array, end) -\
+                Goes().find_index(time_array, start)
@@ -0,0 +1,42 @@
+"""DynamicSpectrum Test"""
+from datetime import datetime, time
+from dynamicspectrum import image_cache
+from dynamicspectrum.image_cache import ImageCache
+
+
+class TestImageCache:
+    """ Test cache of rendered images """
+    request = (datetime(2019, 4, 10), time(1, 0), time(2, 0), ['wind1'], ['assa'],
+               ['goes'], 'I', 'png', None)
+
+    def test_should_create_key_of_full_request(self):
+        key = ImageCache.create_key(*self.request)
+        assert key == ImageCache.create_key(*self.request)
+        other = list(self.request)
+        other[3] = ['wind2']
+        assert key != ImageCache.create_key(*other)
+
+    def test_should_depend_on_code_version(self, monkeypatch):
+        key = ImageCache.create_key(*self.request)
+        assert ImageCache.CODE_VERSION == image_cache.get_code_version()
+        monkeypatch.setattr(ImageCache, 'CODE_VERSION', '0' * 16)
+        assert key != ImageCache.create_key(*self.request)
+
+    def test_should_evict_least_recently_used(self):
+        cache = ImageCache.__new__(ImageCache)
+        cache.__init__(max_size=30)
+        cache.put('a', b'0' * 10)
+        cache.put('b', b'1' * 10)
+        cache.put('c', b'2' * 10)
+        assert cache.get('a')[0] == b'0' * 10
+        cache.put('d', b'3' * 10)
+        assert cache.get('b') is None
+        assert cache.get('a') is not None and cache.get('d') is not None
+        assert cache.size == 30
+
+    def test_should_return_etag(self):
+        cache = ImageCache.__new__(ImageCache)
+        cache.__init__(max_size=100)
+        etag = cache.put('abc', b'image')
+        assert cache.get('abc') == (b'image', etag)
+        assert etag.startswith('"') and etag.endswith('"')
@@ -0,0 +1,85 @@
+"""DynamicSpectrum Test"""
+import os
+import numpy as np
+from astropy.io import fits
+from datetime import datetime, time
+from dynamicspectrum.builder import Builder
+from dynamicspectrum.incremental import Incremental
+from dynamicspectrum.instruments.assa import ASSA
+
+
+def write_assa_file(data, time_end):
+    """ Write ASSA file of the current UT day """
+    header = fits.Header()
+    header['TIME-OBS'] = '00:00:00.000'
+    header['TIME-END'] = time_end
+    header['CDELT1'] = 1.0
+    name = 'ASSA_' + datetime.utcnow().strftime('%Y%m%d') + '.fits'
+    fits.writeto(os.path.join('data', 'ASSA', name), data, header, overwrite=True)
+
+
+class TestIncremental:
+    """ Test incremental processing of the current UT day """
+
+    def test_should_process_only_new_samples(self, catalog, monkeypatch):
+        os.makedirs(os.path.join('data', 'ASSA'))
+        data = np.random.default_rng(0).integers(0, 40, (20, 5400), dtype=np.uint8)
+        today = datetime.utcnow()
+        calls = []
+        get_data = ASSA.get_data
+        monkeypatch.setattr(ASSA, 'get_data', lambda self, date, time_from, time_to:
+                            calls.append(time_from) or get_data(self, date, time_from,
+                                                                time_to))
+
+        write_assa_file(data[:, :3600], '01:00:00')
+        response = Incremental().get_data('assa', 'I', today, time(0, 0), time(2, 0))
+        assert response['array'].shape == (20, 3600)
+
+        write_assa_file(data, '01:30:00')
+        response = Incremental().get_data('assa', 'I', today, time(0, 0), time(2, 0))
+        assert calls == [time(0, 0), time(1, 0)]
+        assert response['ncols'] == [0, 5400]
+        assert (response['array'] == data).all()
+
+    def test_should_extend_kept_data_to_later_end(self, catalog, monkeypatch):
+        monkeypatch.setattr(Incremental, '_states', {})
+        os.makedirs(os.path.join('data', 'ASSA'))
+        data = np.random.default_rng(2).integers(0, 40, (20, 5400), dtype=np.uint8)
+        today = datetime.utcnow()
+        calls = []
+        get_data = ASSA.get_data
+        monkeypatch.setattr(ASSA, 'get_data', lambda self, date, time_from, time_to:
+                            calls.append(time_from) or get_data(self, date, time_from,
+                                                                time_to))
+
+        write_assa_file(data, '01:30:00')
+        Incremental().get_data('assa', 'I', today, time(0, 0), time(1, 0))
+        response = Incremental().get_data('assa', 'I', today, time(0, 0), time(1, 30))
+        assert calls == [time(0, 0), time(1, 0)]
+        assert (response['array'] == data).all()
+
+    def test_should_draw_only_appended_columns(self, catalog, monkeypatch):
+        monkeypatch.setattr(Incremental, '_states', {})
+        os.makedirs(os.path.join('data', 'ASSA'))
+        data = np.random.default_rng(1).integers(0, 40, (20, 5400), dtype=np.uint8)
+        today = datetime.utcnow()
+        builder = Builder()
+
+        write_assa_file(data[:, :3600], '01:00:00')
+        builder.refresh_spectrum(today, time(0, 0), time(2, 0), [], ['assa'], [], 'I')
+        axis = builder.panels['assa']
+        shown = axis.images[0].get_array()
+
+        write_assa_file(data, '01:30:00')
+        builder.refresh_spectrum(today, time(0, 0), time(2, 0), [], ['assa'], [], 'I')
+        assert builder.panels['assa'] is axis
+        assert axis.images[0].get_array() is shown
+        assert [image.get_array().shape for image in axis.images] == [(20, 3600),
+                                                                      (20, 1800)]
+        assert axis.get_xlim() == (-0.5, 5399.5)
+
+    def test_should_not_keep_past_days(self, monkeypatch):
+        monkeypatch.setattr(ASSA, 'get_data', lambda self, date, time_from, time_to:
+                            {'array': np.ones((2, 2)), 'ncols': [0, 2]})
+        Incremental().get_data('assa', 'I', datetime(2019, 4, 10), time(0, 0), time(2, 0))
+        assert not [key for key in Incremental._states if key[2] == '20190410']
@@ -1,6 +1,39 @@
 """DynamicSpectrum Test"""
+import os
+import numpy as np
 from astropy.io import fits
+from datetime import datetime, time
+from skimage.transform import resize
 from dynamicspectrum.instruments.orfees import Orfees
+from dynamicspectrum.regrid import Regrid
+
+
+BAND_RANGES = [(144, 217), (220, 350), (360, 500), (510, 750), (760, 1004)]
+
+
+def write_orfees_file(file_path, records=3600):
+    """
+    Write ORFEES file of one hour. Bands have frequency tables of their own,
+    only the lowest channel of the first band has high flux
+    """
+    os.makedirs(os.path.dirname(file_path))
+    sizes = [87 + 50 * index for index in range(5)]
+    header = fits.Header()
+    header['TIME-OBS'] = '01:00:00:000'
+    header['TIME-END'] = '02:00:00:000'
+    frequencies = [fits.Column(name, '{}D'.format(size), array=[np.linspace(*band, size)])
+                   for name, band, size in zip(Orfees.FREQUENCY_BANDS, BAND_RANGES, sizes)]
+    columns = []
+    for stokes in ['I', 'V']:
+        for name, size in zip(Orfees.BANDS[stokes], sizes):
+            flux = np.full((records, size), 16.)
+            if name == 'STOKESI_B1':
+                flux[:, :3] = 100.
+            columns.append(fits.Column(name, '{}E'.format(size), array=flux))
+    data = fits.BinTableHDU.from_columns(columns)
+    data.header['EXPTIME'] = 1.0
+    fits.HDUList([fits.PrimaryHDU(header=header),
+                  fits.BinTableHDU.from_columns(frequencies), data]).writeto(file_path)
 
 
 class TestOrfees:
@@ -10,3 +43,51 @@ class TestOrfees:
         response = Orfees().read_file('tests/dataset/int_orf20190410.fts')
         assert isinstance(response, fits.fitsrec.FITS_rec) is True
 
+    def test_should_get_several_stokes_parameters(self):
+        fields = [(band, float, (20,)) for band in Orfees.BANDS['I'] + Orfees.BANDS['V']]
+        file_data = np.ones(30, dtype=fields)
+        for band in Orfees.BANDS['V']:
+            file_data[band] = 0.5
+        response = Orfees('I').get_stokes_parameters(file_data, ['I', 'V/I'])
+        assert sorted(response.keys()) == ['I', 'V']
+        assert response['I'].shape == (1000, 30)
+        ratio = Orfees('I').get_polarization_degree(response['V'], response['I'])
+        assert np.allclose(ratio, 0.5)
+
+    def test_should_resample_bands_like_resize(self):
+        rng = np.random.default_rng(0)
+        fields = [(band, '>f4', (87 + 50 * index,))
+                  for index, band in enumerate(Orfees.BANDS['I'])]
+        file_data = np.zeros(40, dtype=fields)
+        for band in Orfees.BANDS['I']:
+            file_data[band] = rng.random(file_data[band].shape) * 100
+        expected = np.concatenate([resize(file_data[band], (40, 200), anti_aliasing=True)
+                                   for band in Orfees.BANDS['I']], axis=1).T
+
+        response = Orfees('I').combine_bands(file_data, Orfees.BANDS['I'])
+        assert response.shape == (1000, 40)
+        assert np.allclose(response, expected, atol=1e-4)
+
+    def test_should_cache_resample_matrix(self):
+        matrix = Orfees.get_resample_matrix(301)
+        assert Orfees.get_resample_matrix(301) is matrix
+        assert matrix.shape == (200, 301)
+        assert matrix.nnz < 301 * 200 / 10
+
+    def test_should_slice_records(self):
+        file_data = np.arange(100)
+        assert (Orfees('I').slice_records(file_data, 1, 2, 0.1) == np.arange(10, 20)).all()
+
+    def test_should_put_lowest_frequency_in_first_row(self, catalog):
+        write_orfees_file(os.path.join('data', 'ORFEES', 'int_orf20190410_010000_0.1.fts'))
+        data = Orfees('I').get_data(datetime(2019, 4, 10), time(1, 0), time(1, 30))
+        assert data['array'].shape == (1000, 1800)
+        assert np.isclose(data['frequencies'][0], 144, atol=1)
+        assert np.isclose(data['frequencies'][-1], 1004, atol=1)
+        assert data['frequencies'][199] < 220 < data['frequencies'][200]
+
+        regrid = Regrid(rows=500)
+        raster = regrid.create_raster([('orfees', data, data['frequencies'])], 1800)
+        axis = regrid.get_frequency_axis()
+        assert (raster[np.abs(axis - 145) < 1] > 0.9).all()
+        assert (raster[(axis > 300) & (axis < 1000)] < 0.1).all()
@@ -0,0 +1,68 @@
+"""DynamicSpectrum Test"""
+import io
+import numpy as np
+import pytest
+from PIL import Image
+from dynamicspectrum.builder import Builder
+from dynamicspectrum.raster import RasterRenderer
+from dynamicspectrum import exceptions
+
+
+class TestRasterRenderer:
+    """ Test rendering of dynamic spectrum without matplotlib """
+
+    def test_should_create_lookup_tables(self):
+        renderer = RasterRenderer()
+        intensity = renderer.create_lut('I')
+        polarization = renderer.create_lut('V')
+        assert intensity.shape == (257, 3) and intensity.dtype == np.uint8
+        assert tuple(intensity[0]) == (255, 255, 255) and tuple(intensity[255]) == (0, 0, 0)
+        assert tuple(polarization[0]) == (128, 128, 128)
+        assert tuple(polarization[255]) == (0, 0, 0)
+        assert tuple(intensity[256]) == RasterRenderer.BACKGROUND
+
+    def test_should_convert_values_to_indices(self):
+        indices = RasterRenderer.to_indices(np.array([[0, 0.5, 1, np.nan, 2]]))
+        assert indices.tolist() == [[0, 128, 255, 256, 255]]
+
+    def test_should_cache_template(self):
+        renderer = RasterRenderer()
+        template = renderer.get_template(0.01, 1100)
+        assert renderer.get_template(0.01, 1100) is template
+        assert template.shape == (RasterRenderer.HEIGHT, RasterRenderer.WIDTH, 3)
+
+    def test_should_render_raster(self):
+        renderer = RasterRenderer()
+        columns, rows = renderer.plot_size
+        raster = np.tile(np.linspace(0, 1, columns), (rows, 1))
+        raster[:10] = np.nan
+        profiles = {'goes': {'time': np.linspace(0, 3600, 500),
+                             'flux': np.linspace(1e-7, 1e-5, 500), 'ncols': [0, 3600]}}
+        image = renderer.render(raster, '2019-04-10', np.array(['01:00', '02:00']),
+                                profiles, 'I', 0.01, 1100)
+
+        pixels = np.asarray(Image.open(io.BytesIO(image)))
+        left, top, right, bottom = RasterRenderer.BOX
+        assert pixels.shape == (RasterRenderer.HEIGHT, RasterRenderer.WIDTH, 3)
+        assert tuple(pixels[top + 5, left + 5]) == RasterRenderer.BACKGROUND
+        assert tuple(pixels[bottom - 1, left]) == (255, 255, 255)
+        assert tuple(pixels[bottom - 50, right - 1]) == (0, 0, 0)
+        assert (pixels[top:bottom, left:right] == (255, 0, 0)).all(axis=2).any()
+
+    def test_should_not_render_unsupported_format(self):
+        renderer = RasterRenderer()
+        columns, rows = renderer.plot_size
+        with pytest.raises(exceptions.UnsupportedImageFormat):
+            renderer.render(np.zeros((rows, columns)), '', [], {}, 'I', 0.01, 1100, 'gif')
+
+    def test_should_render_image_of_instruments(self, assa_data):
+        image = Builder().render_raster_image(*assa_data, [], ['assa'], [], 'I', 'jpeg',
+                                              quality=80)
+        assert image.startswith(b'\xff\xd8')
+        pixels = np.asarray(Image.open(io.BytesIO(image)).convert('L'), dtype=float)
+        left, top, right, bottom = RasterRenderer.BOX
+        row = round(RasterRenderer().get_frequency_position(300, 0.01, 1100))
+        assert pixels[row - 10:row + 10, left:right].std() > 5
+        assert pixels[row - 10:row + 10, left:right].mean() < 200
+        assert abs(pixels[top + 5:top + 100, left + 5:right - 5].mean() -
+                   np.mean(RasterRenderer.BACKGROUND)) < 3
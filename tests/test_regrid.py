@@ -0,0 +1,71 @@
+"""DynamicSpectrum Test"""
+import os
+import numpy as np
+from dynamicspectrum.builder import Builder
+from dynamicspectrum.instruments.wind import Wind
+from dynamicspectrum.regrid import Regrid
+
+
+class TestRegrid:
+    """ Test regridding of spectra on one log-frequency raster """
+
+    def test_should_create_frequency_weights(self):
+        regrid = Regrid(rows=100)
+        frequencies = np.linspace(150, 500, 410)
+        weights = regrid.get_weights('amateras', frequencies)
+        assert weights is regrid.get_weights('amateras', frequencies)
+        assert weights.shape == (100, 410)
+
+        row_sums = np.asarray(weights.sum(axis=1)).ravel()
+        axis = regrid.get_frequency_axis()
+        covered = (axis >= 150) & (axis <= 500)
+        assert np.allclose(row_sums[covered], 1)
+        assert (row_sums[axis < 140] == 0).all() and (row_sums[axis > 520] == 0).all()
+
+    def test_should_interpolate_sparse_channels(self):
+        regrid = Regrid(rows=1000)
+        frequencies = Wind('rad1').get_frequencies(256)
+        weights = regrid.get_weights('wind1', frequencies)
+        values = weights @ np.log10(frequencies)
+        axis = regrid.get_frequency_axis()
+        covered = np.asarray(weights.sum(axis=1)).ravel() > 0
+        assert np.allclose(values[covered], np.log10(axis[covered]), atol=0.01)
+
+    def test_should_resample_time(self):
+        regrid = Regrid(columns=10)
+        array = np.tile(np.arange(100, dtype=float), (2, 1))
+        first, columns = regrid.resample_time(array, [300, 800], 1000)
+        assert first == 3 and columns.shape == (2, 5)
+        assert np.allclose(columns[0], [9.5, 29.5, 49.5, 69.5, 89.5])
+
+    def test_should_create_raster_of_instruments(self):
+        regrid = Regrid(rows=200, columns=100)
+        low = {'array': np.tile(np.arange(256, dtype=float)[:, None], (1, 60)),
+               'ncols': [0, 600]}
+        high = {'array': np.ones((410, 30)), 'ncols': [500, 1000]}
+        high['array'][:205] = 0
+        raster = regrid.create_raster([
+            ('wind1', low, np.linspace(0.02, 1.04, 256)),
+            ('amateras', high, np.linspace(150, 500, 410))], 1000)
+
+        axis = regrid.get_frequency_axis()
+        wind_rows = (axis > 0.03) & (axis < 1)
+        amateras_rows = (axis > 160) & (axis < 490)
+        assert not np.isnan(raster[wind_rows, :60]).any()
+        assert np.isnan(raster[wind_rows, 60:]).all()
+        assert np.isnan(raster[amateras_rows, :50]).all()
+        assert not np.isnan(raster[amateras_rows, 50:]).any()
+        assert np.isnan(raster[(axis > 2) & (axis < 100)]).all()
+        assert (np.diff(raster[wind_rows, 0]) >= 0).all()
+
+    def test_should_draw_regridded_spectrum_with_one_image(self, assa_data):
+        builder = Builder()
+        data = [builder.get_instrument_data(*assa_data, instruments, 'I')
+                for instruments in [[], ['assa'], []]]
+        raster = builder.draw_regridded_spectrum(*assa_data, *data, 'I')
+        assert len(builder.fig.axes) == 1 and len(builder.fig.axes[0].images) == 1
+        assert not np.isnan(raster).all()
+
+        builder.combine_regridded_spectrum(*assa_data, [], ['assa'], [], 'I')
+        assert os.path.exists(os.path.join('plots', '20190410_0100_0200_I.jpg'))
+        assert builder.fig.axes[0].images[0].get_array().size == 1
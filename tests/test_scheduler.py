@@ -0,0 +1,127 @@
+"""DynamicSpectrum Test"""
+import os
+import threading
+import pytest
+from datetime import datetime, time
+from dynamicspectrum.scheduler import Scheduler
+from dynamicspectrum import exceptions
+
+
+def block(scheduler, priority='interactive', memory=0):
+    """ Submit job which runs until returned event is set """
+    started, release = threading.Event(), threading.Event()
+
+    def wait():
+        started.set()
+        release.wait(5)
+    future = scheduler.submit(wait, priority=priority, cost={'memory': memory, 'cpu': 0})
+    started.wait(5)
+    return release, future
+
+
+class TestScheduler:
+    """ Test priority scheduling and admission of render jobs """
+
+    def test_should_estimate_cost_from_catalog(self, catalog):
+        date_event = datetime(2019, 4, 10)
+        catalog.add_record('orfees', date_event, 'orfees.fts', 0, 86400, 0.1, 144, 1004, 1000)
+        scheduler = Scheduler(workers=1)
+        cost = scheduler.estimate_cost(date_event, time(1, 0), time(2, 0), ['orfees'])
+        values = 3600 / 0.1 * 1000
+        assert cost['memory'] == values * 8 * 4 + Scheduler.FIGURE_MEMORY
+        assert cost['cpu'] == values / Scheduler.VALUES_PER_SECOND
+
+        default = scheduler.estimate_cost(date_event, time(1, 0), time(2, 0), ['srh'])
+        assert default['memory'] == 3600 * 400 * 8 * 4 + Scheduler.FIGURE_MEMORY
+        cold = scheduler.estimate_cost(datetime(2019, 4, 11), time(1, 0), time(2, 0),
+                                       ['orfees'])
+        assert cold['memory'] == cost['memory']
+        longer = scheduler.estimate_cost(date_event, time(1, 0), time(3, 0), ['orfees'])
+        assert longer['memory'] > cost['memory']
+        scheduler.shutdown()
+
+    def test_should_start_interactive_jobs_before_batch(self):
+        scheduler = Scheduler(workers=1)
+        release, _ = block(scheduler)
+        order = []
+        futures = [scheduler.submit(order.append, name, priority=priority)
+                   for name, priority in [('batch1', 'batch'), ('batch2', 'batch'),
+                                          ('interactive', 'interactive')]]
+        assert scheduler.get_stats()['queued'] == {'interactive': 1, 'batch': 2}
+
+        release.set()
+        for future in futures:
+            future.result(5)
+        assert order == ['interactive', 'batch1', 'batch2']
+        scheduler.shutdown()
+
+    def test_should_raise_priority_of_queued_job(self):
+        scheduler = Scheduler(workers=1)
+        release, running = block(scheduler)
+        order = []
+        first = scheduler.submit(order.append, 'first', priority='batch')
+        second = scheduler.submit(order.append, 'second', priority='batch')
+        assert scheduler.raise_priority(second, 'interactive')
+        assert not scheduler.raise_priority(first, 'batch')
+        assert not scheduler.raise_priority(running, 'interactive')
+        assert scheduler.get_stats()['queued'] == {'interactive': 1, 'batch': 1}
+
+        release.set()
+        first.result(5)
+        assert order == ['second', 'first']
+        scheduler.shutdown()
+
+    def test_should_admit_jobs_within_memory_budget(self):
+        scheduler = Scheduler(workers=4, memory_budget=100)
+        release, first = block(scheduler, memory=60)
+        second = scheduler.submit(lambda: 'done', cost={'memory': 60, 'cpu': 0})
+        small = scheduler.submit(lambda: 'small', cost={'memory': 10, 'cpu': 0})
+        stats = scheduler.get_stats()
+        assert stats['running'] == 1 and stats['memory_used'] == 60
+        assert not second.done() and not small.done()
+
+        release.set()
+        assert second.result(5) == 'done' and small.result(5) == 'small'
+        assert scheduler.get_stats()['memory_used'] == 0
+        scheduler.shutdown()
+
+    def test_should_keep_memory_for_interactive_jobs(self):
+        scheduler = Scheduler(workers=4, memory_budget=100)
+        with pytest.raises(exceptions.JobIsRejected):
+            scheduler.submit(lambda: None, priority='batch', cost={'memory': 80, 'cpu': 0})
+        release, _ = block(scheduler, priority='batch', memory=70)
+        batch = scheduler.submit(lambda: 'batch', priority='batch',
+                                 cost={'memory': 10, 'cpu': 0})
+        interactive = scheduler.submit(lambda: 'interactive', cost={'memory': 30, 'cpu': 0})
+        assert interactive.result(5) == 'interactive'
+        assert not batch.done()
+
+        release.set()
+        assert batch.result(5) == 'batch'
+        scheduler.shutdown()
+
+    def test_should_reject_jobs_under_load(self, monkeypatch):
+        scheduler = Scheduler(workers=1, memory_budget=100)
+        with pytest.raises(exceptions.JobIsTooLarge):
+            scheduler.submit(lambda: None, cost={'memory': 200, 'cpu': 0})
+
+        monkeypatch.setattr(Scheduler, 'MAX_QUEUE', {'interactive': 2, 'batch': 1})
+        release, _ = block(scheduler)
+        free = {'memory': 0, 'cpu': 0}
+        scheduler.submit(lambda: None, priority='batch', cost=free)
+        with pytest.raises(exceptions.JobIsRejected):
+            scheduler.submit(lambda: None, priority='batch', cost=free)
+
+        scheduler.submit(lambda: None, cost={'memory': 0, 'cpu': 40})
+        with pytest.raises(exceptions.JobIsRejected):
+            scheduler.submit(lambda: None, cost={'memory': 0, 'cpu': 1})
+        release.set()
+        scheduler.shutdown()
+
+    def test_should_combine_spectrum(self, assa_data):
+        scheduler = Scheduler(workers=2)
+        future = scheduler.submit_spectrum(*assa_data, [], ['assa'], [], 'I',
+                                           priority='batch')
+        future.result(30)
+        assert os.path.exists(os.path.join('plots', '20190410_0100_0200_I.jpg'))
+        scheduler.shutdown()
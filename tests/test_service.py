@@ -0,0 +1,140 @@
+"""DynamicSpectrum Test"""
+import time
+import json
+import asyncio
+from dynamicspectrum.service import SpectrumService
+from dynamicspectrum.scheduler import Scheduler
+from dynamicspectrum.image_cache import ImageCache
+from dynamicspectrum.download import SingletonMeta
+from tests.test_scheduler import block
+
+
+QUERY = '/spectrum?date=2019-04-10&from=01:00&to=02:00&spectropolarimeter=assa&stokes=I'
+
+
+async def fetch(port, target, headers=None):
+    """ Send GET request to service. Return status, headers and body """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    request = 'GET {} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n'.format(target)
+    for name, value in (headers or {}).items():
+        request += '{}: {}\r\n'.format(name, value)
+    writer.write((request + '\r\n').encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    head, body = response.split(b'\r\n\r\n', 1)
+    lines = head.decode().split('\r\n')
+    response_headers = dict(line.split(': ', 1) for line in lines[1:])
+    return int(lines[0].split()[1]), response_headers, body
+
+
+async def serve(service, requests):
+    """ Start service, run coroutine of requests and stop service """
+    server = await service.start()
+    try:
+        return await requests(service.port)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+class TestService:
+    """ Test HTTP service of dynamic spectrum """
+
+    def test_should_serve_spectrum_image(self, assa_data):
+        SingletonMeta._instances.pop(ImageCache, None)
+        service = SpectrumService(port=0)
+
+        async def requests(port):
+            first = await fetch(port, QUERY)
+            second = await fetch(port, QUERY, {'If-None-Match': first[1]['ETag']})
+            return first, second
+
+        first, second = asyncio.run(serve(service, requests))
+        assert first[0] == 200 and first[1]['Content-Type'] == 'image/png'
+        assert first[2].startswith(b'\x89PNG\r\n\x1a\n')
+        assert second[0] == 304 and second[2] == b''
+        SingletonMeta._instances.pop(ImageCache, None)
+
+    def test_should_coalesce_identical_requests(self, assa_data, monkeypatch):
+        service = SpectrumService(port=0, workers=4)
+        calls = []
+
+        def render(params):
+            calls.append(params)
+            time.sleep(0.3)
+            return params['stokes'].encode(), None
+        monkeypatch.setattr(service, 'render', render)
+
+        async def requests(port):
+            return await asyncio.gather(*[fetch(port, QUERY) for _ in range(8)],
+                                        fetch(port, QUERY.replace('=I', '=V')))
+
+        responses = asyncio.run(serve(service, requests))
+        assert len(calls) == 2
+        assert [response[2] for response in responses] == [b'I'] * 8 + [b'V']
+        assert service.inflight == {}
+
+    def test_should_raise_priority_of_coalesced_request(self, catalog, monkeypatch):
+        scheduler = Scheduler(workers=1)
+        service = SpectrumService(port=0, scheduler=scheduler)
+        order = []
+        monkeypatch.setattr(service, 'render',
+                            lambda params: order.append('request') or (b'', None))
+        params, _ = service.parse_request(QUERY)
+
+        async def requests():
+            release, _ = block(scheduler)
+            other = scheduler.submit(order.append, 'other', priority='batch')
+            batch = asyncio.ensure_future(service.get_image(params, 'batch'))
+            while scheduler.get_stats()['queued']['batch'] < 2:
+                await asyncio.sleep(0.01)
+            interactive = asyncio.ensure_future(service.get_image(params, 'interactive'))
+            await asyncio.sleep(0)
+            queued = scheduler.get_stats()['queued']
+            release.set()
+            await asyncio.gather(batch, interactive, asyncio.wrap_future(other))
+            return queued
+
+        assert asyncio.run(requests()) == {'interactive': 1, 'batch': 1}
+        assert order == ['request', 'other']
+        scheduler.shutdown()
+
+    def test_should_reject_invalid_request(self):
+        service = SpectrumService(port=0)
+
+        async def requests(port):
+            return await asyncio.gather(fetch(port, '/spectrum?date=2019-13-10'),
+                                        fetch(port, QUERY + '&format=gif'),
+                                        fetch(port, QUERY + '&priority=urgent'),
+                                        fetch(port, '/other'))
+
+        invalid, unsupported, priority, missing = asyncio.run(serve(service, requests))
+        assert invalid[0] == 400 and json.loads(invalid[2])['code'] == 'INVALIDREQUEST'
+        assert unsupported[0] == 400
+        assert json.loads(unsupported[2])['code'] == 'UNSUPPORTEDIMAGEFORMAT'
+        assert priority[0] == 400
+        assert missing[0] == 404
+
+    def test_should_reject_unknown_parameters(self):
+        service = SpectrumService(port=0)
+        queries = [QUERY.replace('assa', 'lofar'), QUERY + '&time_profile=assa',
+                   QUERY.replace('stokes=I', 'stokes=Q'),
+                   QUERY.replace('to=02:00', 'to=00:30')]
+
+        async def requests(port):
+            return await asyncio.gather(*[fetch(port, query) for query in queries])
+
+        for status, _, body in asyncio.run(serve(service, requests)):
+            assert status == 400 and json.loads(body)['code'] == 'INVALIDREQUEST'
+
+    def test_should_reject_request_over_memory_budget(self, assa_data):
+        service = SpectrumService(port=0, scheduler=Scheduler(memory_budget=1024))
+
+        async def requests(port):
+            return await fetch(port, QUERY)
+
+        status, headers, body = asyncio.run(serve(service, requests))
+        assert status == 422 and 'Retry-After' not in headers
+        assert json.loads(body)['code'] == 'JOBISTOOLARGE'
@@ -0,0 +1,39 @@
+"""DynamicSpectrum Test"""
+import os
+import time as timer
+from datetime import datetime, time
+from dynamicspectrum.builder import Builder
+
+
+def get_rss():
+    """ Return resident memory of process in megabytes """
+    with open('/proc/self/statm') as _f:
+        return int(_f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+class TestSoak:
+    """ Test memory and time of long-running rendering """
+    RENDERS = 200
+    WARMUP = 20
+
+    def test_should_render_with_bounded_memory_and_time(self, assa_data):
+        builder = Builder()
+
+        durations = []
+        axes = None
+        for index in range(self.RENDERS):
+            if index == self.WARMUP:
+                warm_rss = get_rss()
+            start = timer.perf_counter()
+            builder.render_image(datetime(2019, 4, 10), time(1, 0), time(1, 20), [],
+                                 ['assa'], [], 'I')
+            durations.append(timer.perf_counter() - start)
+            axes = axes or len(builder.fig.axes)
+            assert len(builder.fig.axes) == axes
+            assert all(image.get_array().size == 1
+                       for axis in builder.fig.axes for image in axis.images)
+
+        first = sorted(durations[self.WARMUP:self.WARMUP + 40])[20]
+        last = sorted(durations[-40:])[20]
+        assert get_rss() - warm_rss < 20
+        assert last < first * 1.5
@@ -0,0 +1,122 @@
+"""DynamicSpectrum Test"""
+import os
+import pytest
+import numpy as np
+from astropy.io import fits
+from datetime import datetime, time as time_type
+from dynamicspectrum import exceptions
+from dynamicspectrum.instruments.srh import SRH
+from dynamicspectrum.local_data import LocalData
+from dynamicspectrum.download import Download
+from dynamicspectrum.manifest import Manifest
+from dynamicspectrum.transport import SharedResult, export_data
+
+
+class FailingData:
+    """ Client of data service which must not be called """
+
+    def get_files(self, instrument, filetype, timefrom, timeto):
+        raise AssertionError('Data service is queried')
+
+
+@pytest.fixture
+def client(catalog):
+    """ Create local archive with SRH files """
+    os.makedirs('archive/SRH')
+    for name in ['srh_cp_20190410.fits', 'srh_cp_20190411.fits', 'srh_if_20190410.fits']:
+        with open(os.path.join('archive', 'SRH', name), 'w') as _f:
+            _f.write(name)
+    return LocalData('archive')
+
+
+@pytest.fixture
+def srh_file(catalog, monkeypatch):
+    """ SRH file with profiles of 2800, 5700 and 7800 MHz """
+    frequencies = np.array([[2800., 5700., 7800.]])
+    time = np.array([[0., 10., 20., 30., 40.]] * 3) + 3600
+    flux = np.array([[1., 2., 3., 4., 5.], [10., 20., 30., 40., 50.],
+                     [0., 0.002, 300., 400., 500.]])
+    fits.HDUList([
+        fits.PrimaryHDU(),
+        fits.BinTableHDU.from_columns([fits.Column('frequencies', '3D',
+                                                   array=frequencies)]),
+        fits.BinTableHDU.from_columns([fits.Column('time', '5D', array=time),
+                                       fits.Column('I', '5D', array=flux)]),
+    ]).writeto('srh.fits')
+    monkeypatch.setattr(SRH, 'get_file', lambda self, date: 'srh.fits')
+
+
+class TestSRH:
+    """ Test SRH instrument class """
+
+    def test_should_get_file_from_data_service(self, client):
+        response = SRH(client=client).get_file(datetime(2019, 4, 10))
+        assert response == os.path.join('data', 'SRH', 'srh_cp_20190410.fits')
+        assert os.path.exists(response)
+        assert client.requests == 1
+        manifest = Manifest(os.path.join('data', 'SRH'))
+        assert manifest.get_files(datetime(2019, 4, 10)) == ['srh_cp_20190410.fits']
+
+    def test_should_get_local_file_without_query(self, client):
+        SRH(client=client).get_file(datetime(2019, 4, 10))
+        response = SRH(client=FailingData()).get_file(datetime(2019, 4, 10))
+        assert response == os.path.join('data', 'SRH', 'srh_cp_20190410.fits')
+        response = SRH(offline=True).get_file(datetime(2019, 4, 10))
+        assert response == os.path.join('data', 'SRH', 'srh_cp_20190410.fits')
+
+    def test_should_raise_in_offline_mode(self, catalog):
+        with pytest.raises(exceptions.SRHFileIsNotExists):
+            SRH(offline=True, client=FailingData()).get_file(datetime(2019, 4, 11))
+
+    def test_should_raise_if_no_files(self, client):
+        with pytest.raises(exceptions.SRHFileIsNotExists):
+            SRH(client=client).get_file(datetime(2019, 5, 10))
+        with pytest.raises(exceptions.SRHFileIsNotExists):
+            SRH(client=FailingData()).get_file(datetime(2019, 5, 10))
+
+    def test_should_find_local_file_without_manifest(self, catalog):
+        os.makedirs(os.path.join('data', 'SRH'))
+        path = os.path.join('data', 'SRH', 'srh_cp_20190410.fits')
+        with open(path, 'w') as _f:
+            _f.write('srh')
+        response = SRH(offline=True).get_file(datetime(2019, 4, 10))
+        assert response == path
+        manifest = Manifest(os.path.join('data', 'SRH'))
+        assert manifest.get_files(datetime(2019, 4, 10)) == ['srh_cp_20190410.fits']
+
+    def test_should_query_current_day_after_ttl(self, client, monkeypatch):
+        monkeypatch.setattr(SRH, 'EMPTY_TTL', 0)
+        monkeypatch.setattr(Download, 'is_current_day', staticmethod(lambda date: True))
+        for _ in range(2):
+            with pytest.raises(exceptions.SRHFileIsNotExists):
+                SRH(client=client).get_file(datetime(2019, 5, 10))
+        assert client.requests == 2
+
+    def test_should_return_empty_data_if_no_files(self, client):
+        response = SRH(client=client).get_data(datetime(2019, 5, 10), None, None)
+        assert response['ncols'] == [0, 0]
+
+    def test_should_get_profiles_in_one_read(self, srh_file, monkeypatch):
+        instrument = SRH(frequencies=[2800, 7800])
+        calls = []
+        read_profiles = instrument.read_profiles
+        monkeypatch.setattr(instrument, 'read_profiles',
+                            lambda path: calls.append(path) or read_profiles(path))
+
+        response = instrument.get_data(datetime(2019, 4, 10), time_type(1, 0, 0),
+                                       time_type(1, 0, 35))
+        assert calls == ['srh.fits']
+        assert (response['flux'] == np.array([10., 20., 30.])).all()
+        assert (response['frequencies'][2800]['flux'] == np.array([1., 2., 3.])).all()
+        assert (response['frequencies'][7800]['flux'] == np.array([300.])).all()
+
+    def test_should_export_profiles_to_shared_memory(self, srh_file):
+        response = SRH(frequencies=[2800, 7800]).get_data(
+            datetime(2019, 4, 10), time_type(1, 0, 0), time_type(1, 0, 35))
+        assert set(response['frequencies']) == {2800, 7800}
+
+        with SharedResult() as shared:
+            data = shared.import_data(export_data(response))
+            assert (data['flux'] == np.array([10., 20., 30.])).all()
+            assert (data['frequencies'][2800]['flux'] == np.array([1., 2., 3.])).all()
+            del data
@@ -0,0 +1,85 @@
+"""DynamicSpectrum Test"""
+import os
+import shutil
+import pytest
+import numpy as np
+import scipy.io
+from astropy.io import fits
+from datetime import datetime, time
+from dynamicspectrum.instruments.assa import ASSA
+from dynamicspectrum.storage import Storage
+from tests.synthetic import create_spectrum_file
+
+SAV_FILE = os.path.join(os.path.dirname(scipy.io.__file__), 'tests', 'data',
+                        'array_float32_2d.sav')
+
+
+@pytest.fixture
+def short_assa_file(catalog):
+    file_path = os.path.join('data', 'ASSA', 'ASSA_20190410.fits')
+    create_spectrum_file(file_path, samples=5000, time_obs='00:30:00.000',
+                         time_end='02:00:00')
+    return file_path
+
+
+class TestStorage:
+    """ Test compressed storage of instrument files """
+
+    def test_should_compress_file_with_gzip(self, tmp_path):
+        file_path = str(tmp_path / 'go1420190410.fits')
+        shutil.copyfile('tests/dataset/go1420190410.fits', file_path)
+        expected = fits.getdata(file_path, ext=2)
+
+        compressed_path = Storage.compress(file_path, 'gzip')
+        assert compressed_path == file_path + '.gz'
+        assert not os.path.exists(file_path)
+        assert Storage.find(file_path) == compressed_path and Storage.exists(file_path)
+        assert os.path.getsize(compressed_path) < os.path.getsize(
+            'tests/dataset/go1420190410.fits')
+        assert (fits.getdata(Storage.find(file_path), ext=2) == expected).all()
+
+    def test_should_read_window_of_tile_compressed_file(self, short_assa_file):
+        expected = ASSA().get_data(datetime(2019, 4, 10), time(1, 0), time(1, 10))
+        compressed_path = Storage.compress(short_assa_file, 'tile')
+        assert compressed_path == short_assa_file + '.fz'
+
+        file_path = ASSA().get_file(datetime(2019, 4, 10))
+        assert file_path == compressed_path
+        assert ASSA().read_header(file_path)['TIME-OBS'] == '00:30:00.000'
+        response = ASSA().get_data(datetime(2019, 4, 10), time(1, 0), time(1, 10))
+        assert np.array_equal(response['array'], expected['array'])
+        assert response['ncols'] == expected['ncols']
+
+    def test_should_read_window_of_tile_compressed_cube(self, tmp_path):
+        file_path = str(tmp_path / '20190410_IPRT.fits')
+        data = np.random.default_rng(0).normal(size=(2, 50, 3000)).astype(np.float32)
+        fits.PrimaryHDU(data).writeto(file_path)
+
+        Storage.compress(file_path, 'tile')
+        with Storage.open_image(file_path) as hdu:
+            assert np.array_equal(Storage.read_window(hdu, 1500, 2600), data[..., 1500:2600])
+
+    def test_should_choose_method_by_folder(self, monkeypatch):
+        monkeypatch.setattr(Storage, 'COMPRESSION', 'gzip')
+        assert Storage.get_method(os.path.join('data', 'AMATERAS', 'a.fits')) == 'tile'
+        assert Storage.get_method(os.path.join('data', 'ORFEES', 'a.fts')) is None
+        assert Storage.get_method(os.path.join('data', 'GOES', 'a.fits')) == 'gzip'
+
+    def test_should_not_compress_without_method(self, short_assa_file):
+        assert Storage.compress(short_assa_file) == short_assa_file
+        assert os.path.exists(short_assa_file)
+
+    @pytest.mark.skipif(not os.path.exists(SAV_FILE), reason='IDL save file is missing')
+    def test_should_read_compressed_sav_file(self, tmp_path):
+        file_path = str(tmp_path / 'data.sav')
+        shutil.copyfile(SAV_FILE, file_path)
+        expected = Storage.read_sav(file_path)['array2d']
+
+        Storage.compress(file_path, 'gzip')
+        assert np.array_equal(Storage.read_sav(file_path)['array2d'], expected)
+
+    def test_should_read_window_of_gzip_file(self, short_assa_file):
+        expected = ASSA().get_data(datetime(2019, 4, 10), time(1, 0), time(1, 10))
+        Storage.compress(short_assa_file, 'gzip')
+        response = ASSA().get_data(datetime(2019, 4, 10), time(1, 0), time(1, 10))
+        assert np.array_equal(response['array'], expected['array'])
@@ -0,0 +1,97 @@
+"""DynamicSpectrum Test"""
+import pytest
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, time
+from multiprocessing import shared_memory
+from dynamicspectrum import builder as builder_module
+from dynamicspectrum.builder import Builder
+from dynamicspectrum.instruments.assa import ASSA
+from dynamicspectrum.transport import SharedArray, SharedResult, export_data
+
+
+def is_removed(descriptor):
+    """ Determine block of shared memory does not exist """
+    try:
+        shared_memory.SharedMemory(name=descriptor.name).close()
+    except FileNotFoundError:
+        return True
+    return False
+
+
+class TestTransport:
+    """ Test shared memory transport of instrument data """
+
+    def test_should_export_and_import_data(self):
+        data = {'array': np.arange(12, dtype=float).reshape(3, 4), 'ncols': [0, 10],
+                'empty': np.array([[]]), 'frequencies': {2800: {'flux': np.ones(3)}}}
+        exported = export_data(data)
+        assert isinstance(exported['array'], SharedArray)
+        assert isinstance(exported['frequencies'][2800]['flux'], SharedArray)
+        assert exported['empty'].size == 0
+
+        with SharedResult() as shared:
+            response = shared.import_data(exported)
+            assert (response['array'] == data['array']).all()
+            assert (response['frequencies'][2800]['flux'] == 1).all()
+            assert response['ncols'] == [0, 10]
+            del response
+
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=exported['array'].name)
+
+    def test_should_get_data_in_worker_processes(self, assa_data):
+        expected = ASSA().get_data(datetime(2019, 4, 10), time(1, 0), time(2, 0))
+
+        builder = Builder()
+        with ProcessPoolExecutor(max_workers=2) as executor, SharedResult() as shared:
+            response = builder.get_instrument_data_parallel(
+                executor, shared, datetime(2019, 4, 10), time(1, 0), time(2, 0),
+                ['assa'], 'I')
+            assert (response['assa']['array'] == expected['array']).all()
+            assert response['assa']['ncols'] == expected['ncols']
+            assert (response['assa']['frequencies'] == expected['frequencies']).all()
+            assert len(shared.blocks) == 2
+
+    def test_should_skip_dictionary_containing_itself(self):
+        data = {'flux': np.ones(3)}
+        data['frequencies'] = {5700: data, 2800: {'flux': np.zeros(2)}}
+        exported = export_data(data)
+        assert list(exported['frequencies']) == [2800]
+
+        with SharedResult() as shared:
+            response = shared.import_data(exported)
+            assert (response['frequencies'][2800]['flux'] == 0).all()
+            del response
+
+    def test_should_remove_blocks_if_export_fails(self, monkeypatch):
+        created = []
+        create = SharedArray.create
+
+        def create_once(array):
+            if created:
+                raise OSError('no space left')
+            created.append(create(array))
+            return created[-1]
+        monkeypatch.setattr(SharedArray, 'create', create_once)
+
+        with pytest.raises(OSError):
+            export_data({'first': np.ones(3), 'second': np.ones(3)})
+        assert is_removed(created[0])
+
+    def test_should_remove_blocks_if_worker_fails(self, monkeypatch):
+        exported = []
+
+        def process(name, *args):
+            if name == 'failing':
+                raise ValueError('broken file')
+            exported.append(export_data({'array': np.ones(4)}))
+            return exported[-1]
+        monkeypatch.setattr(builder_module, 'process_instrument', process)
+
+        with ThreadPoolExecutor(max_workers=2) as executor, SharedResult() as shared:
+            with pytest.raises(ValueError):
+                Builder().get_instrument_data_parallel(
+                    executor, shared, datetime(2019, 4, 10), time(1, 0), time(2, 0),
+                    ['failing', 'assa'], 'I')
+        assert is_removed(exported[0]['array'])